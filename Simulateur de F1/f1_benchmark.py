@@ -0,0 +1,309 @@
+# f1_benchmark.py
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from f1_engine import SeasonSimulator
+from f1_model import Roster, SeasonState, drivers, tracks
+from f1_prediction import PredictionIndex, predict_race, weighted_scores
+from f1_race import RaceField, simulate_qualifying, simulate_race
+from f1_strategy import optimal_strategy
+
+
+# Graine fixe : chaque répétition rejoue exactement le même travail
+SEED = 2024
+FIELD_SIZES = [20, 200, 2000]
+TRACK_COUNTS = [1, 7, 21]
+INCIDENT_CALLS = 1000  # Un appel à simulate_incidents est trop court pour être mesuré seul
+PREDICTION_SAMPLES = 1000
+
+
+def build_field(n_drivers):
+    # Plateau réel pour 20 pilotes, effectif synthétique au-delà ; les pilotes
+    # sont des vues sur un état propre au banc d'essai (l'effectif de base n'est pas modifié)
+    if n_drivers == len(drivers):
+        field = drivers
+    else:
+        field = Roster.synthetic(n_drivers, [track.name for track in tracks], seed=SEED).drivers()
+    return SeasonState.for_drivers(list(field))
+
+
+def build_tracks(count):
+    # Au-delà du calendrier réel, les circuits sont répétés dans l'ordre
+    return [copy.copy(tracks[i % len(tracks)]) for i in range(count)]
+
+
+def bench_race_time(n_drivers, n_tracks):
+    state, field = build_field(n_drivers)
+    reference = build_tracks(1)[0]
+
+    def run():
+        # calculate_race_time change la météo du circuit : chaque répétition repart d'une copie intacte
+        track = copy.copy(reference)
+        rng = np.random.default_rng(SEED)
+        for driver in field:
+            driver.calculate_race_time(track, rng)
+    return run
+
+
+def bench_race_events(n_drivers, n_tracks):
+    # Course à événements partagés : coût par événement, indépendant du nombre de tours
+    state, field = build_field(n_drivers)
+    track = build_tracks(1)[0]
+    race_field = RaceField.from_drivers(field, track)
+
+    def run():
+        simulate_race(race_field, track, np.random.default_rng(SEED), fidelity='events')
+    return run
+
+
+def bench_race_events_batch(n_drivers, n_tracks):
+    # Même moteur sur un lot de courses, comme dans predict_race : les événements de tous les
+    # échantillons sont traités ensemble
+    state, field = build_field(n_drivers)
+    track = build_tracks(1)[0]
+    race_field = RaceField.from_drivers(field, track)
+
+    def run():
+        simulate_race(race_field, track, np.random.default_rng(SEED), PREDICTION_SAMPLES, fidelity='events')
+    return run
+
+
+def bench_qualifying_lap(n_drivers, n_tracks):
+    simulator = SeasonSimulator(build_field(n_drivers)[1], build_tracks(1), seed=SEED)
+    track = simulator.tracks[0]
+
+    def run():
+        rng = np.random.default_rng(SEED)
+        for driver in simulator.drivers:
+            simulator.simulate_qualifying_lap(driver, track, rng)
+    return run
+
+
+def bench_qualifying_session(n_drivers, n_tracks):
+    simulator = SeasonSimulator(build_field(n_drivers)[1], build_tracks(1), seed=SEED)
+    track = simulator.tracks[0]
+    field = simulator.drivers
+
+    def run():
+        simulator.simulate_qualifying_session(field, track, np.random.default_rng(SEED))
+    return run
+
+
+def bench_qualifying_batch(n_drivers, n_tracks):
+    field = build_field(n_drivers)[1]
+    track = build_tracks(1)[0]
+    race_field = RaceField.from_drivers(field, track)
+
+    def run():
+        simulate_qualifying(race_field, track, np.random.default_rng(SEED), PREDICTION_SAMPLES)
+    return run
+
+
+def bench_incidents(n_drivers, n_tracks):
+    simulator = SeasonSimulator(build_field(n_drivers)[1], build_tracks(1), seed=SEED)
+    track = simulator.tracks[0]
+    snapshot = simulator.state.snapshot()
+
+    def run():
+        # Chaque appel part du même état (tous les pilotes en course) ; seule la durée des appels est comptée
+        rng = np.random.default_rng(SEED)
+        elapsed = 0.0
+        for _ in range(INCIDENT_CALLS):
+            simulator.state.restore(snapshot)
+            start = time.perf_counter()
+            simulator.simulate_incidents(simulator.drivers, track, [], rng=rng)
+            elapsed += time.perf_counter() - start
+        return elapsed
+    return run
+
+
+def bench_season(n_drivers, n_tracks):
+    field = build_field(n_drivers)[1]
+    season_tracks = build_tracks(n_tracks)
+
+    def run():
+        SeasonSimulator(field, season_tracks, seed=SEED).run()
+    return run
+
+
+def bench_prediction_score(n_drivers, n_tracks):
+    field = build_field(n_drivers)[1]
+    track = build_tracks(1)[0]
+
+    def run():
+        weighted_scores(field, track)
+    return run
+
+
+def bench_prediction_index(n_drivers, n_tracks):
+    field = build_field(n_drivers)[1]
+    calendar = build_tracks(n_tracks)
+    index = PredictionIndex(field, calendar)
+
+    def run():
+        # Comme après une course : la forme d'un pilote sur dix change, puis favoris de tout le calendrier
+        for driver in field[::10]:
+            driver.form = 1.0 if driver.form != 1.0 else 1.01
+        index.refresh()
+        index.top_k_all(3)
+    return run
+
+
+def bench_pit_strategy(n_drivers, n_tracks):
+    calendar = build_tracks(n_tracks)
+
+    def run():
+        for track in calendar:
+            optimal_strategy(track)
+    return run
+
+
+def bench_prediction_monte_carlo(n_drivers, n_tracks):
+    field = build_field(n_drivers)[1]
+    track = build_tracks(1)[0]
+
+    def run():
+        predict_race(field, track, samples=PREDICTION_SAMPLES, seed=SEED)
+    return run
+
+
+# Nom du cas -> (fabrique, dépend du nombre de circuits)
+BENCHMARKS = {
+    'race_time': (bench_race_time, False),
+    'race_events': (bench_race_events, False),
+    'race_events_batch': (bench_race_events_batch, False),
+    'qualifying_lap': (bench_qualifying_lap, False),
+    'qualifying_session': (bench_qualifying_session, False),
+    'qualifying_batch': (bench_qualifying_batch, False),
+    'incidents': (bench_incidents, False),
+    'season': (bench_season, True),
+    'prediction_score': (bench_prediction_score, False),
+    'prediction_index': (bench_prediction_index, True),
+    'prediction_monte_carlo': (bench_prediction_monte_carlo, False),
+    'pit_strategy': (bench_pit_strategy, True),
+}
+
+
+def measure(run, repeat):
+    # Durées de `repeat` exécutions ; un cas peut renvoyer sa propre durée mesurée
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        elapsed = run()
+        timings.append(time.perf_counter() - start if elapsed is None else elapsed)
+    return timings
+
+
+def run_benchmarks(names, field_sizes, track_counts, repeat, report=None):
+    results = []
+    for name in names:
+        factory, scales_tracks = BENCHMARKS[name]
+        for n_drivers in field_sizes:
+            for n_tracks in (track_counts if scales_tracks else [1]):
+                timings = measure(factory(n_drivers, n_tracks), repeat)
+                row = {
+                    'name': name,
+                    'drivers': n_drivers,
+                    'tracks': n_tracks,
+                    'repeat': repeat,
+                    'best': min(timings),
+                    'median': statistics.median(timings),
+                    'mean': statistics.fmean(timings),
+                }
+                results.append(row)
+                if report is not None:
+                    report(row)
+    return {
+        'seed': SEED,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    # Compare les meilleurs temps aux mêmes cas de la référence ;
+    # renvoie (lignes, nombre de régressions au-delà de la tolérance)
+    reference = {(row['name'], row['drivers'], row['tracks']): row for row in baseline['results']}
+    rows = []
+    regressions = 0
+    for row in current['results']:
+        base = reference.get((row['name'], row['drivers'], row['tracks']))
+        if base is None:
+            rows.append({**row, 'baseline': None, 'ratio': None, 'regression': False})
+            continue
+        ratio = row['best'] / base['best'] if base['best'] > 0 else float('inf')
+        regression = ratio > 1 + tolerance
+        regressions += regression
+        rows.append({**row, 'baseline': base['best'], 'ratio': ratio, 'regression': regression})
+    return rows, regressions
+
+
+def format_row(row):
+    return f"{row['name']:<24} {row['drivers']:>5} pilotes {row['tracks']:>3} circuits  {row['best'] * 1000:10.3f} ms"
+
+
+def parse_counts(text):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Banc d\'essai des performances du simulateur de F1')
+    parser.add_argument('--benchmarks', default=None,
+                        help=f"Cas séparés par des virgules (tous par défaut) : {', '.join(BENCHMARKS)}")
+    parser.add_argument('--sizes', type=parse_counts, default=FIELD_SIZES,
+                        help='Tailles de plateau séparées par des virgules (20,200,2000 par défaut)')
+    parser.add_argument('--track-counts', type=parse_counts, default=TRACK_COUNTS,
+                        help='Nombres de circuits pour la saison (1,7,21 par défaut)')
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre de répétitions par cas')
+    parser.add_argument('--output', default=None, help='Fichier JSON où écrire les résultats')
+    parser.add_argument('--baseline', default=None, help='Résultats JSON de référence à comparer')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Ralentissement toléré par rapport à la référence (0.10 = 10 %%)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    names = list(BENCHMARKS) if not args.benchmarks else [name.strip() for name in args.benchmarks.split(',')]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Inconnu(s) : {', '.join(unknown)}")
+
+    results = run_benchmarks(names, args.sizes, args.track_counts, args.repeat,
+                             report=lambda row: print(format_row(row), flush=True))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(f'\nCOMPARAISON AVEC {args.baseline} (tolérance {args.tolerance:.0%}):')
+    for row in rows:
+        if row['ratio'] is None:
+            print(f'{format_row(row)}  (absent de la référence)')
+        else:
+            marker = '  RÉGRESSION' if row['regression'] else ''
+            print(f"{format_row(row)}  x{row['ratio']:.2f}{marker}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# f1_checkpoint.py
+
+import json
+import os
+
+import numpy as np
+
+from f1_model import SeasonState
+
+
+# Point de reprise d'une saison : tout ce qui évolue d'une course à l'autre (colonnes de l'état,
+# colonnes de base modifiées par les améliorations, équipes, meilleurs tours) après `next_race` courses.
+# Enregistré dans un fichier .npz compressé : les colonnes en tableaux, le reste en JSON.
+CHECKPOINT_VERSION = 1
+STATE_COLUMNS = SeasonState.FLOAT_COLUMNS + SeasonState.INT_COLUMNS + SeasonState.CODE_COLUMNS
+
+
+class SeasonCheckpoint:
+    def __init__(self, names, track_names, next_race, columns, overrides, teams, best_laps, seed=None):
+        self.names = list(names)  # Pilotes, dans l'ordre de la dernière grille (qui fixe l'ordre des tirages)
+        self.track_names = list(track_names)  # Calendrier complet, courses disputées comprises
+        self.next_race = next_race  # Nombre de courses déjà disputées
+        self.columns = columns  # Nom -> tableau (une valeur par pilote), voir STATE_COLUMNS
+        self.overrides = overrides  # Colonnes de base modifiées (p. ex. car_performance)
+        self.teams = teams  # Nom d'équipe -> {'upgrade_level', 'budget', 'upgrade_cost', 'upgrade_step'}
+        self.best_laps = best_laps  # Meilleur tour de chaque pilote sur les courses disputées
+        self.seed = seed  # SeedSequence de la saison (None si le point de reprise vient d'un classement réel)
+
+    def check_drivers(self, names):
+        if sorted(names) != sorted(self.names):
+            raise ValueError('Les pilotes ne correspondent pas à ceux du point de reprise')
+
+    def check_tracks(self, track_names):
+        if list(track_names) != self.track_names:
+            raise ValueError('Le calendrier ne correspond pas à celui du point de reprise')
+
+    def save(self, path):
+        meta = {
+            'version': CHECKPOINT_VERSION,
+            'names': self.names,
+            'track_names': self.track_names,
+            'next_race': self.next_race,
+            'teams': self.teams,
+            'seed': None if self.seed is None else {'entropy': self.seed.entropy,
+                                                    'spawn_key': list(self.seed.spawn_key)},
+        }
+        arrays = {'meta': np.array(json.dumps(meta, ensure_ascii=False)), 'best_laps': self.best_laps}
+        arrays.update({f'column.{name}': values for name, values in self.columns.items()})
+        arrays.update({f'override.{name}': values for name, values in self.overrides.items()})
+        # Écriture dans un fichier temporaire puis renommage, comme les blocs de f1_store
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != CHECKPOINT_VERSION:
+                raise ValueError(f"Version de point de reprise non prise en charge : {meta['version']}")
+            columns = {key.split('.', 1)[1]: data[key] for key in data.files if key.startswith('column.')}
+            overrides = {key.split('.', 1)[1]: data[key] for key in data.files if key.startswith('override.')}
+            best_laps = data['best_laps']
+        seed = None
+        if meta['seed'] is not None:
+            seed = np.random.SeedSequence(meta['seed']['entropy'], spawn_key=tuple(meta['seed']['spawn_key']))
+        return cls(meta['names'], meta['track_names'], meta['next_race'], columns, overrides, meta['teams'],
+                   best_laps, seed)
@@ -0,0 +1,514 @@
+# f1_cli.py
+
+import argparse
+import json
+import re
+import sys
+
+from f1_checkpoint import SeasonCheckpoint
+from f1_engine import SeasonSimulator
+from f1_export import exporter_for
+from f1_log import LOG_LEVELS, LogSink
+from f1_model import drivers, tracks
+from f1_parallel import predict_championship, predict_race_parallel, run_seasons
+from f1_prediction import CalendarForecast, predict_race
+from f1_race import FIDELITIES, PIT_STOP_TIME
+from f1_scenarios import Scenario, scenario_grid, sweep_race, sweep_seasons
+from f1_scoring import POINTS_TABLES, FinishingOrders, PointsTable, rescore
+from f1_store import ResultStore
+from f1_strategy import StrategyModel, driver_lap_times, parse_weather, weather_variants
+from f1_profile import Profiler
+
+
+def strip_html(message):
+    return re.sub(r'<[^>]+>', '', message)
+
+
+def print_log(messages):
+    lines = [text for text in map(strip_html, messages) if text]
+    if lines:
+        print('\n'.join(lines))
+
+
+def select_by_name(items, names):
+    if not names:
+        return list(items)
+    wanted = [name.strip() for name in names.split(',')]
+    by_name = {item.name: item for item in items}
+    unknown = [name for name in wanted if name not in by_name]
+    if unknown:
+        raise SystemExit(f"Inconnu(s) : {', '.join(unknown)}")
+    return [by_name[name] for name in wanted]
+
+
+def load_checkpoint(path):
+    try:
+        return SeasonCheckpoint.load(path)
+    except (OSError, KeyError, ValueError) as error:
+        raise SystemExit(f'Point de reprise illisible : {error}')
+
+
+def checkpoint_selection(checkpoint):
+    # Pilotes et calendrier complet du point de reprise
+    by_name = {track.name: track for track in tracks}
+    unknown = [name for name in checkpoint.track_names if name not in by_name]
+    if unknown:
+        raise SystemExit(f"Inconnu(s) : {', '.join(unknown)}")
+    names = set(checkpoint.names)
+    return [driver for driver in drivers if driver.name in names], [by_name[name] for name in checkpoint.track_names]
+
+
+def selection(args):
+    # (pilotes, circuits, point de reprise) : ceux du point de reprise avec --resume, sinon --drivers / --tracks
+    if getattr(args, 'resume', None):
+        checkpoint = load_checkpoint(args.resume)
+        return checkpoint_selection(checkpoint) + (checkpoint,)
+    return select_by_name(drivers, args.drivers), select_by_name(tracks, args.tracks), None
+
+
+def run_season(args):
+    selected_drivers, selected_tracks, checkpoint = selection(args)
+    # Une reprise rejoue la saison interrompue avec sa propre graine, sauf --seed explicite
+    seed = args.seed if args.seed is not None or checkpoint is None else checkpoint.seed
+
+    level = 'lap' if args.verbose else args.log_level
+    profiler = Profiler(enabled=args.profile or args.cprofile or bool(args.profile_json), cprofile=args.cprofile)
+    recorders = []
+    season_index = 0
+    if args.store:
+        store = ResultStore.create(args.store, [driver.name for driver in selected_drivers],
+                                   [track.name for track in selected_tracks])
+        # Une saison ajoutée à un stockage existant prend le prochain numéro libre, réservé
+        season_index = store.reserve_seasons()
+        recorders.append(store.writer(prefix=f'season-{season_index:09d}'))
+    if args.export:
+        try:
+            recorders.append(exporter_for(args.export))
+        except ValueError as error:
+            raise SystemExit(str(error))
+    simulator = SeasonSimulator(selected_drivers, selected_tracks, seed=seed,
+                                log=LogSink(print_log, LOG_LEVELS[level]), profiler=profiler,
+                                fidelity=args.fidelity, recorders=recorders, season_index=season_index)
+    forecast = None
+    if args.forecast:
+        # Sur les pilotes et circuits du simulateur : forme, améliorations et météo de la saison simulée
+        forecast = CalendarForecast(simulator.drivers, simulator.tracks, k=args.forecast)
+        simulator.recorders.append(forecast)
+    try:
+        if checkpoint is not None:
+            simulator.restore(checkpoint)
+        result = simulator.run(stop_after=args.stop_after)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    finally:
+        for recorder in recorders:
+            recorder.close()
+    if args.checkpoint:
+        simulator.checkpoint().save(args.checkpoint)
+
+    # Le profil va sur la sortie d'erreur pour ne pas se mêler au JSON des résultats
+    if args.profile or args.cprofile:
+        print(profiler.report(), file=sys.stderr)
+    if args.cprofile:
+        print(profiler.cprofile_stats(), file=sys.stderr)
+    if args.profile_json:
+        profiler.dump(args.profile_json)
+
+    if args.json:
+        output = result.to_dict()
+        if forecast is not None:
+            output['forecasts'] = forecast.to_dict()
+        json.dump(output, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print('CLASSEMENT FINAL - Points:')
+    for row in result.standings:
+        print(f"{row['position']:>2}. {row['name']} - {row['team']} - Points: {row['points']}")
+    if forecast is not None and forecast.rounds:
+        print('\nFAVORIS DE LA COURSE SUIVANTE (score pondéré):')
+        for entry in forecast.rounds:
+            if entry['forecast']:
+                following = entry['forecast'][0]
+                names = ', '.join(driver['name'] for driver in following['favourites'])
+                print(f"Après {entry['track']} -> {following['track']} : {names}")
+    return 0
+
+
+def run_prediction(args):
+    selected_drivers = select_by_name(drivers, args.drivers)
+    track = select_by_name(tracks, args.track)[0]
+
+    if args.workers and args.workers > 1:
+        prediction = predict_race_parallel(selected_drivers, track, samples=args.samples, seed=args.seed,
+                                           workers=args.workers, fidelity=args.fidelity, target=args.target)
+    else:
+        prediction = predict_race(selected_drivers, track, samples=args.samples, seed=args.seed,
+                                  fidelity=args.fidelity, target=args.target)
+
+    if args.json:
+        json.dump(prediction.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f'PRÉDICTION - {track.name} ({prediction.samples} simulations):')
+    if args.target is not None:
+        print_convergence(prediction, prediction.samples, args.samples)
+    for row in prediction.probabilities():
+        low, high = row['win_ci']
+        print(f"{row['name']:<20} Victoire: {row['win']:6.2%} [{low:6.2%} - {high:6.2%}]  "
+              f"Podium: {row['podium']:6.2%}  Points: {row['points']:6.2%}")
+    return 0
+
+
+def print_convergence(result, used, budget):
+    # Arrêt adaptatif : précision atteinte sur le favori, ou budget épuisé
+    status = 'atteinte' if result.converged else 'non atteinte (budget épuisé)'
+    print(f'Précision ±{result.target:.2%} {status} : ±{result.half_width:.2%} '
+          f'après {used} / {budget} tirages')
+
+
+def run_checkpoint(args):
+    selected_drivers = select_by_name(drivers, args.drivers)
+    selected_tracks = select_by_name(tracks, args.tracks)
+    try:
+        with open(args.standings, encoding='utf-8') as file:
+            data = json.load(file)
+        simulator = SeasonSimulator(selected_drivers, selected_tracks)
+        simulator.start_from_standings(args.completed, data.get('drivers', {}), data.get('teams'))
+        simulator.checkpoint().save(args.output)
+    except (OSError, ValueError) as error:
+        raise SystemExit(f'Classement invalide : {error}')
+    print(f'Point de reprise écrit dans {args.output} : {args.completed} courses disputées sur {len(selected_tracks)}')
+    return 0
+
+
+def points_tables(args):
+    # Barèmes prédéfinis choisis par --tables, puis barèmes personnalisés --points-table
+    names = [name.strip() for name in args.tables.split(',')] if args.tables else list(POINTS_TABLES)
+    unknown = [name for name in names if name not in POINTS_TABLES]
+    if unknown:
+        raise SystemExit(f"Barème(s) inconnu(s) : {', '.join(unknown)} (disponibles : {', '.join(POINTS_TABLES)})")
+    tables = [POINTS_TABLES[name] for name in names]
+    try:
+        tables += [PointsTable.parse(text) for text in args.points_table or []]
+    except ValueError as error:
+        raise SystemExit(str(error))
+    return tables
+
+
+def print_rescore(result):
+    report = result.to_dict()
+    print(f"BARÈMES - {report['seasons']} saisons, champions comparés au barème « {report['tables'][0]['name']} »:")
+    for table in report['tables']:
+        leaders = ', '.join(f"{row['name']} {row['title_probability']:.1%}" for row in table['drivers'][:3])
+        print(f"{table['name']:<22} Champion différent: {table['champion_changes']:6.2%}  Titres: {leaders}")
+
+
+def run_rescore(args):
+    store = ResultStore(args.store)
+    teams = {driver.name: driver.team for driver in drivers}
+    store_teams = [teams.get(name) for name in store.drivers]
+    orders = FinishingOrders.from_store(store, None if None in store_teams else store_teams, season=args.season)
+    result = rescore(orders, points_tables(args))
+
+    if args.json:
+        json.dump(result.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print_rescore(result)
+    return 0
+
+
+def run_batch(args):
+    if args.rescore and args.resume:
+        # Le point de reprise ne garde que les points du barème actuel, pas les ordres d'arrivée
+        # des courses déjà disputées : les autres barèmes ne peuvent pas être recalculés
+        raise SystemExit('--rescore ne peut pas être combiné avec --resume : les ordres d\'arrivée des courses '
+                         'antérieures au point de reprise ne sont pas enregistrés')
+    selected_drivers, selected_tracks, checkpoint = selection(args)
+    tables = points_tables(args) if args.rescore else None
+
+    if args.target is not None:
+        batch = predict_championship(selected_drivers, selected_tracks, target=args.target, max_seasons=args.seasons,
+                                     seed=args.seed, workers=args.workers, fidelity=args.fidelity,
+                                     store_path=args.store, export_path=args.export, checkpoint=checkpoint,
+                                     keep_orders=tables is not None)
+    else:
+        batch = run_seasons(selected_drivers, selected_tracks, args.seasons, seed=args.seed, workers=args.workers,
+                            fidelity=args.fidelity, store_path=args.store, export_path=args.export,
+                            checkpoint=checkpoint, keep_orders=tables is not None)
+    result = rescore(batch.orders, tables) if tables is not None else None
+
+    if args.json:
+        report = batch.to_dict()
+        if result is not None:
+            report['rescore'] = result.to_dict()
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f'BILAN SUR {batch.seasons} SAISONS ({batch.races} courses):')
+    if checkpoint is not None:
+        print(f'À partir du classement après {checkpoint.next_race} courses sur {len(selected_tracks)}')
+    if args.target is not None:
+        print_convergence(batch, batch.seasons, args.seasons)
+    for position, row in enumerate(batch.standings(), start=1):
+        print(f"{position:>2}. {row['name']:<20} Points moyens: {row['mean_points']:7.2f} "
+              f"(± {row['std_points']:6.2f}, médiane {row['points_p50']:6.1f})  Titres: {row['title_probability']:6.2%}  "
+              f"Top 3: {row['top3_probability']:6.2%}  Incidents: {row['incidents']}")
+    print('CONSTRUCTEURS - Titres:')
+    for row in batch.constructors():
+        print(f"{row['team']:<20} {row['title_probability']:6.2%}")
+    if result is not None:
+        print_rescore(result)
+    return 0
+
+
+def run_query(args):
+    store = ResultStore(args.store)
+    filters = {
+        'track': select_by_name(tracks, args.track)[0].name if args.track else None,
+        'weather': args.weather,
+        'condition': args.condition,
+        'season': args.season,
+    }
+    count = store.count(**filters)
+    wins = store.wins(**filters)
+
+    if args.json:
+        json.dump({'races': count, 'wins': wins}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f'{count} COURSES RETENUES - Victoires:')
+    for name, total in sorted(wins.items(), key=lambda item: item[1], reverse=True):
+        if total:
+            print(f'{name:<20} {total:>8}  ({total / count:6.2%})')
+    return 0
+
+
+def load_scenarios(path):
+    # Liste de scénarios, ou {"grid": [axe, axe...]} dont chaque axe est une liste de scénarios à combiner
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        return scenario_grid(*[[Scenario.from_dict(item) for item in axis] for axis in data['grid']])
+    return [Scenario.from_dict(item) for item in data]
+
+
+def run_sweep(args):
+    selected_drivers = select_by_name(drivers, args.drivers)
+    try:
+        scenarios = load_scenarios(args.scenarios)
+        if args.track:
+            track = select_by_name(tracks, args.track)[0]
+            sweep = sweep_race(selected_drivers, track, scenarios, samples=args.samples, seed=args.seed,
+                               fidelity=args.fidelity)
+        else:
+            sweep = sweep_seasons(selected_drivers, select_by_name(tracks, args.tracks), scenarios,
+                                  seasons=args.seasons, seed=args.seed, fidelity=args.fidelity)
+    except (OSError, KeyError, ValueError) as error:
+        raise SystemExit(f'Scénarios invalides : {error}')
+
+    if args.json:
+        json.dump(sweep.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    unit = 'courses' if sweep.kind == 'race' else 'saisons'
+    event = 'Victoire' if sweep.kind == 'race' else 'Titre'
+    print(f'SCÉNARIOS - {sweep.samples} {unit} par scénario, écarts avec « {sweep.scenario_names[0]} »:')
+    for scenario in sweep.scenarios()[1:]:
+        reduction = scenario['variance_reduction']
+        reduction = f'variance divisée par {reduction:.1f}' if reduction else 'aucun écart'
+        print(f"\n{scenario['name']} ({reduction})")
+        rows = sorted(scenario['drivers'], key=lambda row: abs(row['delta_points']), reverse=True)
+        for row in rows[:args.top]:
+            print(f"{row['name']:<20} Points: {row['delta_points']:+7.2f} ± {1.96 * row['delta_points_se']:5.2f}  "
+                  f"{event}: {row['delta_win']:+7.2%} ± {1.96 * row['delta_win_se']:6.2%}")
+    return 0
+
+
+def format_stints(strategy):
+    return ' -> '.join(f'{compound} ({laps})' for compound, laps in strategy.stints)
+
+
+def run_strategy(args):
+    track = select_by_name(tracks, args.track)[0]
+    base_lap_time = None
+    if args.driver:
+        base_lap_time = driver_lap_times(select_by_name(drivers, args.driver)[0], track)
+    try:
+        if args.weather:
+            model = StrategyModel(track, parse_weather(args.weather, track.laps), base_lap_time,
+                                  pit_time=args.pit_time)
+            variants = {args.weather: {'optimal': model.optimize(), 'personalities': {}}}
+        else:
+            variants = weather_variants(track, base_lap_time, pit_time=args.pit_time)
+    except ValueError as error:
+        raise SystemExit(str(error))
+
+    if args.json:
+        json.dump({weather: {'optimal': variant['optimal'].to_dict(),
+                             'personalities': {personality: strategy.to_dict()
+                                               for personality, strategy in variant['personalities'].items()}}
+                   for weather, variant in variants.items()}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f'STRATÉGIE - {track.name} ({track.laps} tours, arrêt : {args.pit_time:g} s):')
+    for weather, variant in variants.items():
+        optimal = variant['optimal']
+        print(f"{weather:<10} {format_stints(optimal)}  Arrêts: {optimal.stops}  Temps: {optimal.total_time:.1f} s")
+        for personality, strategy in variant['personalities'].items():
+            print(f"{'':<10} {personality:<11} {format_stints(strategy)}  "
+                  f"(+{strategy.total_time - optimal.total_time:.1f} s)")
+    return 0
+
+
+def add_fidelity_argument(parser):
+    parser.add_argument('--fidelity', choices=FIDELITIES, default='detailed',
+                        help='Temps de course tour par tour (detailed), tirés directement (fast), '
+                             'ou course à événements communs : météo, Safety Car, arrêts (events)')
+
+
+def positive_float(text):
+    value = float(text)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f'doit être strictement positif : {text}')
+    return value
+
+
+def add_target_argument(parser, subject):
+    parser.add_argument('--target', type=positive_float, default=None,
+                        help=f'Arrêt adaptatif : demi-largeur visée de l\'intervalle de confiance à 95 %% {subject} '
+                             '(p. ex. 0.005 pour ±0,5 %%)')
+
+
+def add_points_table_arguments(parser):
+    parser.add_argument('--tables', default=None,
+                        help=f"Barèmes prédéfinis séparés par des virgules (tous par défaut : {', '.join(POINTS_TABLES)})")
+    parser.add_argument('--points-table', action='append', default=None,
+                        help='Barème personnalisé nom=25,18,15[+1] (le +1 : point du meilleur tour), répétable')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Simulateur de Saison de Formule 1 (sans interface graphique)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    season = subparsers.add_parser('season', help='Simuler une saison complète')
+    season.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+    season.add_argument('--drivers', default=None, help='Noms des pilotes séparés par des virgules (tous par défaut)')
+    season.add_argument('--tracks', default=None, help='Noms des circuits séparés par des virgules (tous par défaut)')
+    season.add_argument('--json', action='store_true', help='Écrire les résultats complets en JSON')
+    season.add_argument('--log-level', choices=list(LOG_LEVELS), default='off',
+                        help='Verbosité du journal : off, summary, race ou lap')
+    season.add_argument('--verbose', action='store_true', help='Journal complet (équivaut à --log-level lap)')
+    season.add_argument('--profile', action='store_true', help='Afficher le temps passé dans chaque phase')
+    season.add_argument('--profile-json', default=None, help='Fichier JSON où écrire les compteurs par phase')
+    season.add_argument('--cprofile', action='store_true', help='Profil cProfile complet de la saison')
+    season.add_argument('--store', default=None, help='Répertoire de stockage en colonnes où ajouter les courses')
+    season.add_argument('--export', default=None,
+                        help='Exporter chaque course au fil de l\'eau (.csv, .jsonl, suivis de .gz pour compresser)')
+    season.add_argument('--stop-after', type=int, default=None,
+                        help='Mettre la saison en pause après ce nombre de courses (avec --checkpoint)')
+    season.add_argument('--checkpoint', default=None, help='Fichier .npz où écrire le point de reprise final')
+    season.add_argument('--resume', default=None, help='Reprendre la saison depuis un point de reprise .npz')
+    season.add_argument('--forecast', type=int, default=None,
+                        help='Après chaque course, les N favoris (score pondéré) de chaque course restante')
+    add_fidelity_argument(season)
+    season.set_defaults(func=run_season)
+
+    predict = subparsers.add_parser('predict', help='Probabilités de victoire par simulation Monte Carlo')
+    predict.add_argument('track', help='Nom du circuit')
+    predict.add_argument('--samples', type=int, default=100000, help='Nombre de courses simulées')
+    predict.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+    predict.add_argument('--drivers', default=None, help='Noms des pilotes séparés par des virgules (tous par défaut)')
+    predict.add_argument('--workers', type=int, default=None, help='Nombre de processus (1 par défaut)')
+    predict.add_argument('--json', action='store_true', help='Écrire les probabilités en JSON')
+    add_target_argument(predict, 'de la probabilité de victoire du favori ; --samples devient le budget')
+    add_fidelity_argument(predict)
+    predict.set_defaults(func=run_prediction)
+
+    batch = subparsers.add_parser('batch', help='Simuler de nombreuses saisons en parallèle')
+    batch.add_argument('--seasons', type=int, default=100, help='Nombre de saisons')
+    batch.add_argument('--workers', type=int, default=None, help='Nombre de processus (tous les cœurs par défaut)')
+    batch.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+    batch.add_argument('--drivers', default=None, help='Noms des pilotes séparés par des virgules (tous par défaut)')
+    batch.add_argument('--tracks', default=None, help='Noms des circuits séparés par des virgules (tous par défaut)')
+    batch.add_argument('--json', action='store_true', help='Écrire l\'agrégat en JSON')
+    add_target_argument(batch, 'de la probabilité de titre du favori ; --seasons devient le budget')
+    batch.add_argument('--resume', default=None,
+                       help='Point de reprise .npz : seules les courses restantes de chaque saison sont simulées')
+    batch.add_argument('--rescore', action='store_true',
+                       help='Recalculer les championnats sous d\'autres barèmes (voir --tables, --points-table)')
+    add_points_table_arguments(batch)
+    batch.add_argument('--store', default=None, help='Répertoire de stockage en colonnes où ajouter les courses')
+    batch.add_argument('--export', default=None,
+                       help='Exporter chaque course au fil de l\'eau, un fichier par processus '
+                            '(.csv, .jsonl, suivis de .gz pour compresser)')
+    add_fidelity_argument(batch)
+    batch.set_defaults(func=run_batch)
+
+    checkpoint = subparsers.add_parser('checkpoint', help='Créer un point de reprise à partir d\'un classement réel')
+    checkpoint.add_argument('standings', help='Fichier JSON {"drivers": {pilote: {"points", "form", "incidents", '
+                                              '"car_performance"}}, "teams": {équipe: {"upgrade_level", "budget"}}}')
+    checkpoint.add_argument('output', help='Fichier .npz à écrire')
+    checkpoint.add_argument('--completed', type=int, required=True, help='Nombre de courses déjà disputées')
+    checkpoint.add_argument('--drivers', default=None,
+                            help='Noms des pilotes séparés par des virgules (tous par défaut)')
+    checkpoint.add_argument('--tracks', default=None,
+                            help='Calendrier complet, noms séparés par des virgules (tous par défaut)')
+    checkpoint.set_defaults(func=run_checkpoint)
+
+    sweep = subparsers.add_parser('sweep', help='Comparer des scénarios « et si ? » à nombres aléatoires communs')
+    sweep.add_argument('scenarios', help='Fichier JSON des scénarios (liste, ou {"grid": [...]} pour un produit d\'axes)')
+    sweep.add_argument('--track', default=None,
+                       help='Circuit : compare des week-ends de course (sinon des saisons complètes)')
+    sweep.add_argument('--samples', type=int, default=10000, help='Courses simulées par scénario (avec --track)')
+    sweep.add_argument('--seasons', type=int, default=100, help='Saisons simulées par scénario (sans --track)')
+    sweep.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+    sweep.add_argument('--drivers', default=None, help='Noms des pilotes séparés par des virgules (tous par défaut)')
+    sweep.add_argument('--tracks', default=None, help='Noms des circuits séparés par des virgules (tous par défaut)')
+    sweep.add_argument('--top', type=int, default=5, help='Pilotes affichés par scénario (plus grands écarts)')
+    sweep.add_argument('--json', action='store_true', help='Écrire les écarts en JSON')
+    add_fidelity_argument(sweep)
+    sweep.set_defaults(func=run_sweep)
+
+    query = subparsers.add_parser('query', help='Interroger un stockage de résultats')
+    query.add_argument('store', help='Répertoire de stockage')
+    query.add_argument('--track', default=None, help='Nom du circuit')
+    query.add_argument('--weather', default=None, help='Météo au départ : dry, rainy ou humid')
+    query.add_argument('--condition', default=None, help='État de piste : standard, wet ou slick')
+    query.add_argument('--season', type=int, default=None, help='Numéro de saison')
+    query.add_argument('--json', action='store_true', help='Écrire le résultat en JSON')
+    query.set_defaults(func=run_query)
+
+    rescore_parser = subparsers.add_parser('rescore', help='Recalculer les championnats d\'un stockage sous d\'autres barèmes')
+    rescore_parser.add_argument('store', help='Répertoire de stockage')
+    rescore_parser.add_argument('--season', type=int, default=None, help='Numéro de saison')
+    rescore_parser.add_argument('--json', action='store_true', help='Écrire les résultats en JSON')
+    add_points_table_arguments(rescore_parser)
+    rescore_parser.set_defaults(func=run_rescore)
+
+    strategy = subparsers.add_parser('strategy', help='Stratégie d\'arrêts optimale (programmation dynamique)')
+    strategy.add_argument('track', help='Nom du circuit')
+    strategy.add_argument('--weather', default=None,
+                          help='Météo de la course, p. ex. dry ou dry:30,rainy (par défaut : chaque météo, '
+                               'comparée aux stratégies des personnalités)')
+    strategy.add_argument('--driver', default=None, help='Allure de ce pilote (par défaut : record du circuit)')
+    strategy.add_argument('--pit-time', type=float, default=PIT_STOP_TIME, help='Durée d\'un arrêt, en secondes')
+    strategy.add_argument('--json', action='store_true', help='Écrire les stratégies en JSON')
+    strategy.set_defaults(func=run_strategy)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
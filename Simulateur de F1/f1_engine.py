@@ -0,0 +1,473 @@
+# f1_engine.py
+
+import copy
+import threading
+
+import numpy as np
+
+from f1_checkpoint import STATE_COLUMNS, SeasonCheckpoint
+from f1_log import LOG_LAP, LOG_RACE, LOG_SUMMARY, LogSink
+from f1_model import POINTS_DISTRIBUTION, TIRE_TYPES, SeasonState, Team
+from f1_profile import Profiler
+from f1_race import MINOR_INCIDENT_TIME, RaceField, RaceIncidents, simulate_qualifying, simulate_race
+from f1_stats import SeasonAggregator
+
+
+# Meilleur tour affiché pour un pilote ayant abandonné (résultats et exports)
+DNF_FASTEST_LAP = 9999
+
+
+def format_race_time(race_time):
+    total_seconds = int(race_time)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f'{hours}:{minutes:02}:{seconds:02}'
+
+
+def seed_to_dict(seed_sequence):
+    if seed_sequence is None:
+        return None
+    return {'entropy': seed_sequence.entropy, 'spawn_key': list(seed_sequence.spawn_key)}
+
+
+class RaceResult:
+    def __init__(self, track, weather, condition, grid, classification,
+                 fastest_lap_driver, incidents, safety_car, seed=None):
+        self.seed = seed  # SeedSequence de la course, pour la rejouer à l'identique
+        self.track = track
+        self.weather = weather
+        self.condition = condition
+        self.grid = grid  # Noms des pilotes dans l'ordre de départ
+        self.classification = classification  # Liste de dicts, du P1 au dernier
+        self.fastest_lap_driver = fastest_lap_driver
+        self.incidents = incidents
+        self.safety_car = safety_car
+
+    def to_dict(self):
+        return {
+            'track': self.track,
+            'weather': self.weather,
+            'condition': self.condition,
+            'grid': self.grid,
+            'classification': self.classification,
+            'fastest_lap_driver': self.fastest_lap_driver,
+            'incidents': self.incidents,
+            'safety_car': self.safety_car,
+            'seed': seed_to_dict(self.seed),
+        }
+
+
+class SeasonResult:
+    def __init__(self, seed, races, drivers_ranked, fastest_laps, incidents, cancelled=False, stats=None):
+        self.seed = seed
+        self.cancelled = cancelled  # Saison interrompue avant la dernière course
+        self.races = races
+        self.drivers_ranked = drivers_ranked
+        self.fastest_laps = fastest_laps
+        self.incidents = incidents
+        self.stats = stats  # SeasonAggregator de la saison (voir f1_stats), fusionnable entre saisons
+
+    @property
+    def standings(self):
+        return [{'position': position + 1, 'name': driver.name, 'team': driver.team,
+                 'points': driver.points}
+                for position, driver in enumerate(self.drivers_ranked)]
+
+    def to_dict(self):
+        return {
+            'seed': seed_to_dict(self.seed),
+            'cancelled': self.cancelled,
+            'standings': self.standings,
+            'fastest_laps': self.fastest_laps,
+            'incidents': self.incidents,
+            'races': [race.to_dict() for race in self.races],
+        }
+
+
+class SeasonSimulator:
+    def __init__(self, drivers, tracks, seed=None, log=None, progress=None, profiler=None, fidelity='detailed',
+                 recorders=(), season_index=0, tire_types=TIRE_TYPES, team_settings=None):
+        # `log` : LogSink (voir f1_log), ou callback recevant chaque message HTML
+        # La simulation travaille sur son propre état et ses propres copies de circuits :
+        # les pilotes et circuits de base ne sont jamais modifiés
+        self.state, self.drivers = SeasonState.for_drivers(list(drivers))
+        self.tracks = [copy.copy(track) for track in tracks]
+        # Graine entière ou SeedSequence ; chaque course reçoit son propre flux dérivé
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed = seed
+        else:
+            self.seed = np.random.SeedSequence(seed)
+        if log is None or isinstance(log, LogSink):
+            self.sink = log or LogSink()
+        else:
+            self.sink = LogSink.per_message(log)
+        self.progress_callback = progress  # Reçoit (course courante, nombre de courses)
+        # Compteurs par phase (voir f1_profile) ; désactivés par défaut
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.fidelity = fidelity  # Fidélité du calcul des temps de course (voir f1_race.simulate_race)
+        # Objets recevant chaque course terminée par append(course, saison, manche) : StoreWriter (f1_store),
+        # exportateurs (f1_export)... Leur flush ou leur fermeture reste à la charge de l'appelant.
+        self.recorders = list(recorders)
+        self.season_index = season_index
+        self.tire_types = tire_types  # Durées de vie des pneus (voir f1_race.pit_intervals)
+        self.team_settings = team_settings or {}  # Nom d'équipe -> paramètres de Team (budget, upgrade_cost...)
+        self.stats = None  # SeasonAggregator de la saison en cours
+        self.started = False  # Saison initialisée (par run, restore ou start_from_standings)
+        self.next_race = 0  # Nombre de courses déjà disputées
+        self.rng = np.random.default_rng(self.seed)
+        self.cancel_requested = threading.Event()
+
+    def cancel(self):
+        # Peut être appelé depuis un autre thread : la saison s'arrête avant la course suivante
+        self.cancel_requested.set()
+
+    def log(self, level, message, *args):
+        # Le message n'est formaté (et son temps compté dans la phase 'logging') que si son niveau est actif
+        if self.sink.enabled(level):
+            with self.profiler.phase('logging'):
+                self.sink.log(level, message, *args)
+
+    def race_seed(self, race_index):
+        # Flux de la course `race_index`, indépendant de celui des autres courses
+        return np.random.SeedSequence(self.seed.entropy, spawn_key=self.seed.spawn_key + (race_index,))
+
+    def reset_season(self):
+        # Début de saison : points, forme et compteurs à zéro, équipes sans amélioration
+        for driver in self.drivers:
+            driver.points = 0
+            driver.last_race_time = 0
+            driver.fastest_lap = float('inf')
+            driver.form = 1.0
+            driver.incidents = 0
+            driver.penalties = 0
+            driver.position = 0
+            driver.safety_car_affected = False
+            driver.status = 'active'
+
+        teams = self.state.teams = {}
+        for driver in self.drivers:
+            if driver.team not in teams:
+                teams[driver.team] = Team(driver.team, **self.team_settings.get(driver.team, {}))
+
+        # Statistiques pour l'analyse post-course, mises à jour après chaque course
+        self.stats = SeasonAggregator([driver.name for driver in self.drivers], [track.name for track in self.tracks])
+        self.next_race = 0
+        self.started = True
+
+    def checkpoint(self):
+        # État de la saison après les courses déjà disputées (voir f1_checkpoint)
+        if not self.started:
+            self.reset_season()
+        rows = [driver.index for driver in self.drivers]
+        best_laps = self.stats.best_laps[[self.stats.driver_index[driver.name] for driver in self.drivers]]
+        return SeasonCheckpoint(
+            [driver.name for driver in self.drivers], [track.name for track in self.tracks], self.next_race,
+            {column: getattr(self.state, column)[rows].copy() for column in STATE_COLUMNS},
+            {column: values[rows].copy() for column, values in self.state.overrides.items()},
+            {name: {'upgrade_level': team.upgrade_level, 'budget': team.budget, 'upgrade_cost': team.upgrade_cost,
+                    'upgrade_step': team.upgrade_step} for name, team in self.state.teams.items()},
+            best_laps, self.seed)
+
+    def restore(self, checkpoint):
+        # Reprend la saison là où `checkpoint` l'a laissée ; la graine de la simulation est conservée,
+        # si bien qu'une même reprise peut servir de point de départ à de nombreuses fins de saison
+        checkpoint.check_tracks([track.name for track in self.tracks])
+        checkpoint.check_drivers([driver.name for driver in self.drivers])
+        self.reset_season()
+        # Les pilotes reprennent l'ordre de la dernière grille, dont dépend l'ordre des tirages
+        by_name = {driver.name: driver for driver in self.drivers}
+        self.drivers = [by_name[name] for name in checkpoint.names]
+        rows = [driver.index for driver in self.drivers]
+        for column, values in checkpoint.columns.items():
+            getattr(self.state, column)[rows] = values
+        for column, values in checkpoint.overrides.items():
+            self.state.writable(column)[rows] = values
+        for name, settings in checkpoint.teams.items():
+            if name in self.state.teams:
+                team = self.state.teams[name]
+                for attribute, value in settings.items():
+                    setattr(team, attribute, value)
+        self.stats.best_laps[[self.stats.driver_index[name] for name in checkpoint.names]] = checkpoint.best_laps
+        self.next_race = checkpoint.next_race
+
+    def start_from_standings(self, completed_races, standings, teams=None):
+        # Saison réelle en cours : `completed_races` courses disputées, `standings` donnant pour chaque pilote
+        # ses points et, au besoin, sa forme, ses incidents et sa performance de voiture. Les améliorations des
+        # équipes suivent le même calendrier que dans la simulation, sauf valeurs données dans `teams`
+        # (nom d'équipe -> upgrade_level, budget...).
+        if not 0 <= completed_races <= len(self.tracks):
+            raise ValueError(f'Nombre de courses disputées hors calendrier : {completed_races}')
+        self.reset_season()
+        for _ in range(completed_races):
+            for team in self.state.teams.values():
+                team.develop_upgrades()
+            for driver in self.drivers:
+                self.state.teams[driver.team].apply_upgrades(driver)
+        by_name = {driver.name: driver for driver in self.drivers}
+        for name, values in standings.items():
+            if name not in by_name:
+                raise ValueError(f'Pilote inconnu : {name}')
+            for attribute in ('points', 'form', 'incidents', 'car_performance'):
+                if attribute in values:
+                    setattr(by_name[name], attribute, values[attribute])
+        for name, settings in (teams or {}).items():
+            if name not in self.state.teams:
+                raise ValueError(f'Équipe inconnue : {name}')
+            for attribute, value in settings.items():
+                setattr(self.state.teams[name], attribute, value)
+        self.next_race = completed_races
+
+    def run(self, stop_after=None):
+        # `stop_after` : nombre de courses disputées après lequel la saison est mise en pause ;
+        # un nouvel appel à run() la reprend là où elle s'est arrêtée
+        self.profiler.start_season()
+        if not self.started:
+            self.log(LOG_SUMMARY, '<h2>**** Début de la Simulation ****</h2>')
+            self.reset_season()
+        teams = self.state.teams
+
+        total_races = len(self.tracks)
+        last_race = total_races if stop_after is None else min(stop_after, total_races)
+
+        races = []
+        drivers_ranked = sorted(self.drivers, key=lambda dr: dr.points, reverse=True)
+        for current_race, track in enumerate(self.tracks[self.next_race:last_race], start=self.next_race + 1):
+            if self.cancel_requested.is_set():
+                self.log(LOG_SUMMARY, '<b>*** Simulation annulée ***</b>')
+                break
+
+            if self.progress_callback is not None:
+                self.progress_callback(current_race, total_races)
+
+            race_seed = self.race_seed(current_race - 1)
+            races.append(self.simulate_race(track, teams, race_seed))
+            self.next_race = current_race
+            with self.profiler.phase('recording'):
+                for recorder in self.recorders:
+                    recorder.append(races[-1], self.season_index, current_race - 1)
+
+            # Trier les pilotes en fonction des points pour le classement
+            with self.profiler.phase('sorting_points'):
+                self.stats.add_race(races[-1])
+                drivers_ranked = sorted(self.drivers, key=lambda dr: dr.points, reverse=True)
+
+            # Afficher le classement (seul le dernier apparaît au niveau résumé)
+            level = LOG_SUMMARY if current_race == total_races else LOG_RACE
+            if self.sink.enabled(level):
+                self.log(level, '<b>-------------------</b>')
+                self.log(level, '<b>CLASSEMENT - Points:</b>')
+                for position, driver in enumerate(drivers_ranked):
+                    self.log(level, '<b>{}. {} - {} - Points: {}</b>', position + 1, driver.name,
+                             driver.team, driver.points)
+            self.profiler.end_race(track.name)
+
+        with self.profiler.phase('logging'):
+            self.sink.flush()
+        self.profiler.end_season()
+        # Une saison en pause n'est pas encore comptée dans les statistiques de fin de saison
+        paused = self.next_race < total_races and not self.cancel_requested.is_set()
+        if not paused:
+            self.stats.end_season(drivers_ranked)
+        incidents = {driver.name: driver.incidents for driver in self.drivers}
+        incidents = {name: incidents[name] for name in self.stats.names}
+        return SeasonResult(self.seed, races, drivers_ranked, self.stats.best_lap_dict(), incidents,
+                            cancelled=self.next_race < total_races, stats=self.stats)
+
+    def simulate_race(self, track, teams, seed=None):
+        seed = self.race_seed(0) if seed is None else seed
+        rng = np.random.default_rng(seed)
+
+        self.log(LOG_RACE, '<hr>')
+        self.log(LOG_RACE, '<h3>## {} - {} Tours ##</h3>', track.name, track.laps)
+
+        # Mise à jour des conditions météorologiques
+        with self.profiler.phase('weather'):
+            track.update_weather_conditions(rng)
+        weather, condition = track.weather, track.condition
+        self.log(LOG_RACE, "<b>Conditions météo:</b> {}, <b>Condition de piste:</b> {}", track.weather, track.condition)
+
+        with self.profiler.phase('upgrades'):
+            # Développement des améliorations par les équipes
+            for team in teams.values():
+                if team.develop_upgrades():
+                    self.log(LOG_RACE, "<i>L'équipe {} a développé une amélioration !</i>", team.name)
+
+            # Application des améliorations aux pilotes
+            for driver in self.drivers:
+                teams[driver.team].apply_upgrades(driver)
+
+        # Réinitialiser les attributs de course pour chaque pilote
+        for driver in self.drivers:
+            driver.last_race_time = 0
+            driver.fastest_lap = float('inf')
+            driver.penalties = 0
+            driver.pit_stops = 0
+            driver.safety_car_affected = False
+            driver.status = 'active'
+
+        # Simuler les qualifications
+        self.log(LOG_RACE, '<b>** Séance de Qualification **</b>')
+        with self.profiler.phase('qualifying'):
+            self.simulate_qualifying_session(self.drivers, track, rng)
+        grid = [driver.name for driver in self.drivers]
+
+        # Tirer les abandons et pénalités de tout le plateau, dans l'ordre de la grille
+        with self.profiler.phase('incidents'):
+            field = RaceField.from_drivers(self.drivers, track)
+            race_incidents = RaceIncidents.sample(field.dnf_percent, rng)
+            dnf, penalties = race_incidents.dnf[0], race_incidents.penalties[0]
+            incidents = []
+            for i in np.flatnonzero(dnf | (penalties > 0)):
+                driver = self.drivers[i]
+                if dnf[i]:
+                    self.retire(driver)
+                    self.log(LOG_RACE, '<b>*DNF {} DNF*</b>', driver.name)
+                    incidents.append({'driver': driver, 'type': 'major'})
+                else:
+                    driver.penalties += int(penalties[i])
+                    self.log(LOG_RACE, '<i>*Pénalité de {} secondes pour {}*</i>', int(penalties[i]), driver.name)
+            field.penalties = field.penalties + penalties
+
+        # Calculer les temps de course de tout le plateau en une seule passe vectorisée
+        with self.profiler.phase('race_time'):
+            starters = np.flatnonzero(~dnf)
+            if len(starters):
+                outcome = simulate_race(field.take(starters), track, rng, tire_types=self.tire_types,
+                                        fidelity=self.fidelity)
+                outcome.apply_weather(track)
+                for lap, kind, detail in outcome.events or []:
+                    if kind == 'weather':
+                        self.log(LOG_LAP, '<i>Tour {} : la météo passe à {}</i>', lap + 1, detail)
+                    elif kind == 'safety_car':
+                        self.log(LOG_RACE, '<b>*Safety Car en piste au tour {} ({} arrêt(s) au stand)*</b>',
+                                 lap + 1, detail)
+                    else:
+                        self.log(LOG_LAP, '<i>Tour {} : fin du Safety Car, relance</i>', lap + 1)
+                # Safety Car sorti en course (fidélité 'events'), en plus de celui des incidents
+                if outcome.safety_car:
+                    track.safety_car_active = True
+                for i, driver in enumerate(self.drivers[j] for j in starters):
+                    driver.last_race_time = float(outcome.race_times[i])
+                    driver.fastest_lap = float(outcome.fastest_laps[i])
+                    driver.pit_stops = int(outcome.pit_stops[i])
+                    driver.incidents += int(outcome.fatigue_incidents[i])
+
+        with self.profiler.phase('incidents'):
+            # Simuler les incidents
+            self.simulate_incidents(self.drivers, track, incidents, max_incidents=2, avg_incidents=1, rng=rng,
+                                    race_incidents=race_incidents)
+
+            # Vérifier si le Safety Car doit être déployé
+            track.check_for_safety_car(incidents)
+            safety_car = track.safety_car_active
+            if safety_car:
+                self.log(LOG_RACE, '<b>*Safety Car déployé !*</b>')
+
+        with self.profiler.phase('sorting_points'):
+            # Trier les pilotes classés en fonction du temps de course, les abandons en fin de classement
+            retired = race_incidents.retired[0]
+            drivers_sorted = sorted([self.drivers[i] for i in np.flatnonzero(~retired)],
+                                    key=lambda dr: dr.last_race_time)
+            dnfs = [self.drivers[i] for i in np.flatnonzero(retired)]
+            race_results = drivers_sorted + dnfs
+
+            # Afficher les résultats de la course
+            self.log(LOG_RACE, '<b>--- Résultats de la Course ---</b>')
+            log_results = self.sink.enabled(LOG_RACE)
+            classification = []
+            for position, driver in enumerate(race_results):
+                finished = position < len(drivers_sorted)
+                if log_results:
+                    with self.profiler.phase('logging'):
+                        format_time = format_race_time(driver.last_race_time) if finished else 'DNF'
+                        self.sink.log(LOG_RACE, '<b>P{}</b> {} - {} * Temps: {} Meilleur Tour: {}',
+                                      position + 1, driver.name, driver.team, format_time, driver.fastest_lap)
+                classification.append({
+                    'position': position + 1,
+                    'name': driver.name,
+                    'team': driver.team,
+                    'time': driver.last_race_time if finished else None,
+                    'fastest_lap': driver.fastest_lap,
+                    'pit_stops': driver.pit_stops,
+                    'status': driver.status,
+                })
+
+                # Ajuster la forme du pilote
+                driver.adjust_form(position + 1)
+
+            # Attribuer les points
+            self.assign_points(drivers_sorted, POINTS_DISTRIBUTION)
+
+            # Identifier le pilote avec le meilleur tour : le premier de la grille parmi les classés
+            fastest_lap_driver = None
+            if drivers_sorted:
+                laps = np.where(retired, np.inf, [driver.fastest_lap for driver in self.drivers])
+                driver = self.drivers[int(np.argmin(laps))]
+                driver.points += 1
+                fastest_lap_driver = driver.name
+                self.log(LOG_RACE, '<b>** Meilleur Tour (+1 point) : {} - {} **</b>', driver.name, driver.fastest_lap)
+
+        # Réinitialiser le Safety Car pour la prochaine course
+        track.safety_car_active = False
+
+        return RaceResult(track.name, weather, condition, grid, classification, fastest_lap_driver,
+                          [{'driver': incident['driver'].name, 'type': incident['type']}
+                           for incident in incidents],
+                          safety_car, seed)
+
+    def simulate_qualifying_session(self, drivers, track, rng=None):
+        rng = self.rng if rng is None else rng
+        # Les trois phases de qualifications en une passe vectorisée (voir f1_race.simulate_qualifying)
+        log_laps = self.sink.enabled(LOG_LAP)
+        grid, times = simulate_qualifying(RaceField.from_drivers(drivers, track), track, rng, return_times=True)
+        for session, session_times in enumerate(times):
+            self.log(LOG_LAP, '<i>--- Q{} ---</i>', session + 1)
+            if log_laps:
+                for driver, time in zip(drivers, session_times):
+                    if not np.isnan(time):
+                        self.log(LOG_LAP, '{} - Temps: {:.3f}', driver.name, time)
+
+        # Définir les positions de départ
+        self.drivers = [drivers[i] for i in grid]
+
+    def simulate_qualifying_lap(self, driver, track, rng=None):
+        rng = self.rng if rng is None else rng
+        # Temps moyen lu dans la table des allures de l'état du pilote
+        avg_qualifying_time = driver.state.pace_table().qualifying_time(driver.index, track)
+        qualifying_time = rng.normal(avg_qualifying_time, 0.05)
+        return qualifying_time
+
+    def assign_points(self, drivers_sorted, points_distribution):
+        # `drivers_sorted` : pilotes classés uniquement, du vainqueur au dernier
+        for i, driver in enumerate(drivers_sorted[:10]):
+            driver.points += points_distribution[i]
+
+    def retire(self, driver):
+        # Abandon : le meilleur tour affiché devient DNF_FASTEST_LAP (le classement repose sur les masques)
+        driver.fastest_lap = DNF_FASTEST_LAP
+        driver.incidents += 1
+        driver.status = 'out'
+
+    def simulate_incidents(self, drivers, track, incidents, max_incidents=2, avg_incidents=1, rng=None,
+                           race_incidents=None):
+        rng = self.rng if rng is None else rng
+        # Incidents parmi les pilotes encore en course, tirés en une passe (voir f1_race.RaceIncidents) ;
+        # sans tirage préalable, les pilotes déjà sortis sont ceux dont le statut est 'out'
+        if race_incidents is None:
+            out = np.array([[driver.status == 'out' for driver in drivers]], dtype=bool)
+            race_incidents = RaceIncidents(out, np.zeros(out.shape, dtype=np.int64))
+        race_incidents.draw_race_incidents(rng, avg_incidents, max_incidents)
+
+        major = race_incidents.major[0]
+        for i in np.flatnonzero(race_incidents.involved[0]):
+            driver = drivers[i]
+            if major[i]:
+                self.log(LOG_RACE, '<b>*Incident majeur pour {} dans cette course*</b>', driver.name)
+                self.retire(driver)
+                incidents.append({'driver': driver, 'type': 'major'})
+            else:
+                self.log(LOG_RACE, '<i>*Incident mineur pour {} dans cette course*</i>', driver.name)
+                driver.last_race_time += MINOR_INCIDENT_TIME
+                driver.incidents += 1
+                incidents.append({'driver': driver, 'type': 'minor'})
+        return race_incidents
@@ -0,0 +1,129 @@
+# f1_export.py
+
+import abc
+import csv
+import gzip
+import io
+import json
+import os
+
+from f1_engine import seed_to_dict
+
+
+# Export en continu des courses : chaque course terminée est formatée en mémoire puis écrite
+# par lots de `flush_races` courses. Les fichiers .gz sont compressés à la volée ; après chaque
+# lot le flux est vidé, si bien qu'une exécution interrompue laisse un fichier lisible.
+FLUSH_RACES = 20
+
+CSV_FIELDS = ['season', 'round', 'track', 'weather', 'condition', 'safety_car', 'seed_entropy', 'seed_spawn_key',
+              'position', 'grid_position', 'name', 'team', 'time', 'fastest_lap', 'pit_stops', 'status',
+              'fastest_lap_award', 'incident']
+
+
+def open_text(path, compress=None):
+    # `compress` : None pour décider d'après l'extension .gz
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class RaceExporter(abc.ABC):
+    # Une sous-classe fournit write_race (et au besoin write_header) ; sans write_race, elle ne s'instancie pas
+    def __init__(self, path, compress=None, flush_races=FLUSH_RACES):
+        self.path = path
+        self.file = open_text(path, compress)
+        self.flush_races = flush_races
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    @abc.abstractmethod
+    def write_race(self, race, season, race_round):
+        pass
+
+    def append(self, race, season=0, race_round=0):
+        # `race` : RaceResult de f1_engine
+        self.write_race(race, season, race_round)
+        self.pending += 1
+        if self.pending >= self.flush_races:
+            self.flush()
+
+    def append_season(self, season_result, season=0):
+        for race_round, race in enumerate(season_result.races):
+            self.append(race, season, race_round)
+
+    def flush(self):
+        data = self.buffer.getvalue()
+        if data:
+            self.file.write(data)
+            self.buffer.seek(0)
+            self.buffer.truncate()
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class JsonLinesExporter(RaceExporter):
+    # Une ligne JSON par course : RaceResult.to_dict() précédé de la saison et de la manche
+    def write_race(self, race, season, race_round):
+        record = {'season': season, 'round': race_round}
+        record.update(race.to_dict())
+        self.buffer.write(json.dumps(record, ensure_ascii=False))
+        self.buffer.write('\n')
+
+
+class CsvExporter(RaceExporter):
+    # Une ligne par pilote et par course, du P1 au dernier
+    def write_header(self):
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(CSV_FIELDS)
+
+    def write_race(self, race, season, race_round):
+        seed = seed_to_dict(race.seed) or {'entropy': '', 'spawn_key': []}
+        spawn_key = '/'.join(str(key) for key in seed['spawn_key'])
+        grid_positions = {name: position for position, name in enumerate(race.grid, start=1)}
+        incidents = {}
+        for incident in race.incidents:
+            incidents.setdefault(incident['driver'], incident['type'])
+        self.writer.writerows(
+            [season, race_round, race.track, race.weather, race.condition, race.safety_car, seed['entropy'],
+             spawn_key, entry['position'], grid_positions.get(entry['name'], ''), entry['name'], entry['team'],
+             '' if entry['time'] is None else entry['time'], entry['fastest_lap'], entry['pit_stops'],
+             entry['status'], entry['name'] == race.fastest_lap_driver, incidents.get(entry['name'], '')]
+            for entry in race.classification)
+
+
+EXPORTERS = {'.csv': CsvExporter, '.jsonl': JsonLinesExporter}
+
+
+def exporter_for(path, flush_races=FLUSH_RACES):
+    # Format choisi d'après l'extension : .csv ou .jsonl, suivie éventuellement de .gz
+    stem = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(stem)[1]
+    if extension not in EXPORTERS:
+        raise ValueError(f"Extension d'export inconnue : {extension or path} (attendu : .csv, .jsonl, .csv.gz ou .jsonl.gz)")
+    return EXPORTERS[extension](path, flush_races=flush_races)
+
+
+def chunk_path(path, first_season):
+    # Fichier d'export propre à un bloc de saisons (un par processus de travail)
+    stem, compression = (path[:-3], '.gz') if path.endswith('.gz') else (path, '')
+    base, extension = os.path.splitext(stem)
+    return f'{base}-{first_season:09d}{extension}{compression}'
@@ -0,0 +1,42 @@
+# f1_log.py
+
+# Niveaux de verbosité du journal de simulation
+LOG_OFF = 0  # Rien n'est formaté ni écrit
+LOG_SUMMARY = 1  # Début et classement final de la saison
+LOG_RACE = 2  # Déroulement et résultats de chaque course
+LOG_LAP = 3  # Détail tour par tour (temps des qualifications)
+
+LOG_LEVELS = {'off': LOG_OFF, 'summary': LOG_SUMMARY, 'race': LOG_RACE, 'lap': LOG_LAP}
+
+
+class LogSink:
+    # Journal tamponné : les messages sont formatés seulement si leur niveau est actif,
+    # accumulés en mémoire puis transmis par lots à `write` (qui reçoit une liste de messages)
+    def __init__(self, write=None, level=LOG_RACE, chunk_size=200):
+        self.write = write
+        self.level = level if write is not None else LOG_OFF
+        self.chunk_size = chunk_size
+        self.buffer = []
+
+    @classmethod
+    def per_message(cls, callback, level=LOG_LAP):
+        # Adapte un callback message par message (ancienne interface de SeasonSimulator)
+        def write(messages):
+            for message in messages:
+                callback(message)
+        return cls(write, level, chunk_size=1)
+
+    def enabled(self, level):
+        return level <= self.level
+
+    def log(self, level, message, *args):
+        if level > self.level:
+            return
+        self.buffer.append(message.format(*args) if args else message)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            messages, self.buffer = self.buffer, []
+            self.write(messages)
@@ -0,0 +1,664 @@
+# f1_model.py
+
+import copy
+
+import numpy as np
+
+
+POINTS_DISTRIBUTION = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+
+TIRE_TYPES = {
+    'Soft': {'durability': 20, 'performance': 1.02},
+    'Medium': {'durability': 30, 'performance': 1.0},
+    'Hard': {'durability': 40, 'performance': 0.98},
+    'Intermediate': {'durability': 25, 'performance': 0.96},
+    'Wet': {'durability': 20, 'performance': 0.94}
+}
+
+# Pilotes avantagés sous la pluie
+RAIN_MASTERS = ['Lewis Hamilton', 'Max Verstappen', 'Fernando Alonso']
+
+PERSONALITIES = ['aggressive', 'defensive', 'balanced']
+TIRE_NAMES = list(TIRE_TYPES)
+STATUSES = ['active', 'out']
+
+WEATHERS = ['dry', 'rainy', 'humid']
+CONDITIONS = ['standard', 'wet', 'slick']
+CONDITION_OFFSETS = {'wet': 5, 'slick': 2}  # Secondes ajoutées au temps moyen au tour
+
+
+class Roster:
+    # Définitions de base d'un ensemble de pilotes, stockées en colonnes NumPy (une ligne par pilote)
+    # et en lecture seule : tout ce qui évolue pendant une simulation vit dans un SeasonState
+    BASE_COLUMNS = ['skill', 'car_performance', 'dnf_percent']
+
+    def __init__(self, names, teams, skill, car_performance, dnf_percent, preferred_tracks, personality,
+                 track_names=()):
+        self.names = tuple(names)
+        self.team_names = list(dict.fromkeys(teams))
+        self.team = np.array([self.team_names.index(team) for team in teams], dtype=np.int64)
+        self.personality = np.array([PERSONALITIES.index(p) for p in personality], dtype=np.int64)
+        self.rain_master = np.array([name in RAIN_MASTERS for name in self.names], dtype=bool)
+
+        self.skill = np.array(skill, dtype=float)  # Compétences du pilote (0-100)
+        self.car_performance = np.array(car_performance, dtype=float)  # Performance de la voiture (0-100)
+        self.dnf_percent = np.array(dnf_percent, dtype=float)  # Pourcentage de chances d'abandon
+        self.rivalries = tuple(() for _ in self.names)
+
+        # Matrice pilote x circuit des circuits préférés
+        self.track_names = list(track_names)
+        for tracks in preferred_tracks:
+            for track_name in tracks:
+                if track_name not in self.track_names:
+                    self.track_names.append(track_name)
+        self.track_index = {name: i for i, name in enumerate(self.track_names)}
+        self.preferences = np.zeros((len(self.names), len(self.track_names)), dtype=bool)
+        for i, tracks in enumerate(preferred_tracks):
+            self.preferences[i, [self.track_index[name] for name in tracks]] = True
+
+        self.lock()
+        self.state = SeasonState(self)  # État par défaut, utilisé par roster.drivers()
+
+    def lock(self):
+        for column in self.BASE_COLUMNS + ['team', 'personality', 'rain_master', 'preferences']:
+            getattr(self, column).flags.writeable = False
+
+    @classmethod
+    def from_data(cls, drivers_data, track_names=()):
+        # drivers_data : tuples (name, team, skill, car_performance, dnf_percent, preferred_tracks, personality)
+        columns = list(zip(*drivers_data)) if drivers_data else [[]] * 7
+        return cls(*columns, track_names=track_names)
+
+    @classmethod
+    def from_drivers(cls, drivers, track_names=()):
+        # Copie compacte (état compris) d'une liste de pilotes issus d'un ou plusieurs effectifs
+        roster = cls([d.name for d in drivers], [d.team for d in drivers], [d.skill for d in drivers],
+                     [d.car_performance for d in drivers], [d.dnf_percent for d in drivers],
+                     [d.preferred_tracks for d in drivers], [d.personality for d in drivers], track_names)
+        state = roster.state
+        for column in SeasonState.FLOAT_COLUMNS + SeasonState.INT_COLUMNS:
+            getattr(state, column)[:] = [getattr(d, column) for d in drivers]
+        state.tire_strategy[:] = [TIRE_NAMES.index(d.tire_strategy) for d in drivers]
+        state.status[:] = [STATUSES.index(d.status) for d in drivers]
+        state.safety_car_affected[:] = [d.safety_car_affected for d in drivers]
+        return roster
+
+    @classmethod
+    def synthetic(cls, n_drivers, track_names, seed=None):
+        # Effectif fictif de `n_drivers` pilotes (deux par équipe), pour les simulations à grande échelle
+        rng = np.random.default_rng(seed)
+        n_teams = max(1, (n_drivers + 1) // 2)
+        team_car = rng.uniform(65, 97, n_teams)
+        team = np.arange(n_drivers) // 2
+        preferred = rng.integers(0, len(track_names), size=(n_drivers, 2)) if track_names else [()] * n_drivers
+        return cls([f'Pilote {i + 1:04d}' for i in range(n_drivers)],
+                   [f'Équipe {t + 1:03d}' for t in team],
+                   rng.uniform(70, 96, n_drivers).round(),
+                   team_car[team].round(),
+                   rng.uniform(2, 10, n_drivers).round(),
+                   [[track_names[t] for t in row] for row in preferred],
+                   [PERSONALITIES[p] for p in rng.integers(0, len(PERSONALITIES), n_drivers)],
+                   track_names)
+
+    @staticmethod
+    def shared(drivers):
+        # (état, indices) si tous les pilotes sont des vues sur le même état, sinon None
+        if not drivers:
+            return None
+        state = drivers[0].state
+        if any(driver.state is not state for driver in drivers):
+            return None
+        return state, np.array([driver.index for driver in drivers], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def driver(self, index):
+        return Driver.view(self.state, index)
+
+    def drivers(self):
+        return self.state.drivers()
+
+    def preferred(self, track_name):
+        # Colonne booléenne : pilotes pour lesquels `track_name` est un circuit préféré
+        if track_name not in self.track_index:
+            return np.zeros(len(self), dtype=bool)
+        return self.preferences[:, self.track_index[track_name]]
+
+
+class SeasonState:
+    # État d'une simulation sur un effectif partagé : colonnes propres à la saison, plus des copies
+    # à l'écriture des colonnes de base (p. ex. car_performance modifiée par Team.apply_upgrades).
+    # Copier un état ne copie que ces tableaux, jamais les définitions de l'effectif.
+    FLOAT_COLUMNS = ['form', 'last_race_time', 'fastest_lap', 'qualifying_time']
+    INT_COLUMNS = ['points', 'incidents', 'penalties', 'position', 'pit_stops']
+    CODE_COLUMNS = ['tire_strategy', 'status', 'safety_car_affected']
+
+    def __init__(self, roster):
+        n_drivers = len(roster)
+        self.roster = roster
+        self.overrides = {}  # Colonnes de base modifiées par cette simulation
+        self.form = np.ones(n_drivers)  # Facteur de forme (0.98 - 1.02)
+        self.last_race_time = np.zeros(n_drivers)
+        self.fastest_lap = np.full(n_drivers, float('inf'))
+        self.qualifying_time = np.zeros(n_drivers)
+        for column in self.INT_COLUMNS:
+            setattr(self, column, np.zeros(n_drivers, dtype=np.int64))
+        self.tire_strategy = np.full(n_drivers, TIRE_NAMES.index('Medium'), dtype=np.int64)
+        self.status = np.zeros(n_drivers, dtype=np.int64)  # Index dans STATUSES
+        self.safety_car_affected = np.zeros(n_drivers, dtype=bool)
+        self.teams = {}  # Nom d'équipe -> Team, créé par SeasonSimulator
+        self.pace = None  # PaceTable, construite à la première lecture
+
+    def column(self, name):
+        # Lecture d'une colonne de base, en tenant compte des modifications de cette simulation
+        if name in self.overrides:
+            return self.overrides[name]
+        return getattr(self.roster, name)
+
+    def writable(self, name):
+        # Copie à l'écriture : la première modification d'une colonne de base la duplique
+        if name not in self.overrides:
+            self.overrides[name] = getattr(self.roster, name).copy()
+        return self.overrides[name]
+
+    def copy(self):
+        state = SeasonState.__new__(SeasonState)
+        state.roster = self.roster
+        state.overrides = {name: values.copy() for name, values in self.overrides.items()}
+        for column in self.FLOAT_COLUMNS + self.INT_COLUMNS + self.CODE_COLUMNS:
+            setattr(state, column, getattr(self, column).copy())
+        state.teams = {name: copy.copy(team) for name, team in self.teams.items()}
+        state.pace = None
+        return state
+
+    def snapshot(self):
+        return self.copy()
+
+    def restore(self, snapshot):
+        # Remet cet état (et donc toutes ses vues Driver) dans l'état de `snapshot`
+        restored = snapshot.copy()
+        self.overrides = restored.overrides
+        for column in self.FLOAT_COLUMNS + self.INT_COLUMNS + self.CODE_COLUMNS:
+            getattr(self, column)[:] = getattr(restored, column)
+        self.teams = restored.teams
+
+    @classmethod
+    def for_drivers(cls, drivers):
+        # Nouvel état indépendant partant de l'état actuel des pilotes, avec leurs vues
+        shared = Roster.shared(drivers)
+        if shared is not None:
+            source, indices = shared
+            state = source.copy()
+        else:
+            state = Roster.from_drivers(drivers).state.copy()
+            indices = range(len(drivers))
+        return state, [Driver.view(state, i) for i in indices]
+
+    def drivers(self, indices=None):
+        if indices is None:
+            indices = range(len(self.roster))
+        return [Driver.view(self, i) for i in indices]
+
+    def pace_table(self):
+        if self.pace is None:
+            self.pace = PaceTable(self)
+        return self.pace
+
+
+def condition_index(condition):
+    # Les états de piste inconnus n'ajoutent rien au temps au tour, comme 'standard'
+    return CONDITIONS.index(condition) if condition in CONDITIONS else 0
+
+
+class PaceTable:
+    # Allures de base des pilotes d'un état, précalculées par circuit : temps de qualification moyen
+    # [pilote, circuit], temps moyen au tour [pilote, circuit, météo, état de piste] et score de
+    # prédiction pondéré [pilote, circuit, météo]. Un circuit est ajouté à sa première lecture ;
+    # une ligne n'est recalculée que si la compétence, la forme ou la voiture du pilote a changé.
+    def __init__(self, state):
+        n_drivers = len(state.roster)
+        self.state = state
+        self.track_slots = {}  # Nom du circuit -> colonne
+        self.records = np.zeros(0)
+        self.slick = np.zeros(0, dtype=bool)  # Piste glissante d'après les attributs du circuit
+        self.preferred = np.zeros((n_drivers, 0), dtype=bool)
+        self.qualifying = np.zeros((n_drivers, 0))
+        self.race = np.zeros((n_drivers, 0, len(WEATHERS), len(CONDITIONS)))
+        self.score = np.zeros((n_drivers, 0, len(WEATHERS)))
+        # Valeurs ayant servi au calcul de chaque ligne (NaN : jamais calculée)
+        self.skill = np.full(n_drivers, np.nan)
+        self.form = np.full(n_drivers, np.nan)
+        self.car_performance = np.full(n_drivers, np.nan)
+        self.updates = np.zeros(n_drivers, dtype=np.int64)  # Nombre de recalculs de chaque ligne
+
+    def rows(self, rows=None):
+        if rows is None:
+            return np.arange(len(self.skill))
+        return np.atleast_1d(np.asarray(rows, dtype=np.int64))
+
+    def refresh(self, rows=None):
+        # Recalcule les lignes périmées parmi `rows` ; renvoie le nombre de lignes recalculées
+        rows = self.rows(rows)
+        skill = self.state.column('skill')[rows]
+        form = self.state.form[rows]
+        car = self.state.column('car_performance')[rows]
+        stale = (skill != self.skill[rows]) | (form != self.form[rows]) | (car != self.car_performance[rows])
+        if not stale.any():
+            return 0
+        rows = rows[stale]
+        self.compute(rows, np.arange(len(self.records)))
+        self.skill[rows] = skill[stale]
+        self.form[rows] = form[stale]
+        self.car_performance[rows] = car[stale]
+        self.updates[rows] += 1
+        return len(rows)
+
+    def refresh_row(self, row):
+        # Variante scalaire de refresh, pour les lectures pilote par pilote
+        state = self.state
+        if (state.form[row] != self.form[row] or state.column('car_performance')[row] != self.car_performance[row]
+                or state.column('skill')[row] != self.skill[row]):
+            self.refresh(row)
+
+    def compute(self, rows, slots):
+        # Mêmes opérations, dans le même ordre, que les calculs pilote par pilote qu'elle remplace
+        roster = self.state.roster
+        skill = self.state.column('skill')[rows]
+        form = self.state.form[rows]
+        car = self.state.column('car_performance')[rows]
+
+        performance_factor = ((skill * form * 2) + car * 1.5) / 350
+        qualifying = self.records[slots] - (performance_factor[:, None] * 5)
+        preference = np.where(self.preferred[np.ix_(rows, slots)], 1.10, 1.0)
+        weather_bonus = np.ones((len(rows), len(WEATHERS)))
+        weather_bonus[:, WEATHERS.index('rainy')] = np.where(roster.rain_master[rows], 1.05, 0.95)
+        offsets = np.array([CONDITION_OFFSETS.get(condition, 0) for condition in CONDITIONS], dtype=float)
+
+        race = (qualifying[:, :, None] + offsets) * preference[:, :, None]
+        race = race[:, :, None, :] * weather_bonus[:, None, :, None]
+
+        score = (skill * 0.4) + (car * 0.3) + ((form - 1.0) * 100 * 0.2)
+        score = score[:, None] * preference
+        score = score[:, :, None] * weather_bonus[:, None, :]
+        aggressive = roster.personality[rows] == PERSONALITIES.index('aggressive')
+        score = score * np.where(aggressive[:, None] & self.slick[slots], 1.05, 1.0)[:, :, None]
+
+        self.qualifying[np.ix_(rows, slots)] = qualifying
+        self.race[rows[:, None], slots] = race
+        self.score[rows[:, None], slots] = score
+
+    def slot(self, track):
+        slot = self.track_slots.get(track.name)
+        if slot is not None:
+            return slot
+        self.refresh()
+        slot = self.track_slots[track.name] = len(self.records)
+        n_drivers = len(self.skill)
+        self.records = np.append(self.records, track.record)
+        self.slick = np.append(self.slick, track.attributes.get('track_condition') == 'slick')
+        self.preferred = np.column_stack([self.preferred, self.state.roster.preferred(track.name)])
+        self.qualifying = np.concatenate([self.qualifying, np.zeros((n_drivers, 1))], axis=1)
+        self.race = np.concatenate([self.race, np.zeros((n_drivers, 1) + self.race.shape[2:])], axis=1)
+        self.score = np.concatenate([self.score, np.zeros((n_drivers, 1) + self.score.shape[2:])], axis=1)
+        self.compute(np.arange(n_drivers), np.array([slot]))
+        return slot
+
+    def qualifying_pace(self, track, rows=None):
+        slot = self.slot(track)
+        rows = self.rows(rows)
+        self.refresh(rows)
+        return self.qualifying[rows, slot]
+
+    def race_pace(self, track, rows=None):
+        # (pilotes, météo, état de piste)
+        slot = self.slot(track)
+        rows = self.rows(rows)
+        self.refresh(rows)
+        return self.race[rows, slot]
+
+    def scores(self, track, rows=None):
+        # Score pondéré avec la météo actuelle du circuit
+        slot = self.slot(track)
+        rows = self.rows(rows)
+        self.refresh(rows)
+        return self.score[rows, slot, WEATHERS.index(track.weather)]
+
+    def qualifying_time(self, row, track):
+        slot = self.slot(track)
+        self.refresh_row(row)
+        return self.qualifying[row, slot].item()
+
+    def lap_time(self, row, track, weather, condition):
+        slot = self.slot(track)
+        self.refresh_row(row)
+        return self.race[row, slot, WEATHERS.index(weather), condition_index(condition)].item()
+
+
+def base_property(column):
+    # Attribut de base : lu dans l'état (ou l'effectif), écrit par copie à l'écriture dans l'état
+    def getter(self):
+        return self.state.column(column)[self.index].item()
+
+    def setter(self, value):
+        self.state.writable(column)[self.index] = value
+
+    return property(getter, setter)
+
+
+def column_property(column):
+    # Attribut de Driver lu et écrit dans la colonne correspondante de l'état
+    def getter(self):
+        return getattr(self.state, column)[self.index].item()
+
+    def setter(self, value):
+        getattr(self.state, column)[self.index] = value
+
+    return property(getter, setter)
+
+
+def code_property(column, labels):
+    # Attribut textuel de l'état stocké sous forme de code entier
+    def getter(self):
+        return labels[getattr(self.state, column)[self.index]]
+
+    def setter(self, value):
+        getattr(self.state, column)[self.index] = labels.index(value)
+
+    return property(getter, setter)
+
+
+class Driver:
+    def __init__(self, name, team, skill, car_performance, dnf_percent,
+                 preferred_tracks, personality):
+        # Un pilote créé seul possède son propre effectif d'une ligne
+        roster = Roster([name], [team], [skill], [car_performance], [dnf_percent],
+                        [preferred_tracks], [personality])
+        self.state = roster.state
+        self.index = 0
+
+    @classmethod
+    def view(cls, state, index):
+        driver = cls.__new__(cls)
+        driver.state = state
+        driver.index = index
+        return driver
+
+    @property
+    def roster(self):
+        return self.state.roster
+
+    def __eq__(self, other):
+        return isinstance(other, Driver) and self.state is other.state and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.state), self.index))
+
+    def __repr__(self):
+        return f'Driver({self.name!r}, {self.team!r})'
+
+    skill = base_property('skill')
+    car_performance = base_property('car_performance')
+    dnf_percent = base_property('dnf_percent')
+    form = column_property('form')
+    points = column_property('points')
+    last_race_time = column_property('last_race_time')
+    fastest_lap = column_property('fastest_lap')
+    qualifying_time = column_property('qualifying_time')
+    incidents = column_property('incidents')
+    penalties = column_property('penalties')
+    position = column_property('position')
+    pit_stops = column_property('pit_stops')
+    tire_strategy = code_property('tire_strategy', TIRE_NAMES)
+    status = code_property('status', STATUSES)
+
+    @property
+    def name(self):
+        return self.roster.names[self.index]
+
+    @property
+    def team(self):
+        return self.roster.team_names[self.roster.team[self.index]]
+
+    @property
+    def personality(self):
+        # 'aggressive', 'defensive', 'balanced'
+        return PERSONALITIES[self.roster.personality[self.index]]
+
+    @property
+    def preferred_tracks(self):
+        row = self.roster.preferences[self.index]
+        return [name for name, preferred in zip(self.roster.track_names, row) if preferred]
+
+    @property
+    def safety_car_affected(self):
+        return bool(self.state.safety_car_affected[self.index])
+
+    @safety_car_affected.setter
+    def safety_car_affected(self, value):
+        self.state.safety_car_affected[self.index] = value
+
+    @property
+    def rivalries(self):
+        return self.roster.rivalries[self.index]
+
+    def adjust_score_based_on_track_preference(self, track_name):
+        if self.roster.preferred(track_name)[self.index]:
+            return 1.10  
+        return 1.0
+
+    def adjust_score_based_on_weather(self, weather):
+        if weather == 'rainy':
+            if self.name in RAIN_MASTERS:
+                return 1.05  
+            else:
+                return 0.95  
+        return 1.0
+
+    def decide_pit_stop(self, lap, total_laps, tire_wear, weather):
+        threshold = 0.2 if self.personality == 'aggressive' else 0.4
+        if tire_wear <= threshold:
+            return True
+        if weather != 'dry' and self.tire_strategy not in ['Intermediate', 'Wet']:
+            return True
+        return False
+
+    def simulate_pit_stop(self):
+        pit_time = 10  
+        return pit_time
+
+    def simulate_fatigue(self, lap, total_laps, rng=None):
+        rng = np.random.default_rng(rng)
+        fatigue_factor = 0.001
+        if lap > total_laps * 0.75:
+            if rng.random() < fatigue_factor:
+                self.last_race_time += 5
+                self.incidents += 1
+
+    def update_tire_strategy(self, weather):
+        if weather == 'rainy':
+            self.tire_strategy = 'Wet'
+        elif weather == 'humid':
+            self.tire_strategy = 'Intermediate'
+        else:
+            if self.personality == 'aggressive':
+                self.tire_strategy = 'Soft'
+            elif self.personality == 'defensive':
+                self.tire_strategy = 'Hard'
+            else:
+                self.tire_strategy = 'Medium'
+
+    def calculate_race_time(self, track, rng=None):
+        # `rng` : numpy.random.Generator, SeedSequence ou graine entière
+        rng = np.random.default_rng(rng)
+        weather = track.weather
+        laps = track.laps
+
+        self.update_tire_strategy(weather)
+        tire = TIRE_TYPES[self.tire_strategy]
+        remaining_durability = tire['durability']
+        performance_multiplier = tire['performance']
+
+        # Temps moyen au tour (performances, état de piste, circuit préféré, pluie) lu dans la table des allures
+        avg_lap_time = self.state.pace_table().lap_time(self.index, track, weather, track.condition)
+
+        race_time = 0
+        fastest_lap = float('inf')
+        pit_stops = 0
+
+        # Tirages de toute la course en un seul bloc
+        lap_variations = rng.normal(0, 0.02, laps)
+        weather_draws = rng.random(laps)
+
+        for lap in range(1, laps + 1):
+            lap_variation = lap_variations[lap - 1]
+            lap_time = avg_lap_time * (1 + lap_variation)
+
+            # Changement potentiel des conditions météorologiques
+            if weather_draws[lap - 1] < 0.01:
+                track.update_weather_conditions(rng)
+                self.update_tire_strategy(track.weather)
+                tire = TIRE_TYPES[self.tire_strategy]
+                remaining_durability = tire['durability']
+                performance_multiplier = tire['performance']
+
+            tire_wear = remaining_durability / tire['durability']
+            if self.decide_pit_stop(lap, laps, tire_wear, track.weather):
+                race_time += self.simulate_pit_stop()
+                pit_stops += 1
+                self.update_tire_strategy(track.weather)
+                tire = TIRE_TYPES[self.tire_strategy]
+                remaining_durability = tire['durability']
+                performance_multiplier = tire['performance']
+
+            remaining_durability -= 1
+
+            race_time += lap_time
+            if lap_time < fastest_lap:
+                fastest_lap = lap_time
+
+            self.simulate_fatigue(lap, laps, rng)
+
+        race_time += self.penalties
+
+        self.last_race_time = race_time
+        self.fastest_lap = round(fastest_lap, 3)
+        self.pit_stops = pit_stops
+
+    def adjust_form(self, race_position):
+        if race_position <= 3:
+            self.form += 0.01
+        elif race_position >= 15:
+            self.form -= 0.01
+        self.form = max(0.98, min(1.02, self.form))
+
+class Team:
+    def __init__(self, name, budget=100, upgrade_cost=10, upgrade_step=1):
+        self.name = name
+        self.upgrade_level = 0
+        self.budget = budget
+        self.upgrade_cost = upgrade_cost  # Budget consommé par amélioration
+        self.upgrade_step = upgrade_step  # Niveaux gagnés par amélioration
+
+    def develop_upgrades(self):
+        if self.budget >= self.upgrade_cost:
+            self.upgrade_level += self.upgrade_step
+            self.budget -= self.upgrade_cost
+            return True
+        return False
+
+    def apply_upgrades(self, driver):
+        driver.car_performance += self.upgrade_level
+
+class Track:
+    def __init__(self, name, record, laps, attributes):
+        self.name = name
+        self.record = record
+        self.laps = laps
+        self.attributes = attributes
+        self.weather = attributes.get('weather', 'dry')
+        self.condition = attributes.get('track_condition', 'standard')
+        self.safety_car_active = False
+        # Météo et état de piste imposés (scénarios) : None pour un tirage à chaque course
+        self.forced_weather = None
+        self.forced_condition = None
+
+    def update_weather_conditions(self, rng=None):
+        rng = np.random.default_rng(rng)
+        # Le tirage a lieu même si la météo est imposée, pour ne pas décaler les nombres aléatoires suivants
+        self.weather = WEATHERS[rng.integers(len(WEATHERS))]
+        if self.forced_weather is not None:
+            self.weather = self.forced_weather
+        if self.weather == 'rainy':
+            self.condition = 'wet'
+        else:
+            self.condition = 'standard'
+        if self.forced_condition is not None:
+            self.condition = self.forced_condition
+
+    def check_for_safety_car(self, incidents):
+        if self.safety_car_needed([incident['type'] == 'major' for incident in incidents]):
+            self.safety_car_active = True
+
+    @staticmethod
+    def safety_car_needed(major):
+        # Au moins un incident majeur (abandon compris) ; `major` est un masque (…, pilotes),
+        # le résultat un booléen par course (voir RaceIncidents.safety_car dans f1_race)
+        return np.any(major, axis=-1)
+
+# Création des pilotes avec des données plus réalistes
+drivers_data = [
+    # (name, team, skill, car_performance, dnf_percent, preferred_tracks, personality)
+    ('Max Verstappen', 'Red Bull Racing', 95, 96, 2, ['Dutch GP - Zandvoort', 'Monaco GP - Monaco'], 'aggressive'),
+    ('Sergio Pérez', 'Red Bull Racing', 84, 96, 3, ['Mexico GP - Mexico City', 'Abu Dhabi GP - Yas Marina'], 'defensive'),
+    ('Lewis Hamilton', 'Mercedes', 90, 94, 2, ['Monaco GP - Monaco', 'British GP - Silverstone'], 'aggressive'),
+    ('George Russell', 'Mercedes', 88, 94, 3, ['British GP - Silverstone', 'Hungarian GP - Budapest'], 'balanced'),
+    ('Charles Leclerc', 'Ferrari', 90, 90, 3, ['Italian GP - Monza', 'Emilia Romagna GP - Imola'], 'balanced'),
+    ('Carlos Sainz Jr.', 'Ferrari', 90, 90, 4, ['Italian GP - Monza', 'Canadian GP - Montreal'], 'balanced'),
+    ('Lando Norris', 'McLaren', 91, 85, 5, ['British GP - Silverstone', 'Spanish GP - Barcelona'], 'balanced'),
+    ('Oscar Piastri', 'McLaren', 87, 85, 5, ['Monaco GP - Monaco', 'Azerbaijan GP - Baku'], 'defensive'),
+    ('Esteban Ocon', 'Alpine', 83, 82, 5, ['French GP - Paul Ricard', 'Hungarian GP - Budapest'], 'defensive'),
+    ('Pierre Gasly', 'Alpine', 85, 82, 5, ['Azerbaijan GP - Baku', 'Italian GP - Monza'], 'aggressive'),
+    ('Fernando Alonso', 'Aston Martin', 89, 88, 3, ['British GP - Silverstone', 'Canadian GP - Montreal'], 'aggressive'),
+    ('Lance Stroll', 'Aston Martin', 80, 88, 5, ['Canadian GP - Montreal', 'Mexican GP - Mexico City'], 'defensive'),
+    ('Valtteri Bottas', 'Alfa Romeo', 82, 80, 6, ['Italian GP - Monza', 'Hungarian GP - Budapest'], 'balanced'),
+    ('Zhou Guanyu', 'Alfa Romeo', 78, 80, 6, ['Chinese GP - Shanghai', 'Emilia Romagna GP - Imola'], 'defensive'),
+    ('Kevin Magnussen', 'Haas', 80, 75, 7, ['Azerbaijan GP - Baku', 'Monaco GP - Monaco'], 'aggressive'),
+    ('Nico Hülkenberg', 'Haas', 83, 75, 7, ['Spanish GP - Barcelona', 'Belgian GP - Spa'], 'balanced'),
+    ('Yuki Tsunoda', 'AlphaTauri', 82, 72, 8, ['Singapore GP - Marina Bay', 'Japanese GP - Suzuka'], 'aggressive'),
+    ('Daniel Ricciardo', 'AlphaTauri', 85, 72, 8, ['Australian GP - Melbourne', 'Monaco GP - Monaco'], 'balanced'),
+    ('Logan Sargeant', 'Williams', 75, 70, 10, ['Brazilian GP - São Paulo', 'Las Vegas GP - Las Vegas'], 'defensive'),
+    ('Alexander Albon', 'Williams', 85, 70, 9, ['Dutch GP - Zandvoort', 'Singapore GP - Marina Bay'], 'aggressive'),
+]
+
+roster = Roster.from_data(drivers_data)
+drivers = roster.drivers()
+
+# Création des circuits
+tracks_data = [
+    # (name, record, laps, attributes)
+    ['Bahrain GP - Sakhir', 91.447, 57, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Saudi Arabian GP - Jeddah', 87.097, 50, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Australian GP - Melbourne', 85.000, 58, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Emilia Romagna GP - Imola', 88.432, 63, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Miami GP - Miami', 91.234, 57, {'weather': 'humid', 'track_condition': 'wet'}],
+    ['Spanish GP - Barcelona', 94.679, 66, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Monaco GP - Monaco', 74.260, 78, {'weather': 'dry', 'track_condition': 'slick'}],
+    ['Azerbaijan GP - Baku', 99.345, 51, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Austrian GP - Spielberg', 70.690, 71, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['British GP - Silverstone', 93.460, 52, {'weather': 'rainy', 'track_condition': 'wet'}],
+    ['Hungarian GP - Budapest', 97.312, 70, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Belgian GP - Spa', 106.290, 44, {'weather': 'rainy', 'track_condition': 'wet'}],
+    ['Dutch GP - Zandvoort', 90.123, 72, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Italian GP - Monza', 87.370, 53, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Singapore GP - Marina Bay', 107.000, 61, {'weather': 'humid', 'track_condition': 'wet'}],
+    ['Japanese GP - Suzuka', 90.000, 53, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['United States GP - Austin', 93.500, 56, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Mexico GP - Mexico City', 96.789, 71, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['São Paulo GP - Interlagos', 72.920, 71, {'weather': 'rainy', 'track_condition': 'wet'}],
+    ['Las Vegas GP - Las Vegas', 89.000, 50, {'weather': 'dry', 'track_condition': 'standard'}],
+    ['Abu Dhabi GP - Yas Marina', 80.500, 55, {'weather': 'dry', 'track_condition': 'standard'}]
+]
+
+tracks = [Track(*data) for data in tracks_data]
@@ -0,0 +1,222 @@
+# f1_parallel.py
+
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from f1_engine import SeasonSimulator
+from f1_export import chunk_path, exporter_for
+from f1_prediction import (ADAPTIVE_FIRST_SAMPLES, PredictionResult, adaptive_batch, check_target,
+                           leader_half_width, predict_race)
+from f1_scoring import FinishingOrders
+from f1_stats import SeasonAggregator
+from f1_store import ResultStore
+
+
+# Arrêt adaptatif des prédictions de championnat : premier lot (et plus petit lot suivant) de saisons
+ADAPTIVE_FIRST_SEASONS = 50
+
+
+def spawn_seeds(seed, count):
+    # Une SeedSequence indépendante par saison : le résultat ne dépend pas
+    # de la répartition entre processus
+    sequence = np.random.SeedSequence(seed)
+    return sequence.entropy, sequence.spawn(count)
+
+
+def split(items, parts):
+    # Découpe `items` en au plus `parts` blocs contigus non vides
+    bounds = np.linspace(0, len(items), parts + 1).astype(int)
+    return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+class BatchResult(SeasonAggregator):
+    # Agrégat d'un lot de saisons : chaque saison apporte son SeasonAggregator, fusionné tel quel
+    def __init__(self, names, teams, track_names):
+        super().__init__(names, track_names)
+        self.teams = list(teams)
+        self.team_names = list(dict.fromkeys(self.teams))
+        self.constructor_titles = np.zeros(len(self.team_names), dtype=np.int64)
+        self.orders = None  # FinishingOrders de toutes les courses, si demandé (voir f1_scoring)
+        self.entropy = None  # Entropie de la SeedSequence, pour rejouer le lot
+        self.target = None  # Demi-largeur visée pour l'intervalle de titre du favori (arrêt adaptatif)
+
+    @property
+    def half_width(self):
+        return leader_half_width(self.titles, self.seasons)
+
+    @property
+    def converged(self):
+        return self.target is not None and self.half_width <= self.target
+
+    def add_season(self, result):
+        self.merge(result.stats)
+        # Championnat des constructeurs : somme des points des pilotes de chaque équipe
+        points = dict.fromkeys(self.team_names, 0)
+        for row in result.standings:
+            points[row['team']] += row['points']
+        self.constructor_titles[self.team_names.index(max(points, key=points.get))] += 1
+
+    def merge(self, other):
+        super().merge(other)
+        if isinstance(other, BatchResult):
+            self.constructor_titles += other.constructor_titles
+            if other.orders is not None:
+                self.orders = other.orders if self.orders is None else self.orders.extend(other.orders)
+        return self
+
+    def constructors(self):
+        seasons = max(self.seasons, 1)
+        rows = [{'team': team, 'titles': int(titles), 'title_probability': float(titles / seasons)}
+                for team, titles in zip(self.team_names, self.constructor_titles)]
+        rows.sort(key=lambda row: row['titles'], reverse=True)
+        return rows
+
+    def standings(self):
+        teams = dict(zip(self.names, self.teams))
+        return [{'name': row['name'], 'team': teams[row['name']], **row} for row in super().standings()]
+
+    def to_dict(self):
+        result = {'entropy': self.entropy}
+        if self.target is not None:
+            result.update({'target': self.target, 'half_width': self.half_width, 'converged': self.converged})
+        result.update(super().to_dict())
+        result['constructors'] = self.constructors()
+        return result
+
+
+def run_season_chunk(drivers, tracks, seeds, fidelity='detailed', store_path=None, first_season=0,
+                     export_path=None, checkpoint=None, keep_orders=False):
+    # Exécuté dans un processus de travail : chaque saison a son propre état sur l'effectif partagé.
+    # Avec `store_path` / `export_path`, les courses sont ajoutées au stockage (dans des blocs propres
+    # à ce bloc de saisons) ou exportées dans un fichier propre à ce bloc, au fil de la simulation.
+    # Avec `checkpoint` (voir f1_checkpoint), chaque saison repart de ce point et ne simule que les courses restantes.
+    # Avec `keep_orders`, les ordres d'arrivée bruts sont conservés pour être recalculés sous d'autres barèmes.
+    batch = BatchResult([driver.name for driver in drivers], [driver.team for driver in drivers],
+                        [track.name for track in tracks])
+    recorders = []
+    if store_path is not None:
+        recorders.append(ResultStore(store_path).writer(prefix=f'season-{first_season:09d}'))
+    if export_path is not None:
+        recorders.append(exporter_for(chunk_path(export_path, first_season)))
+    if keep_orders:
+        batch.orders = FinishingOrders(batch.names, batch.teams)
+        recorders.append(batch.orders)
+    try:
+        for season_index, seed in enumerate(seeds, start=first_season):
+            simulator = SeasonSimulator(drivers, tracks, seed=seed, fidelity=fidelity, recorders=recorders,
+                                        season_index=season_index)
+            if checkpoint is not None:
+                simulator.restore(checkpoint)
+            batch.add_season(simulator.run())
+    finally:
+        for recorder in recorders:
+            recorder.close()
+    return batch
+
+
+def season_executor(workers):
+    # Pas de processus de travail pour un seul bloc
+    if workers == 1:
+        return contextlib.nullcontext()
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def merge_season_chunks(batch, executor, drivers, tracks, seeds, workers, fidelity='detailed', store_path=None,
+                        export_path=None, first_season=0, checkpoint=None, keep_orders=False):
+    # Simule les saisons `seeds` (numérotées à partir de `first_season`) en blocs contigus, un par processus,
+    # et les fusionne dans `batch` dans l'ordre des blocs
+    chunks = split(seeds, workers)
+    first_seasons = (first_season + np.cumsum([0] + [len(chunk) for chunk in chunks[:-1]])).tolist()
+    if executor is None:
+        partials = map(run_season_chunk, [drivers] * len(chunks), [tracks] * len(chunks), chunks,
+                       [fidelity] * len(chunks), [store_path] * len(chunks), first_seasons, [export_path] * len(chunks),
+                       [checkpoint] * len(chunks), [keep_orders] * len(chunks))
+    else:
+        partials = executor.map(run_season_chunk, [drivers] * len(chunks), [tracks] * len(chunks), chunks,
+                                [fidelity] * len(chunks), [store_path] * len(chunks), first_seasons,
+                                [export_path] * len(chunks), [checkpoint] * len(chunks), [keep_orders] * len(chunks))
+    for partial in partials:
+        batch.merge(partial)
+    return batch
+
+
+def run_seasons(drivers, tracks, seasons, seed=None, workers=None, fidelity='detailed', store_path=None,
+                export_path=None, checkpoint=None, keep_orders=False):
+    # Répartit `seasons` saisons sur un ProcessPoolExecutor et fusionne les résultats
+    # dans l'ordre des blocs, pour un agrégat identique à graine et nombre de processus donnés
+    workers = workers or os.cpu_count() or 1
+    entropy, seeds = spawn_seeds(seed, seasons)
+    first_season = 0
+    if store_path is not None:
+        store = ResultStore.create(store_path, [driver.name for driver in drivers], [track.name for track in tracks])
+        first_season = store.reserve_seasons(seasons)
+
+    batch = BatchResult([driver.name for driver in drivers], [driver.team for driver in drivers],
+                        [track.name for track in tracks])
+    batch.entropy = entropy
+    with season_executor(workers) as executor:
+        return merge_season_chunks(batch, executor, drivers, tracks, seeds, workers, fidelity, store_path,
+                                   export_path, first_season, checkpoint, keep_orders)
+
+
+def predict_championship(drivers, tracks, target=0.005, max_seasons=10_000, seed=None, workers=None,
+                         fidelity='detailed', store_path=None, export_path=None, checkpoint=None,
+                         keep_orders=False):
+    # Probabilités de titre par lots de saisons, jusqu'à ce que l'intervalle de confiance de la probabilité
+    # de titre du favori atteigne ±target ou que `max_seasons` saisons aient été simulées.
+    # La saison i reçoit la même graine que dans run_seasons : seul le nombre de saisons est adaptatif.
+    check_target(target)
+    workers = workers or os.cpu_count() or 1
+    sequence = np.random.SeedSequence(seed)
+    first_season = 0
+    if store_path is not None:
+        store = ResultStore.create(store_path, [driver.name for driver in drivers], [track.name for track in tracks])
+        # Nombre de saisons inconnu d'avance : tout le budget est réservé
+        first_season = store.reserve_seasons(max_seasons)
+
+    batch = BatchResult([driver.name for driver in drivers], [driver.team for driver in drivers],
+                        [track.name for track in tracks])
+    batch.entropy = sequence.entropy
+    batch.target = target
+    with season_executor(workers) as executor:
+        while batch.seasons < max_seasons and not (batch.seasons and batch.converged):
+            size = adaptive_batch(batch.titles, batch.seasons, max_seasons, target,
+                                  first=max(ADAPTIVE_FIRST_SEASONS, workers))
+            merge_season_chunks(batch, executor, drivers, tracks, sequence.spawn(size), workers, fidelity,
+                                store_path, export_path, first_season + batch.seasons, checkpoint, keep_orders)
+    return batch
+
+
+def run_prediction_chunk(drivers, track, samples, seed_sequence, fidelity='detailed'):
+    return predict_race(drivers, track, samples=samples, rng=np.random.default_rng(seed_sequence), fidelity=fidelity)
+
+
+def predict_race_parallel(drivers, track, samples=100_000, seed=None, workers=None, fidelity='detailed',
+                          target=None):
+    # Variante multi-processus de f1_prediction.predict_race : un flux aléatoire par bloc d'échantillons.
+    # Avec `target`, chaque lot est réparti entre les processus jusqu'à atteindre la précision visée.
+    check_target(target)
+    workers = workers or os.cpu_count() or 1
+    sequence = np.random.SeedSequence(seed)
+    n_drivers = len(drivers)
+    result = PredictionResult(track.name, [driver.name for driver in drivers], 0, np.zeros(n_drivers, dtype=np.int64),
+                              np.zeros(n_drivers, dtype=np.int64), np.zeros(n_drivers, dtype=np.int64),
+                              np.zeros(n_drivers), target)
+
+    with season_executor(workers) as executor:
+        pool_map = map if executor is None else executor.map
+        while result.samples < samples and not (target is not None and result.samples and result.converged):
+            if target is None:
+                size = samples
+            else:
+                size = adaptive_batch(result.wins, result.samples, samples, target,
+                                      first=ADAPTIVE_FIRST_SAMPLES * workers)
+            sequences = sequence.spawn(workers)
+            sizes = [len(chunk) for chunk in np.array_split(np.arange(size), workers)]
+            for partial in pool_map(run_prediction_chunk, [drivers] * workers, [track] * workers,
+                                    sizes, sequences, [fidelity] * workers):
+                result.merge(partial)
+    return result
@@ -0,0 +1,312 @@
+# f1_prediction.py
+
+import numpy as np
+
+from f1_model import POINTS_DISTRIBUTION, TIRE_TYPES, WEATHERS, Roster
+from f1_race import RaceField, RaceIncidents, simulate_qualifying, simulate_race
+
+
+# Nombre de cellules (échantillons x pilotes x tours) simulées par lot, pour borner la mémoire
+BATCH_CELLS = 2_000_000
+# Arrêt adaptatif : premier lot (et plus petit lot suivant) quand une précision cible est demandée
+ADAPTIVE_FIRST_SAMPLES = 1000
+
+
+def wilson_interval(successes, n, z=1.96):
+    # Intervalle de confiance de Wilson pour une proportion (95 % par défaut)
+    successes = np.asarray(successes, dtype=float)
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    centre = (p + z ** 2 / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return centre - half_width, centre + half_width
+
+
+def leader_half_width(counts, n, z=1.96):
+    # Demi-largeur de l'intervalle de Wilson du pilote en tête (celui qui compte le plus de succès)
+    if n == 0:
+        return float('inf')
+    low, high = wilson_interval(np.max(counts), n, z)
+    return float((high - low) / 2)
+
+
+def check_target(target):
+    # Demi-largeur visée d'un arrêt adaptatif : None (pas d'arrêt adaptatif) ou un réel strictement positif
+    if target is not None and not target > 0:
+        raise ValueError(f'La précision visée doit être strictement positive : {target}')
+
+
+def adaptive_batch(counts, done, budget, target, first=ADAPTIVE_FIRST_SAMPLES, z=1.96):
+    # Taille du lot suivant : échantillons encore nécessaires, d'après la proportion observée du pilote
+    # en tête (approximation normale), pour que son intervalle atteigne ±target, dans la limite du budget
+    if done == 0:
+        needed = first
+    else:
+        p = np.max(counts) / done
+        needed = max(first, int(np.ceil(z ** 2 * p * (1 - p) / target ** 2)) - done)
+    return min(needed, budget - done)
+
+
+def weighted_scores(drivers, track):
+    # Prédiction par score pondéré (compétences, voiture, forme, circuit préféré, météo, personnalité),
+    # lu dans la table des allures : (pilote, score) triés par score décroissant
+    shared = Roster.shared(drivers)
+    if shared is not None:
+        state, indices = shared
+        scores = state.pace_table().scores(track, indices).tolist()
+    else:
+        scores = [driver.state.pace_table().scores(track, driver.index).item() for driver in drivers]
+    return sorted(zip(drivers, scores), key=lambda x: x[1], reverse=True)
+
+
+class PredictionIndex:
+    # Scores pondérés de tout un plateau sur tout un calendrier [pilote, circuit, météo], recopiés
+    # depuis la PaceTable de l'état des pilotes. refresh ne recopie que les lignes recalculées depuis
+    # la mise à jour précédente (forme, améliorations...) ; les favoris de chaque circuit s'obtiennent
+    # par sélection partielle (argpartition), pour un circuit ou pour tout le calendrier à la fois.
+    def __init__(self, drivers, tracks):
+        self.drivers = list(drivers)
+        self.tracks = list(tracks)
+        self.track_names = [track.name for track in self.tracks]
+        self.scores = np.zeros((len(self.drivers), len(self.tracks), len(WEATHERS)))
+        # Par état : (état, positions dans l'index, indices dans l'état)
+        groups = {}
+        for position, driver in enumerate(self.drivers):
+            group = groups.setdefault(id(driver.state), (driver.state, [], []))
+            group[1].append(position)
+            group[2].append(driver.index)
+        self.groups = [(state, np.array(positions, dtype=np.int64), np.array(indices, dtype=np.int64))
+                       for state, positions, indices in groups.values()]
+        self.tables = [None] * len(self.groups)  # PaceTable lue lors de la dernière mise à jour
+        self.updates = np.full(len(self.drivers), -1, dtype=np.int64)  # Compteur de recalculs déjà recopié
+        self.refresh()
+
+    def refresh(self):
+        # Met à jour les lignes périmées ; renvoie le nombre de lignes recopiées
+        refreshed = 0
+        for g, (state, positions, indices) in enumerate(self.groups):
+            pace = state.pace_table()
+            slots = np.array([pace.slot(track) for track in self.tracks], dtype=np.int64)
+            pace.refresh(indices)
+            changed = pace.updates[indices] != self.updates[positions]
+            if pace is not self.tables[g]:
+                changed[:] = True
+                self.tables[g] = pace
+            if changed.any():
+                rows = indices[changed]
+                self.scores[positions[changed]] = pace.score[rows[:, None], slots]
+                self.updates[positions[changed]] = pace.updates[rows]
+                refreshed += int(np.count_nonzero(changed))
+        return refreshed
+
+    def current_scores(self, weather=None):
+        # [pilote, circuit] avec la météo actuelle de chaque circuit, ou `weather` pour tous
+        if weather is None:
+            weathers = [WEATHERS.index(track.weather) for track in self.tracks]
+        else:
+            weathers = [WEATHERS.index(weather)] * len(self.tracks)
+        return self.scores[:, np.arange(len(self.tracks)), weathers]
+
+    def ranking(self, k, columns, weather=None):
+        # (favoris, scores) de forme (k, circuits) : score décroissant, puis ordre du plateau
+        scores = self.current_scores(weather)[:, columns]
+        n_drivers = len(self.drivers)
+        k = min(k, n_drivers)
+        if k < n_drivers:
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        else:
+            top = np.broadcast_to(np.arange(n_drivers)[:, None], scores.shape)
+        values = np.take_along_axis(scores, top, axis=0)
+        order = np.lexsort((top, -values), axis=0)
+        return np.take_along_axis(top, order, axis=0), np.take_along_axis(values, order, axis=0)
+
+    def top_k(self, track, k=1, weather=None):
+        # (pilote, score) des `k` favoris d'un circuit (objet Track ou nom), comme weighted_scores
+        name = getattr(track, 'name', track)
+        if name not in self.track_names:
+            raise ValueError(f'Circuit absent de l\'index : {name}')
+        top, values = self.ranking(k, [self.track_names.index(name)], weather)
+        return [(self.drivers[i], float(value)) for i, value in zip(top[:, 0], values[:, 0])]
+
+    def top_k_all(self, k=1, weather=None, start=0):
+        # [(circuit, [(pilote, score)...])...] pour les circuits du calendrier à partir de `start`
+        top, values = self.ranking(k, np.arange(start, len(self.tracks)), weather)
+        return [(track, [(self.drivers[i], float(value)) for i, value in zip(top[:, j], values[:, j])])
+                for j, track in enumerate(self.tracks[start:])]
+
+
+class CalendarForecast:
+    # Enregistreur de SeasonSimulator (append / close) : après chaque course, les `k` favoris
+    # (score pondéré) de chacune des courses restantes, à partir des pilotes et circuits du simulateur
+    def __init__(self, drivers, tracks, k=3):
+        self.index = PredictionIndex(drivers, tracks)
+        self.k = k
+        self.rounds = []
+
+    def append(self, race, season=0, race_round=0):
+        self.index.refresh()
+        self.rounds.append({
+            'season': season,
+            'round': race_round,
+            'track': race.track,
+            'forecast': [{'track': track.name, 'weather': track.weather,
+                          'favourites': [{'name': driver.name, 'score': score} for driver, score in favourites]}
+                         for track, favourites in self.index.top_k_all(self.k, start=race_round + 1)],
+        })
+
+    def close(self):
+        pass
+
+    def to_dict(self):
+        return self.rounds
+
+
+def points_finishes(positions, finished, points_distribution=POINTS_DISTRIBUTION):
+    # Arrivées dans les points : classé dans les places du barème, indépendamment du point
+    # de meilleur tour qu'un pilote classé hors des points peut aussi marquer
+    return finished & (positions < len(points_distribution))
+
+
+def simulate_weekends(field, track, rng, samples, points_distribution=POINTS_DISTRIBUTION, fidelity='detailed',
+                      tire_types=TIRE_TYPES):
+    # Qualifications, abandons, pénalités, course et incidents pour `samples` courses indépendantes.
+    # Renvoie (positions, finished, points) de forme (échantillons, pilotes), dans l'ordre du plateau.
+    n_drivers = len(field)
+    grid = simulate_qualifying(field, track, rng, samples)
+    grid_field = field.take(grid)
+
+    # Abandons et pénalités, tirés dans l'ordre de la grille, puis incidents parmi les pilotes en course
+    incidents = RaceIncidents.sample(grid_field.dnf_percent, rng, samples)
+    outcome = simulate_race(grid_field, track, rng, samples, active=~incidents.dnf, tire_types=tire_types,
+                            fidelity=fidelity)
+    incidents.draw_race_incidents(rng)
+    race_times = outcome.race_times + incidents.time_penalties
+    finished = ~incidents.retired
+
+    # Classement : les abandons restent en fin de classement, dans l'ordre de la grille
+    order = np.argsort(np.where(finished, race_times, np.inf), axis=1, kind='stable')
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_drivers), axis=1)
+
+    table = np.zeros(n_drivers)
+    table[:min(n_drivers, len(points_distribution))] = points_distribution[:n_drivers]
+    points = np.where(finished, table[positions], 0)
+
+    # Meilleur tour : premier pilote de la grille ayant le meilleur tour parmi les classés
+    fastest = np.where(finished, outcome.fastest_laps, np.inf)
+    holder = np.argmin(fastest, axis=1)
+    has_holder = finished.any(axis=1)
+    points[np.arange(samples)[has_holder], holder[has_holder]] += 1
+
+    # Retour à l'ordre du plateau
+    driver_positions = np.empty_like(positions)
+    driver_finished = np.empty_like(finished)
+    driver_points = np.empty_like(points)
+    np.put_along_axis(driver_positions, grid, positions, axis=1)
+    np.put_along_axis(driver_finished, grid, finished, axis=1)
+    np.put_along_axis(driver_points, grid, points, axis=1)
+    return driver_positions, driver_finished, driver_points
+
+
+class PredictionResult:
+    def __init__(self, track, names, samples, wins, podiums, points_finishes, total_points, target=None):
+        self.track = track
+        self.names = names
+        self.samples = samples
+        self.wins = wins
+        self.podiums = podiums
+        self.points_finishes = points_finishes
+        self.total_points = total_points
+        self.target = target  # Demi-largeur visée pour l'intervalle de victoire du favori (arrêt adaptatif)
+
+    @property
+    def half_width(self):
+        return leader_half_width(self.wins, self.samples)
+
+    @property
+    def converged(self):
+        return self.target is not None and self.half_width <= self.target
+
+    @property
+    def predicted_winner(self):
+        return self.names[int(np.argmax(self.wins))]
+
+    def merge(self, other):
+        # Ajoute les comptes d'une autre prédiction sur le même circuit et le même plateau
+        self.samples += other.samples
+        self.wins = self.wins + other.wins
+        self.podiums = self.podiums + other.podiums
+        self.points_finishes = self.points_finishes + other.points_finishes
+        self.total_points = self.total_points + other.total_points
+        return self
+
+    def probabilities(self):
+        # Une ligne par pilote, triée par probabilité de victoire décroissante
+        rows = []
+        for label, counts in (('win', self.wins), ('podium', self.podiums), ('points', self.points_finishes)):
+            low, high = wilson_interval(counts, self.samples)
+            rows.append((label, counts / self.samples, low, high))
+        table = []
+        for i, name in enumerate(self.names):
+            row = {'name': name, 'expected_points': float(self.total_points[i] / self.samples)}
+            for label, probability, low, high in rows:
+                row[label] = float(probability[i])
+                row[f'{label}_ci'] = (float(low[i]), float(high[i]))
+            table.append(row)
+        table.sort(key=lambda row: (row['win'], row['podium']), reverse=True)
+        return table
+
+    def to_dict(self):
+        result = {'track': self.track, 'samples': self.samples}
+        if self.target is not None:
+            result.update({'target': self.target, 'half_width': self.half_width, 'converged': self.converged})
+        result['drivers'] = self.probabilities()
+        return result
+
+
+def predict_race(drivers, track, samples=100_000, seed=None, rng=None, batch_size=None, fidelity='detailed',
+                 target=None, progress=None, cancel=None):
+    # Prédiction Monte Carlo : simule `samples` fois le week-end sur le circuit
+    # avec la météo et l'état de piste actuels du circuit.
+    # Avec `target` (p. ex. 0.005 pour ±0,5 %), la simulation avance par lots et s'arrête dès que l'intervalle
+    # de confiance de la probabilité de victoire du favori est assez étroit ; `samples` sert alors de budget.
+    # `progress` reçoit (simulations faites, budget) après chaque lot ; `cancel` (threading.Event) interrompt
+    # la prédiction entre deux lots et renvoie les comptes des simulations déjà faites.
+    check_target(target)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    field = RaceField.from_drivers(drivers, track)
+    n_drivers = len(field)
+    if batch_size is None:
+        # En fidélité 'fast', aucun tableau ne dépend du nombre de tours
+        laps = track.laps if fidelity == 'detailed' else 1
+        batch_size = max(1, BATCH_CELLS // max(1, n_drivers * laps))
+
+    wins = np.zeros(n_drivers, dtype=np.int64)
+    podiums = np.zeros(n_drivers, dtype=np.int64)
+    scored = np.zeros(n_drivers, dtype=np.int64)
+    total_points = np.zeros(n_drivers)
+
+    done = 0
+    while done < samples and not (cancel is not None and cancel.is_set()):
+        if target is None:
+            goal = samples
+        elif done and leader_half_width(wins, done) <= target:
+            break
+        else:
+            goal = done + adaptive_batch(wins, done, samples, target)
+        while done < goal:
+            if cancel is not None and cancel.is_set():
+                break
+            batch = min(batch_size, goal - done)
+            positions, finished, points = simulate_weekends(field, track, rng, batch, fidelity=fidelity)
+            wins += np.count_nonzero(finished & (positions == 0), axis=0)
+            podiums += np.count_nonzero(finished & (positions < 3), axis=0)
+            scored += np.count_nonzero(points_finishes(positions, finished), axis=0)
+            total_points += points.sum(axis=0)
+            done += batch
+            if progress is not None:
+                progress(done, samples)
+
+    return PredictionResult(track.name, [driver.name for driver in drivers], done,
+                            wins, podiums, scored, total_points, target)
@@ -0,0 +1,180 @@
+# f1_profile.py
+
+import cProfile
+import io
+import json
+import pstats
+import time
+
+import numpy as np
+
+
+# Phases instrumentées de la boucle de saison, dans l'ordre d'exécution
+PHASES = ['weather', 'upgrades', 'qualifying', 'race_time', 'incidents', 'sorting_points', 'recording', 'logging',
+          'chart']
+
+
+class PhaseCounter:
+    # Temps mural et CPU cumulés d'une phase, nombre d'appels et temps mural par course.
+    # Sert directement de gestionnaire de contexte. Les temps sont exclusifs : une phase ouverte
+    # à l'intérieur d'une autre (p. ex. 'logging' pendant 'incidents') met la phase englobante en pause.
+    def __init__(self, name, stack=None):
+        self.name = name
+        self.stack = [] if stack is None else stack  # Phases ouvertes, partagée par les compteurs d'un Profiler
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.race_wall = 0.0
+        self.per_race = []
+        self.wall_start = 0.0
+        self.cpu_start = 0.0
+
+    def __enter__(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self.stack:
+            self.stack[-1].accumulate(wall, cpu)
+        self.stack.append(self)
+        self.wall_start, self.cpu_start = wall, cpu
+        return self
+
+    def __exit__(self, *exc_info):
+        wall, cpu = time.perf_counter(), time.process_time()
+        self.accumulate(wall, cpu)
+        self.calls += 1
+        self.stack.pop()
+        if self.stack:
+            self.stack[-1].wall_start, self.stack[-1].cpu_start = wall, cpu
+        return False
+
+    def accumulate(self, wall, cpu):
+        # Ajoute le temps écoulé depuis le dernier départ (ou la dernière reprise)
+        self.wall += wall - self.wall_start
+        self.race_wall += wall - self.wall_start
+        self.cpu += cpu - self.cpu_start
+
+    def end_race(self):
+        self.per_race.append(self.race_wall)
+        self.race_wall = 0.0
+
+    def end_season(self):
+        # Le temps passé après la dernière course (p. ex. vidage du journal) revient à cette course
+        if self.per_race:
+            self.per_race[-1] += self.race_wall
+            self.race_wall = 0.0
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'mean_wall': self.wall / self.calls if self.calls else 0.0,
+        }
+
+
+class NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class Profiler:
+    # Compteurs par phase de la simulation ; désactivé, chaque phase coûte un simple appel.
+    # `cprofile=True` enregistre en plus un profil cProfile complet de chaque saison.
+    def __init__(self, enabled=True, cprofile=False):
+        self.enabled = enabled
+        stack = []
+        self.counters = {name: PhaseCounter(name, stack) for name in PHASES}
+        self.races = []  # Nom du circuit de chaque course terminée
+        self.seasons = 0
+        self.season_wall = 0.0
+        self.season_cpu = 0.0
+        self.cprofile = cProfile.Profile() if cprofile else None
+
+    def phase(self, name):
+        if not self.enabled:
+            return NULL_PHASE
+        return self.counters[name]
+
+    def end_race(self, track_name):
+        if not self.enabled:
+            return
+        self.races.append(track_name)
+        for counter in self.counters.values():
+            counter.end_race()
+
+    def start_season(self):
+        if not self.enabled:
+            return
+        self.season_wall_start = time.perf_counter()
+        self.season_cpu_start = time.process_time()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def end_season(self):
+        if not self.enabled:
+            return
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.season_wall += time.perf_counter() - self.season_wall_start
+        self.season_cpu += time.process_time() - self.season_cpu_start
+        self.seasons += 1
+        for counter in self.counters.values():
+            counter.end_season()
+
+    def reset(self):
+        self.__init__(self.enabled, self.cprofile is not None)
+
+    def totals(self):
+        return {name: counter.to_dict() for name, counter in self.counters.items()}
+
+    def histograms(self, bins=10):
+        # Histogramme du temps mural par course, pour les phases exécutées pendant les courses
+        histograms = {}
+        for name, counter in self.counters.items():
+            if not any(counter.per_race):
+                continue
+            counts, edges = np.histogram(counter.per_race, bins=bins)
+            histograms[name] = {'counts': counts.tolist(), 'edges': edges.tolist()}
+        return histograms
+
+    def cprofile_stats(self, limit=30, sort='cumulative'):
+        if self.cprofile is None:
+            return ''
+        stream = io.StringIO()
+        pstats.Stats(self.cprofile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def to_dict(self, bins=10):
+        return {
+            'seasons': self.seasons,
+            'season_wall': self.season_wall,
+            'season_cpu': self.season_cpu,
+            'phases': self.totals(),
+            'races': self.races,
+            'per_race': {name: counter.per_race for name, counter in self.counters.items()},
+            'histograms': self.histograms(bins),
+        }
+
+    def dump(self, path, bins=10):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(bins), file, ensure_ascii=False, indent=2)
+
+    def report(self):
+        lines = [f'PROFIL - {self.seasons} saison(s), {len(self.races)} course(s), '
+                 f'{self.season_wall * 1000:.1f} ms mural, {self.season_cpu * 1000:.1f} ms CPU']
+        measured = sum(counter.wall for counter in self.counters.values())
+        total = max(self.season_wall, measured) or 1.0
+        lines.append(f"{'Phase':<16}{'Appels':>8}{'Mural (ms)':>12}{'CPU (ms)':>12}{'Part':>8}{'Max/course (ms)':>17}")
+        for name, counter in self.counters.items():
+            worst = max(counter.per_race, default=0.0)
+            lines.append(f'{name:<16}{counter.calls:>8}{counter.wall * 1000:>12.2f}{counter.cpu * 1000:>12.2f}'
+                         f'{counter.wall / total:>8.1%}{worst * 1000:>17.2f}')
+        if self.season_wall > measured:
+            other = self.season_wall - measured
+            lines.append(f"{'(autres)':<16}{'':>8}{other * 1000:>12.2f}{'':>12}{other / total:>8.1%}")
+        return '\n'.join(lines)
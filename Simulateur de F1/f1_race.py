@@ -0,0 +1,596 @@
+# f1_race.py
+
+import numpy as np
+
+from f1_model import (CONDITION_OFFSETS, CONDITIONS, PERSONALITIES, RAIN_MASTERS, TIRE_TYPES, WEATHERS, Roster,
+                      Track, condition_index)
+
+
+# Pneus choisis par Driver.update_tire_strategy, indexés par [météo][personnalité]
+COMPOUNDS = [
+    ['Soft', 'Hard', 'Medium'],
+    ['Wet', 'Wet', 'Wet'],
+    ['Intermediate', 'Intermediate', 'Intermediate'],
+]
+
+PIT_STOP_TIME = 10
+WEATHER_CHANGE_PROBABILITY = 0.01
+LAP_VARIATION = 0.02
+FATIGUE_PROBABILITY = 0.001
+QUALIFYING_VARIATION = 0.05
+QUALIFYING_CUTS = [15, 10]  # Pilotes qualifiés pour Q2, puis pour Q3
+
+PENALTY_PROBABILITY = 0.02
+PENALTY_TIME = 5
+AVG_INCIDENTS = 1
+MAX_INCIDENTS = 2
+MAJOR_INCIDENT_PROBABILITY = 0.3
+MINOR_INCIDENT_TIME = 5
+
+# Moteur à événements : Safety Car en course, commun à tout le plateau
+SAFETY_CAR_PROBABILITY = 0.015  # Par tour de course sous drapeau vert
+SAFETY_CAR_LAPS = 4
+SAFETY_CAR_SLOWDOWN = 1.4  # Multiplicateur du temps au tour derrière le Safety Car
+SAFETY_CAR_GAP = 0.5  # Écart maximal entre deux pilotes consécutifs au moment de la relance
+SAFETY_CAR_PIT_WEAR = 0.5  # Usure à partir de laquelle un pilote profite du Safety Car pour s'arrêter
+SAFETY_CAR_PIT_FACTOR = 0.5  # Part du temps d'arrêt perdue sous Safety Car
+
+# Événements de course, par ordre de traitement au sein d'un même tour
+EVENT_ORDER = ['safety_car_end', 'weather', 'safety_car', 'pit']
+
+# Niveaux de fidélité de simulate_race : tour par tour, tirage direct des totaux de course,
+# ou course à événements partagés par tout le plateau (voir EventRace)
+FIDELITIES = ['detailed', 'fast', 'events']
+
+# Coefficients de l'approximation rationnelle de la fonction quantile de la loi normale (Acklam)
+QUANTILE_A = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+              1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+QUANTILE_B = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+              6.680131188771972e+01, -1.328068155288572e+01]
+QUANTILE_C = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+              -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+QUANTILE_D = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00]
+
+
+def pit_thresholds():
+    # Seuils d'usure de Driver.decide_pit_stop, par personnalité
+    return np.array([0.2 if personality == 'aggressive' else 0.4 for personality in PERSONALITIES])
+
+
+def pit_intervals(tire_types=TIRE_TYPES):
+    # Nombre de tours entre le montage d'un pneu neuf et l'arrêt suivant,
+    # reproduisant le test `remaining / durability <= threshold` de la boucle tour par tour
+    thresholds = pit_thresholds()
+    intervals = np.zeros((len(WEATHERS), len(PERSONALITIES)), dtype=np.int64)
+    for w, row in enumerate(COMPOUNDS):
+        for p, compound in enumerate(row):
+            durability = tire_types[compound]['durability']
+            laps = 1
+            while (durability - laps) / durability > thresholds[p]:
+                laps += 1
+            intervals[w, p] = laps
+    return intervals
+
+
+def normal_quantile(p):
+    # Inverse de la fonction de répartition de la loi normale centrée réduite (erreur relative < 1.2e-9)
+    p = np.asarray(p, dtype=float)
+    a, b, c, d = QUANTILE_A, QUANTILE_B, QUANTILE_C, QUANTILE_D
+    low = p < 0.02425
+    high = p > 1 - 0.02425
+    tail = np.sqrt(-2 * np.log(np.where(low, p, np.where(high, 1 - p, 0.5))))
+    tail_value = ((((((c[0] * tail + c[1]) * tail + c[2]) * tail + c[3]) * tail + c[4]) * tail + c[5])
+                  / ((((d[0] * tail + d[1]) * tail + d[2]) * tail + d[3]) * tail + 1))
+    q = p - 0.5
+    r = q * q
+    central = ((((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q
+               / (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1))
+    return np.where(low, tail_value, np.where(high, -tail_value, central))
+
+
+def weather_change_events(rng, n_samples, n_drivers, laps, fidelity='detailed'):
+    # Changements de météo (échantillon, pilote, tour), triés par pilote puis par tour.
+    # 'detailed' tire chaque tour ; 'fast' tire le nombre de changements (loi binomiale)
+    # puis leurs tours, distincts et uniformes : même loi, sans tableau (échantillons, pilotes, tours).
+    if fidelity == 'detailed':
+        changes = rng.random((n_samples, n_drivers, laps), dtype=np.float32) < WEATHER_CHANGE_PROBABILITY
+        return np.nonzero(changes)
+
+    counts = rng.binomial(laps, WEATHER_CHANGE_PROBABILITY, size=n_samples * n_drivers)
+    flat_index = np.repeat(np.arange(n_samples * n_drivers), counts)
+    # Clé (pilote, tour) : un tour tiré deux fois pour le même pilote est retiré jusqu'à être distinct
+    key = flat_index * laps + rng.integers(0, laps, size=len(flat_index))
+    while True:
+        key.sort()
+        duplicate = np.zeros(len(key), dtype=bool)
+        duplicate[1:] = key[1:] == key[:-1]
+        if not duplicate.any():
+            break
+        key[duplicate] = key[duplicate] - key[duplicate] % laps + rng.integers(0, laps, size=int(duplicate.sum()))
+    flat_index, change_lap = np.divmod(key, laps)
+    return flat_index // n_drivers, flat_index % n_drivers, change_lap
+
+
+def lap_variation_totals(rng, n_samples, n_drivers, laps, fidelity='detailed'):
+    # Somme et minimum des `laps` variations gaussiennes de chaque pilote.
+    # Avec 'fast', `laps` peut aussi être un tableau diffusable en (échantillons, pilotes), au moins 1.
+    # 'fast' tire directement le minimum (statistique d'ordre), puis la somme des autres tours :
+    # normales tronquées au-dessus du minimum, approchées par une loi normale de même moyenne et variance.
+    if fidelity == 'detailed':
+        variations = rng.standard_normal((n_samples, n_drivers, laps))
+        return variations.sum(axis=2), variations.min(axis=2)
+
+    shape = (n_samples, n_drivers)
+    # P(min > m) = (1 - Φ(m))^laps, donc 1 - Φ(min) = V^(1/laps) avec V uniforme
+    survival = np.exp(np.log1p(-rng.random(shape)) / laps)
+    minimum = normal_quantile(-np.expm1(np.log(survival)))
+    mills = np.exp(-minimum ** 2 / 2) / np.sqrt(2 * np.pi) / survival
+    others = laps - 1
+    mean = others * mills
+    variance = others * np.maximum(1 + minimum * mills - mills ** 2, 0)
+    total = minimum + mean + np.sqrt(variance) * rng.standard_normal(shape)
+    return total, minimum
+
+
+class RaceField:
+    # Chaque attribut est un tableau (pilotes,) ou (échantillons, pilotes).
+    # `qualifying_pace` (…, pilotes) et `pace` (…, pilotes, météo, état de piste) viennent de la
+    # PaceTable de l'état ; à défaut les allures sont recalculées à partir des performances.
+    def __init__(self, skill, form, car_performance, personality, preferred, rain_master, penalties,
+                 dnf_percent=0, qualifying_pace=None, pace=None):
+        self.skill = np.asarray(skill, dtype=float)
+        self.form = np.asarray(form, dtype=float)
+        self.car_performance = np.asarray(car_performance, dtype=float)
+        self.personality = np.asarray(personality, dtype=np.int64)  # Index dans PERSONALITIES
+        self.preferred = np.asarray(preferred, dtype=bool)  # Circuit préféré pour la course simulée
+        self.rain_master = np.asarray(rain_master, dtype=bool)
+        self.penalties = np.asarray(penalties, dtype=float)
+        self.dnf_percent = np.broadcast_to(np.asarray(dnf_percent, dtype=float), self.skill.shape)
+        self.qualifying_pace = qualifying_pace
+        self.pace = pace
+
+    @classmethod
+    def from_state(cls, state, track, indices=None):
+        # Lecture directe des colonnes de l'état et de l'effectif, sans passer par les objets Driver
+        pace = state.pace_table()
+        qualifying_pace = pace.qualifying_pace(track, indices)
+        race_pace = pace.race_pace(track, indices)
+        if indices is None:
+            indices = slice(None)
+        roster = state.roster
+        return cls(state.column('skill')[indices], state.form[indices], state.column('car_performance')[indices],
+                   roster.personality[indices], roster.preferred(track.name)[indices],
+                   roster.rain_master[indices], state.penalties[indices], state.column('dnf_percent')[indices],
+                   qualifying_pace, race_pace)
+
+    @classmethod
+    def from_drivers(cls, drivers, track):
+        shared = Roster.shared(drivers)
+        if shared is not None:
+            state, indices = shared
+            return cls.from_state(state, track, indices)
+        return cls(
+            [driver.skill for driver in drivers],
+            [driver.form for driver in drivers],
+            [driver.car_performance for driver in drivers],
+            [PERSONALITIES.index(driver.personality) for driver in drivers],
+            [track.name in driver.preferred_tracks for driver in drivers],
+            [driver.name in RAIN_MASTERS for driver in drivers],
+            [driver.penalties for driver in drivers],
+            [driver.dnf_percent for driver in drivers],
+        )
+
+    def __len__(self):
+        return self.skill.shape[-1]
+
+    def take(self, order):
+        # Réordonne un plateau (pilotes,) selon `order` (échantillons, pilotes), p. ex. une grille de départ
+        return RaceField(self.skill[order], self.form[order], self.car_performance[order],
+                         self.personality[order], self.preferred[order], self.rain_master[order],
+                         self.penalties[order], self.dnf_percent[order],
+                         None if self.qualifying_pace is None else self.qualifying_pace[order],
+                         None if self.pace is None else self.pace[order])
+
+    def performance_factor(self):
+        return ((self.skill * self.form * 2) + self.car_performance * 1.5) / 350
+
+    def average_qualifying_time(self, track):
+        if self.qualifying_pace is not None:
+            return self.qualifying_pace
+        return track.record - (self.performance_factor() * 5)
+
+
+class RaceOutcome:
+    def __init__(self, race_times, fastest_laps, pit_stops, fatigue_incidents, final_weather, safety_car=None,
+                 events=None):
+        self.race_times = race_times
+        self.fastest_laps = fastest_laps
+        self.pit_stops = pit_stops
+        self.fatigue_incidents = fatigue_incidents
+        self.final_weather = final_weather  # Index dans WEATHERS laissé sur la piste, -1 si inchangée
+        self.safety_car = safety_car  # Safety Car sorti pendant la course (None : non modélisé)
+        self.events = events  # [(tour, type, détail)...] des événements communs au plateau (course unique)
+
+    def apply_weather(self, track):
+        # Reporte sur la piste partagée le dernier changement de météo de la course,
+        # sans jamais quitter la météo ni l'état de piste imposés
+        if self.final_weather >= 0:
+            track.weather = WEATHERS[self.final_weather]
+            if track.forced_weather is not None:
+                track.weather = track.forced_weather
+            track.condition = 'wet' if track.weather == 'rainy' else 'standard'
+            if track.forced_condition is not None:
+                track.condition = track.forced_condition
+
+
+class RaceIncidents:
+    # Abandons, pénalités et incidents de course d'un lot de courses, sous forme de masques
+    # (échantillons, pilotes) dans l'ordre de la grille. Les tirages se font en deux temps, comme
+    # dans SeasonSimulator : abandons et pénalités avant la course (sample), incidents après
+    # (draw_race_incidents), parmi les pilotes encore en course.
+    def __init__(self, dnf, penalties):
+        self.dnf = dnf
+        self.penalties = penalties  # Secondes de pénalité (pilotes en course uniquement)
+        self.involved = np.zeros_like(dnf)
+        self.major = np.zeros_like(dnf)
+
+    @classmethod
+    def sample(cls, dnf_percent, rng, samples=1):
+        # `dnf_percent` : (pilotes,) ou (échantillons, pilotes)
+        dnf_percent = np.asarray(dnf_percent, dtype=float)
+        shape = (samples, dnf_percent.shape[-1])
+        dnf = rng.random(shape) < dnf_percent / 100
+        penalties = np.where(~dnf & (rng.random(shape) < PENALTY_PROBABILITY), PENALTY_TIME, 0)
+        return cls(dnf, penalties)
+
+    def draw_race_incidents(self, rng, avg_incidents=AVG_INCIDENTS, max_incidents=MAX_INCIDENTS):
+        # Jusqu'à `max_incidents` pilotes encore en course tirés sans remise, chacun majeur ou mineur
+        n_samples, n_drivers = self.dnf.shape
+        eligible = ~self.dnf
+        num_incidents = np.minimum(rng.poisson(avg_incidents, n_samples), max_incidents)
+        num_incidents = np.minimum(num_incidents, eligible.sum(axis=1))
+        keys = np.where(eligible, rng.random((n_samples, n_drivers)), 2.0)
+        picked = np.argsort(keys, axis=1)[:, :max_incidents]
+        self.involved = np.zeros((n_samples, n_drivers), dtype=bool)
+        np.put_along_axis(self.involved, picked, np.arange(picked.shape[1]) < num_incidents[:, None], axis=1)
+        self.major = self.involved & (rng.random((n_samples, n_drivers)) < MAJOR_INCIDENT_PROBABILITY)
+        return self
+
+    @property
+    def minor(self):
+        return self.involved & ~self.major
+
+    @property
+    def retired(self):
+        return self.dnf | self.major
+
+    @property
+    def time_penalties(self):
+        # Secondes ajoutées au temps de course : pénalités et incidents mineurs
+        return self.penalties + np.where(self.minor, MINOR_INCIDENT_TIME, 0)
+
+    @property
+    def counts(self):
+        # Incidents comptés par pilote : un abandon ou un incident (majeur ou mineur)
+        return self.dnf.astype(np.int64) + self.involved
+
+    @property
+    def safety_car(self):
+        # Même règle que Track.check_for_safety_car : tout abandon est un incident majeur
+        return Track.safety_car_needed(self.retired)
+
+
+def simulate_qualifying(field, track, rng, samples=None, return_times=False):
+    # Q1, Q2 et Q3 pour tous les échantillons ; renvoie la grille de départ sous forme d'indices
+    # dans le plateau, de forme (échantillons, pilotes). Chaque élimination est une sélection
+    # partielle (argpartition) : seuls les pilotes éliminés d'une séance sont triés entre eux.
+    # Avec `return_times`, renvoie aussi les temps (échantillons, séances, pilotes) dans l'ordre
+    # du plateau, NaN pour les pilotes qui n'ont pas pris part à une séance.
+    n_samples = 1 if samples is None else samples
+    n_drivers = len(field)
+    avg_qualifying_time = np.broadcast_to(field.average_qualifying_time(track), (n_samples, n_drivers))
+    times = np.full((n_samples, len(QUALIFYING_CUTS) + 1, n_drivers), np.nan) if return_times else None
+
+    # Pilotes encore en lice (indices dans le plateau) et leur temps moyen, dans le même ordre
+    candidates = np.broadcast_to(np.arange(n_drivers), (n_samples, n_drivers))
+    pace = avg_qualifying_time
+    eliminated = []
+    for session, cut in enumerate(QUALIFYING_CUTS + [0]):
+        # Mêmes valeurs que rng.normal(pace, QUALIFYING_VARIATION), sans diffusion des paramètres
+        lap_times = pace + QUALIFYING_VARIATION * rng.standard_normal(pace.shape)
+        if return_times:
+            np.put_along_axis(times[:, session], candidates, lap_times, axis=1)
+        if not cut:
+            # Dernière séance : ordre complet des pilotes restants
+            eliminated.append(np.take_along_axis(candidates, np.argsort(lap_times, axis=1), axis=1))
+            break
+        if cut >= candidates.shape[1]:
+            continue
+        selection = np.argpartition(lap_times, cut, axis=1)
+        slowest = selection[:, cut:]
+        slowest = np.take_along_axis(slowest, np.argsort(np.take_along_axis(lap_times, slowest, axis=1), axis=1),
+                                     axis=1)
+        eliminated.append(np.take_along_axis(candidates, slowest, axis=1))
+        fastest = selection[:, :cut]
+        candidates = np.take_along_axis(candidates, fastest, axis=1)
+        pace = np.take_along_axis(pace, fastest, axis=1)
+
+    grid = np.concatenate(eliminated[::-1], axis=1)
+    if samples is None:
+        grid = grid[0]
+        times = None if times is None else times[0]
+    return (grid, times) if return_times else grid
+
+
+def simulate_race(field, track, rng, samples=None, active=None, tire_types=TIRE_TYPES, fidelity='detailed'):
+    # Simule tout le plateau d'un coup pour `samples` courses (échantillons, pilotes, tours).
+    # Les pilotes sont traités dans l'ordre du plateau, comme la boucle de SeasonSimulator :
+    # un changement de météo déclenché par un pilote s'applique aux suivants.
+    # `active` (échantillons, pilotes) exclut de cette chaîne les pilotes déjà abandonnés.
+    # `fidelity` : 'detailed' (tour par tour) ou 'fast' (O(1) par pilote, même loi ; voir f1_validation),
+    # ou 'events' (simulate_race_events : météo et Safety Car communs à tout le plateau)
+    if fidelity not in FIDELITIES:
+        raise ValueError(f'Fidélité inconnue : {fidelity}')
+    if fidelity == 'events':
+        return simulate_race_events(field, track, rng, samples, active, tire_types)
+    n_samples = 1 if samples is None else samples
+    n_drivers = len(field)
+    laps = track.laps
+
+    # Changements de météo : seuls les événements (~1 % des tours) sont traités
+    sample_index, driver_index, change_lap = weather_change_events(rng, n_samples, n_drivers, laps, fidelity)
+    change_weather = rng.integers(0, len(WEATHERS), size=len(change_lap))
+    if track.forced_weather is not None:
+        # Comme Track.update_weather_conditions : tirage conservé, météo imposée
+        change_weather[:] = WEATHERS.index(track.forced_weather)
+    flat_index = sample_index * n_drivers + driver_index
+    first_event = np.ones(len(flat_index), dtype=bool)
+    first_event[1:] = flat_index[1:] != flat_index[:-1]
+    last_event = np.ones(len(flat_index), dtype=bool)
+    last_event[:-1] = flat_index[1:] != flat_index[:-1]
+
+    first_change = np.full(n_samples * n_drivers, laps)
+    first_change[flat_index[first_event]] = change_lap[first_event]
+    first_change = first_change.reshape(n_samples, n_drivers)
+    final_weather = np.full(n_samples * n_drivers, -1)
+    final_weather[flat_index[last_event]] = change_weather[last_event]
+    final_weather = final_weather.reshape(n_samples, n_drivers)
+
+    # Météo et état de piste au départ de chaque pilote, hérités du dernier pilote
+    # précédent ayant subi un changement
+    has_change = final_weather >= 0
+    if active is not None:
+        has_change = has_change & active
+    latest = np.maximum.accumulate(np.where(has_change, np.arange(n_drivers), -1), axis=1)
+    source = np.concatenate([np.full((n_samples, 1), -1), latest[:, :-1]], axis=1)
+    inherited = source >= 0
+    inherited_weather = np.take_along_axis(final_weather, np.maximum(source, 0), axis=1)
+    start_weather = np.where(inherited, inherited_weather, WEATHERS.index(track.weather))
+    inherited_condition = np.where(inherited_weather == WEATHERS.index('rainy'), CONDITIONS.index('wet'),
+                                   CONDITIONS.index('standard'))
+    if track.forced_condition is not None:
+        inherited_condition[:] = condition_index(track.forced_condition)
+    start_condition = np.where(inherited, inherited_condition, condition_index(track.condition))
+
+    # Temps moyen au tour, comme dans Driver.calculate_race_time
+    if field.pace is not None:
+        drivers_index = np.arange(n_drivers)
+        if field.pace.ndim == 4:
+            avg_lap_time = field.pace[np.arange(n_samples)[:, None], drivers_index, start_weather, start_condition]
+        else:
+            avg_lap_time = field.pace[drivers_index, start_weather, start_condition]
+    else:
+        offsets = np.array([CONDITION_OFFSETS.get(condition, 0) for condition in CONDITIONS], dtype=float)
+        avg_lap_time = track.record - (field.performance_factor() * 5) + offsets[start_condition]
+        avg_lap_time = avg_lap_time * np.where(field.preferred, 1.10, 1.0)
+        rain_bonus = np.where(field.rain_master, 1.05, 0.95)
+        avg_lap_time = avg_lap_time * np.where(start_weather == WEATHERS.index('rainy'), rain_bonus, 1.0)
+
+    # Variations au tour : seules leur somme et leur minimum sont nécessaires
+    variation_sum, variation_min = lap_variation_totals(rng, n_samples, n_drivers, laps, fidelity)
+    race_times = avg_lap_time * (laps + LAP_VARIATION * variation_sum)
+    fastest_laps = np.round(avg_lap_time * (1 + LAP_VARIATION * variation_min), 3)
+
+    # Arrêts aux stands : un pneu neuf est monté au départ, à chaque changement de météo
+    # et à chaque arrêt, puis l'arrêt suivant tombe tous les `interval` tours.
+    # Un relais commençant au tour a et finissant avant le tour b compte (b - 1 - a) // interval arrêts.
+    intervals = pit_intervals(tire_types)
+    personality = np.broadcast_to(field.personality, (n_samples, n_drivers))
+    pit_stops = np.maximum(first_change - 1, 0) // intervals[start_weather, personality]
+    segment_end = np.full(len(change_lap), laps)
+    segment_end[:-1] = np.where(last_event[:-1], laps, change_lap[1:])
+    segment_pits = (segment_end - 1 - change_lap) // intervals[change_weather, personality.ravel()[flat_index]]
+    pit_stops = pit_stops + np.bincount(flat_index, segment_pits,
+                                        minlength=n_samples * n_drivers).reshape(n_samples, n_drivers).astype(np.int64)
+
+    race_times = race_times + pit_stops * PIT_STOP_TIME + field.penalties
+
+    # Fatigue : chaque tour du dernier quart a une petite probabilité d'incident
+    fatigue_laps = int(np.count_nonzero(np.arange(1, laps + 1) > laps * 0.75))
+    fatigue_incidents = rng.binomial(fatigue_laps, FATIGUE_PROBABILITY, size=(n_samples, n_drivers))
+
+    # Météo laissée par le dernier pilote ayant subi un changement
+    last = latest[:, -1]
+    final = np.where(last >= 0, np.take_along_axis(final_weather, np.maximum(last, 0)[:, None], axis=1)[:, 0], -1)
+
+    if samples is None:
+        return RaceOutcome(race_times[0], fastest_laps[0], pit_stops[0], fatigue_incidents[0], int(final[0]))
+    return RaceOutcome(race_times, fastest_laps, pit_stops, fatigue_incidents, final)
+
+
+class EventRace:
+    # Course à événements discrets pour tout un lot d'échantillons. Pas de file de priorité : chaque
+    # échantillon garde dans des tableaux denses le prochain tour de chaque type d'événement
+    # (`next_weather`, `next_safety_car` et `next_pit` par pilote). Chaque passe de la boucle prend le
+    # minimum de ces tableaux, avance chaque échantillon jusqu'à ce tour (tirage direct des totaux, comme
+    # la fidélité 'fast'), puis traite les événements du tour dans l'ordre EVENT_ORDER au moyen de masques
+    # sur tout le lot. Le nombre de passes est celui des événements de l'échantillon le plus chargé.
+    # Comme les autres fidélités, un changement de météo monte des pneus neufs à tous les pilotes sans
+    # passage aux stands (ni temps d'arrêt ni arrêt compté).
+    def __init__(self, field, track, rng, samples=None, active=None, tire_types=TIRE_TYPES):
+        self.track = track
+        self.rng = rng
+        self.laps = track.laps
+        self.n_samples = 1 if samples is None else samples
+        self.n_drivers = len(field)
+        shape = (self.n_samples, self.n_drivers)
+        self.field = field
+        self.personality = np.broadcast_to(field.personality, shape)
+        self.active = np.ones(shape, dtype=bool) if active is None else np.broadcast_to(active, shape)
+        self.intervals = pit_intervals(tire_types)
+        self.durability = np.array([[tire_types[compound]['durability'] for compound in row] for row in COMPOUNDS])
+        # Liste des événements (tour, type, détail) pour une course unique
+        self.events = [] if samples is None else None
+
+        self.weather = np.full(self.n_samples, WEATHERS.index(track.weather))
+        self.condition = np.full(self.n_samples, condition_index(track.condition))
+        self.weather_changed = np.zeros(self.n_samples, dtype=bool)
+        self.safety_car = np.zeros(self.n_samples, dtype=bool)
+        self.safety_car_deployed = np.zeros(self.n_samples, dtype=bool)
+        self.lap = np.zeros(self.n_samples, dtype=np.int64)  # Tours bouclés par le plateau
+
+        self.race_times = np.zeros(shape)
+        self.fastest_laps = np.full(shape, np.inf)
+        self.pit_stops = np.zeros(shape, dtype=np.int64)
+        self.fitted = np.zeros(shape, dtype=np.int64)  # Tour de montage du pneu actuel
+        # Prochains événements de chaque échantillon ; un tour ≥ laps tombe après l'arrivée
+        self.next_pit = np.where(self.active, self.intervals[self.weather[:, None], self.personality], self.laps)
+        self.next_weather = self.lap + rng.geometric(WEATHER_CHANGE_PROBABILITY, self.n_samples)
+        self.next_safety_car = self.lap + rng.geometric(SAFETY_CAR_PROBABILITY, self.n_samples)
+
+    def record(self, samples, kind, detail=None):
+        if self.events is not None and samples.any():
+            self.events.append((int(self.lap[0]), kind, detail))
+
+    def lap_time(self, rows):
+        # Temps moyen au tour (lignes, pilotes) sous la météo et l'état de piste de chaque échantillon
+        weather, condition = self.weather[rows, None], self.condition[rows, None]
+        drivers_index = np.arange(self.n_drivers)
+        if self.field.pace is not None:
+            if self.field.pace.ndim == 4:
+                return self.field.pace[rows[:, None], drivers_index, weather, condition]
+            return self.field.pace[drivers_index, weather, condition]
+        shape = (self.n_samples, self.n_drivers)
+        offsets = np.array([CONDITION_OFFSETS.get(name, 0) for name in CONDITIONS], dtype=float)
+        performance = np.broadcast_to(self.field.performance_factor(), shape)[rows]
+        avg_lap_time = self.track.record - (performance * 5) + offsets[condition]
+        avg_lap_time = avg_lap_time * np.where(np.broadcast_to(self.field.preferred, shape)[rows], 1.10, 1.0)
+        rain_bonus = np.where(np.broadcast_to(self.field.rain_master, shape)[rows], 1.05, 0.95)
+        return avg_lap_time * np.where(weather == WEATHERS.index('rainy'), rain_bonus, 1.0)
+
+    def advance(self, lap):
+        # Tours [self.lap, lap) sans événement, pour les seuls échantillons qui avancent ;
+        # le meilleur tour n'est retenu que sous drapeau vert
+        rows = np.flatnonzero(lap > self.lap)
+        if len(rows):
+            laps = (lap[rows] - self.lap[rows])[:, None]
+            avg_lap_time = self.lap_time(rows)
+            variation_sum, variation_min = lap_variation_totals(self.rng, len(rows), self.n_drivers, laps, 'fast')
+            slowdown = np.where(self.safety_car[rows], SAFETY_CAR_SLOWDOWN, 1.0)[:, None]
+            self.race_times[rows] += avg_lap_time * slowdown * (laps + LAP_VARIATION * variation_sum)
+            fastest = np.round(avg_lap_time * (1 + LAP_VARIATION * variation_min), 3)
+            green = ~self.safety_car[rows, None]
+            self.fastest_laps[rows] = np.where(green, np.minimum(self.fastest_laps[rows], fastest),
+                                               self.fastest_laps[rows])
+        self.lap = lap
+
+    def fit(self, rows, drivers):
+        # Pneus neufs pour les pilotes `drivers` (masque lignes x pilotes) des échantillons `rows`,
+        # puis prochain arrêt de chacun
+        lap = self.lap[rows, None]
+        self.fitted[rows] = np.where(drivers, lap, self.fitted[rows])
+        self.next_pit[rows] = np.where(drivers, lap + self.intervals[self.weather[rows, None], self.personality[rows]],
+                                       self.next_pit[rows])
+
+    def pit(self, rows, drivers, pit_time=PIT_STOP_TIME):
+        # Arrêt aux stands : temps perdu, arrêt compté et pneus neufs
+        self.race_times[rows] += np.where(drivers, pit_time, 0)
+        self.pit_stops[rows] += drivers
+        self.fit(rows, drivers)
+
+    def on_pit(self, samples):
+        rows = np.flatnonzero(samples)
+        self.pit(rows, self.active[rows] & (self.next_pit[rows] == self.lap[rows, None]))
+
+    def on_weather(self, samples):
+        # Même tirage que Track.update_weather_conditions ; comme Driver.calculate_race_time,
+        # les pilotes repartent sur des pneus neufs adaptés à la nouvelle météo sans s'arrêter
+        rows = np.flatnonzero(samples)
+        previous_weather = self.weather.copy()
+        weather = self.rng.integers(len(WEATHERS), size=len(rows))
+        if self.track.forced_weather is not None:
+            weather[:] = WEATHERS.index(self.track.forced_weather)
+        self.weather[rows] = weather
+        self.condition[rows] = np.where(weather == WEATHERS.index('rainy'), CONDITIONS.index('wet'),
+                                        CONDITIONS.index('standard'))
+        if self.track.forced_condition is not None:
+            self.condition[rows] = condition_index(self.track.forced_condition)
+        self.weather_changed[rows] = True
+        self.record(samples & (self.weather != previous_weather), 'weather', WEATHERS[self.weather[0]])
+        self.fit(rows, self.active[rows])
+        self.next_weather[rows] = self.lap[rows] + self.rng.geometric(WEATHER_CHANGE_PROBABILITY, len(rows))
+
+    def on_safety_car(self, samples):
+        # Fenêtre d'arrêts : les pilotes aux pneus usés s'arrêtent à moindre coût
+        rows = np.flatnonzero(samples)
+        wear = (self.lap[rows, None] - self.fitted[rows]) / self.durability[self.weather[rows, None],
+                                                                             self.personality[rows]]
+        window = self.active[rows] & (wear >= SAFETY_CAR_PIT_WEAR)
+        self.record(samples, 'safety_car', int(window.sum()))
+        self.pit(rows, window, PIT_STOP_TIME * SAFETY_CAR_PIT_FACTOR)
+        self.safety_car[rows] = True
+        self.safety_car_deployed[rows] = True
+        self.next_safety_car[rows] = self.lap[rows] + SAFETY_CAR_LAPS
+
+    def on_safety_car_end(self, samples):
+        # Relance : le plateau est regroupé, au plus SAFETY_CAR_GAP secondes entre deux pilotes consécutifs
+        rows = np.flatnonzero(samples)
+        times = np.where(self.active[rows], self.race_times[rows], np.inf)
+        order = np.argsort(times, axis=1, kind='stable')
+        ordered = np.take_along_axis(times, order, axis=1)
+        bunched = ordered[:, :1] + SAFETY_CAR_GAP * np.arange(self.n_drivers)
+        ordered = np.where(np.isinf(ordered), ordered, np.minimum(ordered, bunched))
+        np.put_along_axis(times, order, ordered, axis=1)
+        self.race_times[rows] = np.where(self.active[rows], times, self.race_times[rows])
+        self.record(samples, 'safety_car_end')
+        self.safety_car[rows] = False
+        self.next_safety_car[rows] = self.lap[rows] + self.rng.geometric(SAFETY_CAR_PROBABILITY, len(rows))
+
+    def run(self):
+        while True:
+            # Les pilotes hors course ne s'arrêtent jamais : leur next_pit reste après l'arrivée
+            next_pit = self.next_pit.min(axis=1)
+            next_lap = np.minimum(np.minimum(self.next_weather, self.next_safety_car), next_pit)
+            pending = next_lap < self.laps
+            if not pending.any():
+                break
+            self.advance(np.where(pending, next_lap, self.lap))
+            at_lap = pending & (self.lap == next_lap)
+            for kind in EVENT_ORDER:
+                if kind == 'safety_car_end':
+                    samples = at_lap & self.safety_car & (self.next_safety_car == self.lap)
+                elif kind == 'safety_car':
+                    samples = at_lap & ~self.safety_car & (self.next_safety_car == self.lap)
+                elif kind == 'weather':
+                    samples = at_lap & (self.next_weather == self.lap)
+                else:
+                    samples = at_lap
+                if samples.any():
+                    getattr(self, 'on_' + kind)(samples)
+        # Un Safety Car encore en piste à l'arrivée couvre les derniers tours
+        self.advance(np.full(self.n_samples, self.laps))
+
+        fatigue_laps = int(np.count_nonzero(np.arange(1, self.laps + 1) > self.laps * 0.75))
+        fatigue_incidents = self.rng.binomial(fatigue_laps, FATIGUE_PROBABILITY, size=self.race_times.shape)
+        race_times = self.race_times + self.field.penalties
+        final_weather = np.where(self.weather_changed, self.weather, -1)
+        if self.events is not None:
+            return RaceOutcome(race_times[0], self.fastest_laps[0], self.pit_stops[0], fatigue_incidents[0],
+                               int(final_weather[0]), bool(self.safety_car_deployed[0]), self.events)
+        return RaceOutcome(race_times, self.fastest_laps, self.pit_stops, fatigue_incidents, final_weather,
+                           self.safety_car_deployed)
+
+
+def simulate_race_events(field, track, rng, samples=None, active=None, tire_types=TIRE_TYPES):
+    # Mêmes sorties que simulate_race, plus le Safety Car et, pour une course unique, la liste des événements
+    return EventRace(field, track, rng, samples, active, tire_types).run()
@@ -0,0 +1,228 @@
+# f1_scenarios.py
+
+import copy
+import itertools
+
+import numpy as np
+
+from f1_engine import SeasonSimulator
+from f1_model import CONDITIONS, TIRE_TYPES, WEATHERS, SeasonState
+from f1_prediction import BATCH_CELLS, simulate_weekends
+from f1_race import RaceField
+from f1_stats import RunningStats
+
+
+# Balayage de scénarios « et si ? » à nombres aléatoires communs : tous les scénarios sont simulés
+# avec les mêmes graines (une par lot de courses, ou une par saison), si bien que les écarts avec la
+# référence se mesurent échantillon par échantillon et que le bruit commun aux scénarios s'annule.
+DRIVER_COLUMNS = ['skill', 'car_performance', 'dnf_percent']
+TEAM_SETTINGS = ['budget', 'upgrade_cost', 'upgrade_step']
+TRACK_SETTINGS = ['weather', 'condition']
+# Seule la durabilité des gommes agit sur les courses (via pit_intervals) : leur performance
+# n'est lue par aucun moteur de course, un scénario qui la modifierait n'aurait aucun effet
+TIRE_SETTINGS = ['durability']
+
+
+def merge_overrides(first, second):
+    # Fusion sur deux niveaux (nom -> paramètres), `second` l'emportant
+    merged = {key: dict(values) for key, values in first.items()}
+    for key, values in second.items():
+        merged.setdefault(key, {}).update(values)
+    return merged
+
+
+class Scenario:
+    def __init__(self, name, drivers=None, teams=None, tracks=None, tire_types=None):
+        # drivers : pilote ou équipe -> variations ajoutées, p. ex. {'Alpine': {'car_performance': 5}}
+        # teams : équipe -> paramètres de Team, p. ex. {'Alpine': {'upgrade_step': 2}}
+        # tracks : circuit -> météo et état de piste imposés, p. ex. {'Monaco GP - Monaco': {'weather': 'rainy'}}
+        # tire_types : gomme -> durabilité remplaçant celle de TIRE_TYPES, p. ex. {'Soft': {'durability': 15}}
+        self.name = name
+        self.drivers = drivers or {}
+        self.teams = teams or {}
+        self.tracks = tracks or {}
+        self.tire_types = tire_types or {}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data.get('drivers'), data.get('teams'), data.get('tracks'), data.get('tire_types'))
+
+    def to_dict(self):
+        return {'name': self.name, 'drivers': self.drivers, 'teams': self.teams, 'tracks': self.tracks,
+                'tire_types': self.tire_types}
+
+    def combine(self, other):
+        return Scenario(f'{self.name} + {other.name}', merge_overrides(self.drivers, other.drivers),
+                        merge_overrides(self.teams, other.teams), merge_overrides(self.tracks, other.tracks),
+                        merge_overrides(self.tire_types, other.tire_types))
+
+    def check(self, drivers, tracks):
+        # Refuse les noms inconnus plutôt que de simuler silencieusement la référence
+        driver_names = {driver.name for driver in drivers}
+        team_names = {driver.team for driver in drivers}
+        track_names = {track.name for track in tracks}
+        for section, known, allowed in ((self.drivers, driver_names | team_names, DRIVER_COLUMNS),
+                                        (self.teams, team_names, TEAM_SETTINGS),
+                                        (self.tracks, track_names, TRACK_SETTINGS),
+                                        (self.tire_types, set(TIRE_TYPES), TIRE_SETTINGS)):
+            for key, values in section.items():
+                if key not in known:
+                    raise ValueError(f'Scénario {self.name} : {key} inconnu')
+                unknown = [name for name in values if name not in allowed]
+                if unknown:
+                    raise ValueError(f"Scénario {self.name} : paramètre(s) inconnu(s) pour {key} : {', '.join(unknown)}")
+        for key, values in self.tracks.items():
+            if values.get('weather', WEATHERS[0]) not in WEATHERS or values.get('condition', CONDITIONS[0]) not in CONDITIONS:
+                raise ValueError(f'Scénario {self.name} : météo ou état de piste inconnu pour {key}')
+
+    def apply_drivers(self, drivers):
+        # Vues sur un nouvel état où les variations du scénario sont appliquées
+        state, views = SeasonState.for_drivers(list(drivers))
+        for key, changes in self.drivers.items():
+            rows = [driver.index for driver in views if key in (driver.name, driver.team)]
+            for column, delta in changes.items():
+                state.writable(column)[rows] += delta
+        return views
+
+    def apply_track(self, track):
+        # Copie du circuit, avec la météo (et l'état de piste qui en découle) imposée à chaque course
+        track = copy.copy(track)
+        settings = self.tracks.get(track.name, {})
+        if 'weather' in settings:
+            track.weather = track.forced_weather = settings['weather']
+            track.condition = 'wet' if track.weather == 'rainy' else 'standard'
+        if 'condition' in settings:
+            track.condition = track.forced_condition = settings['condition']
+        return track
+
+    def tire_table(self):
+        table = {compound: dict(values) for compound, values in TIRE_TYPES.items()}
+        for compound, values in self.tire_types.items():
+            table[compound].update(values)
+        return table
+
+
+def scenario_grid(*axes):
+    # Produit cartésien d'axes (listes de scénarios) : chaque combinaison cumule leurs modifications
+    grid = []
+    for combination in itertools.product(*axes):
+        scenario = combination[0]
+        for other in combination[1:]:
+            scenario = scenario.combine(other)
+        grid.append(scenario)
+    return grid
+
+
+class SweepResult:
+    def __init__(self, kind, subject, names, scenario_names):
+        # `kind` : 'race' (victoire en course) ou 'season' (titre) ; le premier scénario sert de référence
+        n_drivers = len(names)
+        self.kind = kind
+        self.subject = subject
+        self.names = list(names)
+        self.scenario_names = list(scenario_names)
+        self.samples = 0
+        # Par scénario, [points, victoire] de chaque pilote, et leurs écarts avec la référence
+        self.values = [RunningStats((2, n_drivers)) for _ in self.scenario_names]
+        self.deltas = [RunningStats((2, n_drivers)) for _ in self.scenario_names]
+
+    def add(self, outcomes):
+        # `outcomes` : un tableau (tirages, 2, pilotes) par scénario, obtenus avec les mêmes graines
+        baseline = outcomes[0]
+        for values, deltas, outcome in zip(self.values, self.deltas, outcomes):
+            values.add_batch(outcome)
+            deltas.add_batch(outcome - baseline)
+        self.samples += len(baseline)
+
+    def scenarios(self):
+        # Écarts appariés avec la référence ; `variance_reduction` compare la variance des écarts de points
+        # à celle qu'auraient deux simulations indépendantes du même nombre de tirages
+        n = max(self.samples, 1)
+        baseline = self.values[0]
+        summaries = []
+        for name, values, deltas in zip(self.scenario_names, self.values, self.deltas):
+            paired_se = np.sqrt(deltas.variance() / n)
+            independent_variance = np.sum(values.variance()[0] + baseline.variance()[0])
+            paired_variance = np.sum(deltas.variance()[0])
+            rows = [{
+                'name': driver,
+                'expected_points': float(values.mean[0, i]),
+                'win': float(values.mean[1, i]),
+                'delta_points': float(deltas.mean[0, i]),
+                'delta_points_se': float(paired_se[0, i]),
+                'delta_win': float(deltas.mean[1, i]),
+                'delta_win_se': float(paired_se[1, i]),
+            } for i, driver in enumerate(self.names)]
+            rows.sort(key=lambda row: row['expected_points'], reverse=True)
+            summaries.append({
+                'name': name,
+                'variance_reduction': float(independent_variance / paired_variance) if paired_variance > 0 else None,
+                'drivers': rows,
+            })
+        return summaries
+
+    def to_dict(self):
+        return {'kind': self.kind, 'subject': self.subject, 'samples': self.samples,
+                'baseline': self.scenario_names[0], 'scenarios': self.scenarios()}
+
+
+def prepare(scenarios, baseline, drivers, tracks):
+    scenarios = [baseline or Scenario('référence')] + list(scenarios)
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError('Noms de scénarios en double')
+    for scenario in scenarios:
+        scenario.check(drivers, tracks)
+    return scenarios
+
+
+def sweep_race(drivers, track, scenarios, samples=10_000, seed=None, fidelity='detailed', batch_size=None,
+               baseline=None):
+    # Week-ends sur `track` : chaque lot est simulé pour tous les scénarios avec la même graine
+    scenarios = prepare(scenarios, baseline, drivers, [track])
+    prepared = []
+    for scenario in scenarios:
+        scenario_track = scenario.apply_track(track)
+        field = RaceField.from_drivers(scenario.apply_drivers(drivers), scenario_track)
+        prepared.append((field, scenario_track, scenario.tire_table()))
+    if batch_size is None:
+        laps = track.laps if fidelity == 'detailed' else 1
+        batch_size = max(1, BATCH_CELLS // max(1, len(drivers) * laps))
+
+    result = SweepResult('race', track.name, [driver.name for driver in drivers],
+                         [scenario.name for scenario in scenarios])
+    sequence = np.random.SeedSequence(seed)
+    while result.samples < samples:
+        batch = min(batch_size, samples - result.samples)
+        batch_seed = sequence.spawn(1)[0]
+        outcomes = []
+        for field, scenario_track, tire_types in prepared:
+            rng = np.random.default_rng(batch_seed)
+            positions, finished, points = simulate_weekends(field, scenario_track, rng, batch, fidelity=fidelity,
+                                                            tire_types=tire_types)
+            outcomes.append(np.stack([points, finished & (positions == 0)], axis=1))
+        result.add(outcomes)
+    return result
+
+
+def sweep_seasons(drivers, tracks, scenarios, seasons=100, seed=None, fidelity='detailed', baseline=None):
+    # Saisons complètes : la saison i reçoit la même graine pour tous les scénarios (et dans run_seasons)
+    scenarios = prepare(scenarios, baseline, drivers, tracks)
+    prepared = [(scenario.apply_drivers(drivers), [scenario.apply_track(track) for track in tracks],
+                 scenario.tire_table(), scenario.teams) for scenario in scenarios]
+
+    names = [driver.name for driver in drivers]
+    index = {name: i for i, name in enumerate(names)}
+    result = SweepResult('season', len(tracks), names, [scenario.name for scenario in scenarios])
+    for season_seed in np.random.SeedSequence(seed).spawn(seasons):
+        outcomes = []
+        for views, scenario_tracks, tire_types, team_settings in prepared:
+            season = SeasonSimulator(views, scenario_tracks, seed=season_seed, fidelity=fidelity,
+                                     tire_types=tire_types, team_settings=team_settings).run()
+            outcome = np.zeros((1, 2, len(names)))
+            for row in season.standings:
+                outcome[0, 0, index[row['name']]] = row['points']
+            outcome[0, 1, index[season.drivers_ranked[0].name]] = 1
+            outcomes.append(outcome)
+        result.add(outcomes)
+    return result
@@ -0,0 +1,202 @@
+# f1_scoring.py
+
+import numpy as np
+
+from f1_model import POINTS_DISTRIBUTION
+
+
+# Recalcul des championnats sous d'autres barèmes à partir des ordres d'arrivée bruts :
+# ni la forme ni les améliorations ne dépendent des points, les ordres d'arrivée simulés restent
+# donc valables pour tout barème. Un seul passage vectorisé évalue tous les barèmes à la fois.
+COUNTBACK_POSITIONS = 10  # Départage des ex aequo : nombre de victoires, puis de 2e places... jusqu'à la 10e
+
+
+class PointsTable:
+    def __init__(self, name, points, fastest_lap=0, fastest_lap_top=None):
+        # `fastest_lap` : points du meilleur tour ; `fastest_lap_top` : seulement si son auteur finit
+        # dans les N premiers (None : sans condition, comme dans SeasonSimulator)
+        self.name = name
+        self.points = list(points)
+        self.fastest_lap = fastest_lap
+        self.fastest_lap_top = fastest_lap_top
+
+    @classmethod
+    def parse(cls, text):
+        # 'nom=25,18,15' ou 'nom=25,18,15+1' (point de meilleur tour)
+        name, _, values = text.partition('=')
+        values, _, bonus = values.partition('+')
+        if not name or not values:
+            raise ValueError(f'Barème invalide : {text} (attendu : nom=25,18,15[+1])')
+        return cls(name.strip(), [float(value) for value in values.split(',')], float(bonus) if bonus else 0)
+
+    def to_dict(self):
+        return {'name': self.name, 'points': self.points, 'fastest_lap': self.fastest_lap,
+                'fastest_lap_top': self.fastest_lap_top}
+
+
+POINTS_TABLES = {table.name: table for table in [
+    PointsTable('actuel', POINTS_DISTRIBUTION, fastest_lap=1),
+    PointsTable('sans_meilleur_tour', POINTS_DISTRIBUTION),
+    PointsTable('meilleur_tour_top10', POINTS_DISTRIBUTION, fastest_lap=1, fastest_lap_top=10),
+    PointsTable('sprint', [8, 7, 6, 5, 4, 3, 2, 1]),
+    PointsTable('2003-2009', [10, 8, 6, 5, 4, 3, 2, 1]),
+    PointsTable('1991-2002', [10, 6, 4, 3, 2, 1]),
+]}
+
+
+class FinishingOrders:
+    # Ordres d'arrivée bruts, une ligne par course : indices des pilotes du P1 au dernier (-1 au-delà
+    # du plateau), classés ou non, et auteur du meilleur tour. S'utilise comme enregistreur de
+    # SeasonSimulator (append / close) ; les lots se mettent bout à bout avec extend.
+    def __init__(self, names, teams=None):
+        n_drivers = len(names)
+        self.names = list(names)
+        self.teams = None if teams is None else list(teams)
+        self.driver_index = {name: i for i, name in enumerate(self.names)}
+        self.season = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros((0, n_drivers), dtype=np.int16)
+        self.finished = np.zeros((0, n_drivers), dtype=bool)  # Par position, comme `order`
+        self.fastest = np.zeros(0, dtype=np.int16)
+        self.pending = []
+
+    @classmethod
+    def from_store(cls, store, teams=None, **filters):
+        # Courses d'un ResultStore (voir f1_store), avec les mêmes filtres que ResultStore.query
+        orders = cls(store.drivers, teams)
+        rows = store.query(fields=['season', 'order', 'dnf', 'fastest_lap_driver'], **filters)
+        orders.season = rows['season'].astype(np.int64)
+        orders.order = rows['order'].astype(np.int16)
+        dnf = np.take_along_axis(rows['dnf'], np.maximum(orders.order, 0).astype(np.int64), axis=1)
+        orders.finished = (orders.order >= 0) & ~dnf
+        orders.fastest = rows['fastest_lap_driver'].astype(np.int16)
+        return orders
+
+    def append(self, race, season=0, race_round=0):
+        # `race` : RaceResult de f1_engine
+        order = np.full(len(self.names), -1, dtype=np.int16)
+        finished = np.zeros(len(self.names), dtype=bool)
+        for position, entry in enumerate(race.classification):
+            order[position] = self.driver_index[entry['name']]
+            finished[position] = entry['time'] is not None
+        fastest = -1 if race.fastest_lap_driver is None else self.driver_index[race.fastest_lap_driver]
+        self.pending.append((season, order, finished, fastest))
+
+    def flush(self):
+        if not self.pending:
+            return
+        seasons, orders, finished, fastest = zip(*self.pending)
+        self.season = np.concatenate([self.season, seasons])
+        self.order = np.concatenate([self.order, orders])
+        self.finished = np.concatenate([self.finished, finished])
+        self.fastest = np.concatenate([self.fastest, np.array(fastest, dtype=np.int16)])
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+    def extend(self, other):
+        self.flush()
+        other.flush()
+        self.season = np.concatenate([self.season, other.season])
+        self.order = np.concatenate([self.order, other.order])
+        self.finished = np.concatenate([self.finished, other.finished])
+        self.fastest = np.concatenate([self.fastest, other.fastest])
+        return self
+
+    def __len__(self):
+        return len(self.season) + len(self.pending)
+
+
+class RescoreResult:
+    def __init__(self, tables, names, teams, seasons, points, ranking):
+        self.tables = tables
+        self.names = names
+        self.teams = teams
+        self.seasons = seasons  # Numéros de saison
+        self.points = points  # [barème, saison, pilote]
+        self.ranking = ranking  # [barème, saison, position] -> indice de pilote
+
+    def champions(self):
+        return self.ranking[:, :, 0]
+
+    def constructor_champions(self):
+        # [barème, saison] -> indice d'équipe (dans l'ordre de première apparition), ou None sans équipes
+        if self.teams is None:
+            return None, None
+        team_names = list(dict.fromkeys(self.teams))
+        membership = np.zeros((len(self.names), len(team_names)))
+        membership[np.arange(len(self.names)), [team_names.index(team) for team in self.teams]] = 1
+        return team_names, np.argmax(self.points @ membership, axis=2)
+
+    def to_dict(self):
+        n_seasons = max(len(self.seasons), 1)
+        champions = self.champions()
+        top3 = self.ranking[:, :, :3]
+        team_names, constructor_champions = self.constructor_champions()
+        tables = []
+        for t, table in enumerate(self.tables):
+            titles = np.bincount(champions[t], minlength=len(self.names))
+            podiums = np.bincount(top3[t].ravel(), minlength=len(self.names))
+            drivers = [{
+                'name': name,
+                'mean_points': float(self.points[t, :, i].mean()) if len(self.seasons) else 0.0,
+                'title_probability': float(titles[i] / n_seasons),
+                'top3_probability': float(podiums[i] / n_seasons),
+            } for i, name in enumerate(self.names)]
+            drivers.sort(key=lambda row: (row['title_probability'], row['mean_points']), reverse=True)
+            entry = table.to_dict()
+            # Part des saisons dont le champion diffère de celui du premier barème
+            entry['champion_changes'] = float(np.mean(champions[t] != champions[0])) if len(self.seasons) else 0.0
+            entry['drivers'] = drivers
+            if team_names is not None:
+                team_titles = np.bincount(constructor_champions[t], minlength=len(team_names))
+                entry['constructors'] = [{'team': team, 'title_probability': float(team_titles[j] / n_seasons)}
+                                         for j, team in enumerate(team_names)]
+            tables.append(entry)
+        return {'seasons': len(self.seasons), 'tables': tables}
+
+
+def rescore(orders, tables):
+    # Points et classements de chaque saison pour chaque barème, en un seul passage sur les ordres d'arrivée
+    orders.flush()
+    n_tables, n_drivers = len(tables), len(orders.names)
+    seasons, season_of_race = np.unique(orders.season, return_inverse=True)
+    n_seasons = len(seasons)
+
+    table_points = np.zeros((n_tables, n_drivers))
+    for t, table in enumerate(tables):
+        width = min(n_drivers, len(table.points))
+        table_points[t, :width] = table.points[:width]
+
+    # Points de classement : une clé (barème, saison, pilote) par position
+    valid = orders.order >= 0
+    driver = np.where(valid, orders.order, 0).astype(np.int64)
+    key = season_of_race[:, None] * n_drivers + driver
+    weights = np.where(orders.finished[None], table_points[:, None, :], 0)
+    offsets = np.arange(n_tables)[:, None, None] * (n_seasons * n_drivers)
+    points = np.bincount((offsets + key[None]).ravel(), weights=weights.ravel(),
+                         minlength=n_tables * n_seasons * n_drivers).reshape(n_tables, n_seasons, n_drivers)
+
+    # Meilleur tour, éventuellement réservé aux N premiers
+    has_holder = orders.fastest >= 0
+    holder_position = np.argmax(orders.order == orders.fastest[:, None], axis=1)
+    for t, table in enumerate(tables):
+        if not table.fastest_lap:
+            continue
+        eligible = has_holder
+        if table.fastest_lap_top is not None:
+            eligible = eligible & (holder_position < table.fastest_lap_top)
+        holder_key = season_of_race[eligible] * n_drivers + orders.fastest[eligible]
+        points[t] += table.fastest_lap * np.bincount(holder_key, minlength=n_seasons * n_drivers).reshape(
+            n_seasons, n_drivers)
+
+    # Départage : nombre de victoires, de 2e places... (indépendant du barème)
+    depth = min(COUNTBACK_POSITIONS, n_drivers)
+    scored = valid[:, :depth] & orders.finished[:, :depth]
+    count_key = key[:, :depth] * depth + np.arange(depth)
+    counts = np.bincount(count_key[scored], minlength=n_seasons * n_drivers * depth).reshape(
+        n_seasons, n_drivers, depth)
+    ties = [np.broadcast_to(np.arange(n_drivers), (n_seasons, n_drivers))]
+    ties += [-counts[:, :, p] for p in reversed(range(depth))]
+    ranking = np.stack([np.lexsort(ties + [-points[t]], axis=-1) for t in range(n_tables)])
+    return RescoreResult(list(tables), orders.names, orders.teams, seasons, points, ranking)
@@ -0,0 +1,222 @@
+# f1_stats.py
+
+import numpy as np
+
+
+# Agrégation en ligne des résultats : la mémoire dépend du nombre de pilotes (et de positions,
+# de circuits), jamais du nombre de saisons simulées. Tous les agrégats se fusionnent, ce qui permet
+# de répartir les saisons entre processus puis de combiner les résultats partiels.
+POINTS_SKETCH_MAX = 10_000
+SKETCH_ACCURACY = 0.01
+QUANTILES = [0.1, 0.5, 0.9]
+
+
+class RunningStats:
+    # Moyenne et variance en ligne (Welford) de chaque élément d'un tableau, fusion de Chan et al.
+    def __init__(self, shape):
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def add(self, values, index=Ellipsis):
+        # `index` désigne des éléments distincts ; par défaut tout le tableau est mis à jour
+        values = np.asarray(values, dtype=float)
+        count = self.count[index] + 1
+        delta = values - self.mean[index]
+        mean = self.mean[index] + delta / count
+        self.m2[index] += delta * (values - mean)
+        self.mean[index] = mean
+        self.count[index] = count
+
+    def add_batch(self, values):
+        # Lot d'observations empilées sur le premier axe
+        values = np.asarray(values, dtype=float)
+        batch = RunningStats(values.shape[1:])
+        batch.count[...] = len(values)
+        if len(values):
+            batch.mean = values.mean(axis=0)
+            batch.m2 = ((values - batch.mean) ** 2).sum(axis=0)
+        return self.merge(batch)
+
+    def merge(self, other):
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        weight = np.divide(other.count, count, out=np.zeros(count.shape), where=count > 0)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * weight
+        self.count = count
+        return self
+
+    def variance(self, ddof=1):
+        return np.divide(self.m2, self.count - ddof, out=np.full(self.count.shape, np.nan), where=self.count > ddof)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
+
+
+class QuantileSketch:
+    # Histogramme à pas logarithmique (du type DDSketch), une ligne par pilote : quantiles à
+    # `relative_accuracy` près entre `min_value` et `max_value`, mémoire fixe, fusion par addition.
+    # Les valeurs ≤ min_value (p. ex. zéro point) partagent le premier compartiment.
+    def __init__(self, rows, min_value, max_value, relative_accuracy=SKETCH_ACCURACY):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.offset = int(np.floor(np.log(min_value) / self.log_gamma))
+        n_buckets = int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset + 1
+        self.counts = np.zeros((rows, n_buckets), dtype=np.int64)
+        self.minimum = np.full(rows, np.inf)
+        self.maximum = np.full(rows, -np.inf)
+
+    def add(self, values, rows=Ellipsis):
+        values = np.asarray(values, dtype=float)
+        keys = np.ceil(np.log(np.maximum(values, self.min_value)) / self.log_gamma) - self.offset
+        keys = np.where(values > self.min_value, np.clip(keys, 1, self.counts.shape[1] - 1), 0).astype(np.int64)
+        row_index = np.arange(len(self.counts))[rows]
+        np.add.at(self.counts, (row_index, keys), 1)
+        self.minimum[rows] = np.minimum(self.minimum[rows], values)
+        self.maximum[rows] = np.maximum(self.maximum[rows], values)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        return self
+
+    def quantile(self, q):
+        # Un quantile par ligne (NaN pour une ligne vide), borné par les valeurs extrêmes observées
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1]
+        rank = q * np.maximum(total - 1, 0)
+        key = np.argmax(cumulative > rank[:, None], axis=1)
+        value = 2 * self.gamma ** (key + self.offset) / (self.gamma + 1)
+        value = np.where(key == 0, self.minimum, np.clip(value, self.minimum, self.maximum))
+        return np.where(total > 0, value, np.nan)
+
+
+class SeasonAggregator:
+    # Statistiques par pilote, mises à jour à chaque course (add_race) et à chaque fin de saison (end_season)
+    def __init__(self, names, track_names):
+        n_drivers = len(names)
+        self.names = list(names)
+        self.track_names = list(dict.fromkeys(track_names))
+        self.driver_index = {name: i for i, name in enumerate(self.names)}
+        self.track_index = {name: i for i, name in enumerate(self.track_names)}
+        self.seasons = 0
+        self.races = 0
+
+        # Par saison
+        self.points = RunningStats(n_drivers)
+        self.points_sketch = QuantileSketch(n_drivers, 1, POINTS_SKETCH_MAX)
+        self.incidents = RunningStats(n_drivers)
+        self.incident_totals = np.zeros(n_drivers, dtype=np.int64)
+        self.championship_positions = np.zeros((n_drivers, n_drivers), dtype=np.int64)  # [pilote, position]
+        self.titles = np.zeros(n_drivers, dtype=np.int64)
+
+        # Par course
+        self.race_positions = np.zeros((n_drivers, n_drivers), dtype=np.int64)  # [pilote, position]
+        self.lap_times = RunningStats((n_drivers, len(self.track_names)))  # Meilleur tour en course, par circuit
+        self.best_laps = np.full(n_drivers, float('inf'))
+        self.fastest_lap_awards = np.zeros(n_drivers, dtype=np.int64)
+        self.track_wins = np.zeros((n_drivers, len(self.track_names)), dtype=np.int64)
+        self.dnfs = np.zeros(n_drivers, dtype=np.int64)
+
+    def add_race(self, race):
+        # `race` : RaceResult de f1_engine
+        index = np.array([self.driver_index[entry['name']] for entry in race.classification], dtype=np.int64)
+        finished = np.array([entry['time'] is not None for entry in race.classification], dtype=bool)
+        laps = np.array([entry['fastest_lap'] for entry in race.classification], dtype=float)
+        track = self.track_index[race.track]
+
+        self.race_positions[index, np.arange(len(index))] += 1
+        self.lap_times.add(laps[finished], (index[finished], track))
+        self.best_laps[index[finished]] = np.minimum(self.best_laps[index[finished]], laps[finished])
+        self.dnfs[index[~finished]] += 1
+        if len(index) and finished[0]:
+            self.track_wins[index[0], track] += 1
+        if race.fastest_lap_driver is not None:
+            self.fastest_lap_awards[self.driver_index[race.fastest_lap_driver]] += 1
+        self.races += 1
+
+    def end_season(self, drivers_ranked):
+        # Classement final de la saison (objets Driver, du champion au dernier)
+        index = np.array([self.driver_index[driver.name] for driver in drivers_ranked], dtype=np.int64)
+        points = np.array([driver.points for driver in drivers_ranked], dtype=float)
+        incidents = np.array([driver.incidents for driver in drivers_ranked], dtype=np.int64)
+
+        self.points.add(points, index)
+        self.points_sketch.add(points, index)
+        self.incidents.add(incidents, index)
+        self.incident_totals[index] += incidents
+        self.championship_positions[index, np.arange(len(index))] += 1
+        if len(index):
+            self.titles[index[0]] += 1
+        self.seasons += 1
+
+    def merge(self, other):
+        if other.names != self.names or other.track_names != self.track_names:
+            raise ValueError('Agrégats de pilotes ou de circuits différents')
+        self.seasons += other.seasons
+        self.races += other.races
+        self.points.merge(other.points)
+        self.points_sketch.merge(other.points_sketch)
+        self.incidents.merge(other.incidents)
+        self.incident_totals += other.incident_totals
+        self.championship_positions += other.championship_positions
+        self.titles += other.titles
+        self.race_positions += other.race_positions
+        self.lap_times.merge(other.lap_times)
+        self.best_laps = np.minimum(self.best_laps, other.best_laps)
+        self.fastest_lap_awards += other.fastest_lap_awards
+        self.track_wins += other.track_wins
+        self.dnfs += other.dnfs
+        return self
+
+    def best_lap_dict(self):
+        return {name: float(lap) for name, lap in zip(self.names, self.best_laps)}
+
+    def incident_dict(self):
+        return {name: int(count) for name, count in zip(self.names, self.incident_totals)}
+
+    def standings(self):
+        # Classement moyen, trié par points moyens décroissants
+        seasons = max(self.seasons, 1)
+        positions = np.arange(1, len(self.names) + 1)
+        mean_position = self.championship_positions @ positions / seasons
+        top3 = self.championship_positions[:, :3].sum(axis=1)
+        std_points = self.points.std()
+        quantiles = {q: self.points_sketch.quantile(q) for q in QUANTILES}
+        rows = []
+        for i, name in enumerate(self.names):
+            row = {
+                'name': name,
+                'mean_points': float(self.points.mean[i]),
+                'std_points': float(std_points[i]),
+                'titles': int(self.titles[i]),
+                'title_probability': float(self.titles[i] / seasons),
+                'top3_probability': float(top3[i] / seasons),
+                'mean_position': float(mean_position[i]),
+                'best_lap': float(self.best_laps[i]),
+                'fastest_lap_awards': int(self.fastest_lap_awards[i]),
+                'incidents': int(self.incident_totals[i]),
+                'mean_incidents': float(self.incidents.mean[i]),
+                'dnfs': int(self.dnfs[i]),
+            }
+            for q, values in quantiles.items():
+                row[f'points_p{int(q * 100)}'] = float(values[i])
+            rows.append(row)
+        rows.sort(key=lambda row: row['mean_points'], reverse=True)
+        return rows
+
+    def to_dict(self):
+        return {
+            'seasons': self.seasons,
+            'races': self.races,
+            'standings': self.standings(),
+            'positions': {name: self.championship_positions[i].tolist() for i, name in enumerate(self.names)},
+            'race_positions': {name: self.race_positions[i].tolist() for i, name in enumerate(self.names)},
+            'track_wins': {name: {track: int(wins) for track, wins in zip(self.track_names, self.track_wins[i])
+                                  if wins}
+                           for i, name in enumerate(self.names)},
+        }
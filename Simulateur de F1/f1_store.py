@@ -0,0 +1,251 @@
+# f1_store.py
+
+import glob
+import json
+import os
+import threading
+
+import numpy as np
+
+from f1_model import CONDITIONS, WEATHERS, condition_index
+
+
+# Stockage en colonnes des résultats de course : un répertoire contenant meta.json (pilotes et
+# circuits, qui fixent les codes) et des blocs .npy de tableaux structurés, une ligne par course.
+# Les blocs ne sont jamais modifiés après écriture et sont relus en mémoire projetée (mmap),
+# pour analyser des dizaines de millions de courses sans tout charger, par exemple :
+#     ResultStore(path).query(track='Monaco GP - Monaco', condition='wet')
+META_FILE = 'meta.json'
+RESERVATION_SUFFIX = '.seasons'  # Plages de numéros de saison réservées par reserve_seasons
+CHUNK_RACES = 100_000  # Courses par bloc
+SEED_KEY_DEPTH = 4  # Profondeur maximale de spawn_key enregistrée (complétée par -1)
+MAX_DRIVERS = np.iinfo(np.int16).max
+
+
+def race_dtype(n_drivers):
+    # Colonnes par pilote indexées dans l'ordre de meta.json ; `order` et `grid` contiennent
+    # des indices de pilote (-1 pour les pilotes absents de la course)
+    return np.dtype([
+        ('season', np.int64),
+        ('round', np.int32),
+        ('track', np.int16),
+        ('weather', np.int8),
+        ('condition', np.int8),
+        ('safety_car', np.bool_),
+        ('fastest_lap_driver', np.int16),
+        ('seed_entropy', np.uint64, 2),  # Entropie sur 128 bits : (bits de poids faible, de poids fort)
+        ('seed_key', np.int64, SEED_KEY_DEPTH),
+        ('order', np.int16, n_drivers),
+        ('grid', np.int16, n_drivers),
+        ('race_time', np.float64, n_drivers),  # NaN pour un abandon
+        ('fastest_lap', np.float64, n_drivers),  # NaN pour un abandon
+        ('pit_stops', np.int16, n_drivers),
+        ('dnf', np.bool_, n_drivers),
+        ('incident', np.bool_, n_drivers),  # Impliqué dans un incident (abandon compris)
+    ])
+
+
+class ResultStore:
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as file:
+            meta = json.load(file)
+        self.path = path
+        self.drivers = meta['drivers']
+        self.tracks = meta['tracks']
+        self.driver_index = {name: i for i, name in enumerate(self.drivers)}
+        self.track_index = {name: i for i, name in enumerate(self.tracks)}
+        self.dtype = race_dtype(len(self.drivers))
+
+    @classmethod
+    def create(cls, path, driver_names, track_names):
+        # Crée le répertoire, ou rouvre un stockage existant ayant les mêmes pilotes et circuits
+        meta = {'drivers': list(driver_names), 'tracks': list(track_names)}
+        if len(meta['drivers']) > MAX_DRIVERS:
+            raise ValueError(f'Au plus {MAX_DRIVERS} pilotes par stockage')
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as file:
+                existing = json.load(file)
+            if existing != meta:
+                raise ValueError(f'{path} contient déjà des résultats pour d\'autres pilotes ou circuits')
+        else:
+            os.makedirs(path, exist_ok=True)
+            with open(meta_path, 'w', encoding='utf-8') as file:
+                json.dump(meta, file, ensure_ascii=False, indent=2)
+        return cls(path)
+
+    def writer(self, prefix='chunk', chunk_size=CHUNK_RACES):
+        return StoreWriter(self, prefix, chunk_size)
+
+    def chunk_paths(self):
+        return sorted(glob.glob(os.path.join(glob.escape(self.path), '*.npy')))
+
+    def chunks(self):
+        # Blocs en mémoire projetée, en lecture seule
+        for path in self.chunk_paths():
+            yield np.load(path, mmap_mode='r')
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks())
+
+    def reserved_seasons(self):
+        # Plages [début, fin) de numéros de saison réservées
+        pattern = os.path.join(glob.escape(self.path), 'seasons-*' + RESERVATION_SUFFIX)
+        for path in sorted(glob.glob(pattern)):
+            with open(path, encoding='utf-8') as file:
+                reservation = json.load(file)
+            yield reservation['first'], reservation['end']
+
+    def next_season(self):
+        # Premier numéro de saison libre, après les saisons enregistrées et les plages réservées
+        last = max((int(chunk['season'].max()) for chunk in self.chunks() if len(chunk)), default=-1)
+        return max([last + 1] + [end for _, end in self.reserved_seasons()])
+
+    def reserve_seasons(self, count=1):
+        # Réserve `count` numéros de saison consécutifs et renvoie le premier : deux écrivains ajoutant
+        # au même stockage ne reçoivent jamais les mêmes numéros. La réservation, nommée d'après son
+        # premier numéro, est publiée par un lien physique, qui échoue si un autre écrivain a déjà
+        # réservé ce numéro ; la saison suivante est alors recalculée.
+        while True:
+            first = self.next_season()
+            path = os.path.join(self.path, f'seasons-{first:09d}{RESERVATION_SUFFIX}')
+            temporary = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump({'first': first, 'end': first + count}, file)
+            try:
+                os.link(temporary, path)
+            except FileExistsError:
+                continue
+            finally:
+                os.remove(temporary)
+            return first
+
+    def mask(self, chunk, track=None, weather=None, condition=None, season=None, safety_car=None, where=None):
+        # Filtres : nom ou liste de noms (circuit, météo, état de piste), saison (entier ou liste),
+        # Safety Car (booléen) et `where`, fonction recevant le bloc et renvoyant un masque booléen
+        mask = np.ones(len(chunk), dtype=bool)
+        for column, values, codes in (('track', track, self.track_index),
+                                      ('weather', weather, {name: i for i, name in enumerate(WEATHERS)}),
+                                      ('condition', condition, {name: i for i, name in enumerate(CONDITIONS)})):
+            if values is None:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            unknown = [value for value in values if value not in codes]
+            if unknown:
+                raise ValueError(f"Inconnu(s) : {', '.join(unknown)}")
+            mask &= np.isin(chunk[column], [codes[value] for value in values])
+        if season is not None:
+            mask &= np.isin(chunk['season'], np.atleast_1d(season))
+        if safety_car is not None:
+            mask &= chunk['safety_car'] == safety_car
+        if where is not None:
+            mask &= where(chunk)
+        return mask
+
+    def iter_query(self, fields=None, **filters):
+        # Courses retenues, bloc par bloc : seules les lignes (et colonnes) demandées sont copiées en mémoire
+        for chunk in self.chunks():
+            selected = np.nonzero(self.mask(chunk, **filters))[0]
+            if len(selected):
+                yield chunk[fields][selected] if fields is not None else chunk[selected]
+
+    def query(self, fields=None, **filters):
+        parts = list(self.iter_query(fields, **filters))
+        if not parts:
+            dtype = self.dtype if fields is None else self.dtype[fields]
+            return np.zeros(0, dtype=dtype)
+        return np.concatenate(parts)
+
+    def count(self, **filters):
+        return int(sum(np.count_nonzero(self.mask(chunk, **filters)) for chunk in self.chunks()))
+
+    def wins(self, **filters):
+        # Victoires de chaque pilote parmi les courses retenues
+        wins = np.zeros(len(self.drivers), dtype=np.int64)
+        for part in self.iter_query(fields=['order'], **filters):
+            winners = part['order'][:, 0]
+            wins += np.bincount(winners[winners >= 0], minlength=len(self.drivers))
+        return dict(zip(self.drivers, wins.tolist()))
+
+
+class StoreWriter:
+    # Ajout de courses à un stockage : les lignes sont accumulées dans un bloc préalloué,
+    # écrit dans un nouveau fichier dès qu'il est plein (et par flush pour le dernier bloc partiel).
+    # Des écrivains de préfixes différents peuvent travailler en parallèle sur le même répertoire ;
+    # les numéros de saison de chacun sont à réserver au préalable (ResultStore.reserve_seasons).
+    def __init__(self, store, prefix='chunk', chunk_size=CHUNK_RACES):
+        self.store = store
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.buffer = np.zeros(chunk_size, dtype=store.dtype)
+        self.size = 0
+        existing = glob.glob(os.path.join(glob.escape(store.path), glob.escape(prefix) + '-*.npy'))
+        self.next_chunk = len(existing)
+
+    def append(self, race, season=0, race_round=0):
+        # `race` : RaceResult de f1_engine
+        if self.size == self.chunk_size:
+            self.flush()
+        store = self.store
+        row = self.buffer[self.size]
+        row['season'] = season
+        row['round'] = race_round
+        row['track'] = store.track_index[race.track]
+        row['weather'] = WEATHERS.index(race.weather)
+        row['condition'] = condition_index(race.condition)
+        row['safety_car'] = race.safety_car
+        row['fastest_lap_driver'] = -1 if race.fastest_lap_driver is None else store.driver_index[race.fastest_lap_driver]
+
+        row['seed_entropy'] = 0
+        row['seed_key'] = -1
+        if race.seed is not None:
+            entropy = race.seed.entropy
+            if not isinstance(entropy, int) or not 0 <= entropy < 2 ** 128:
+                raise ValueError('Seule une entropie entière sur 128 bits peut être enregistrée')
+            spawn_key = race.seed.spawn_key
+            if len(spawn_key) > SEED_KEY_DEPTH:
+                raise ValueError(f'spawn_key de plus de {SEED_KEY_DEPTH} niveaux')
+            row['seed_entropy'] = (entropy & (2 ** 64 - 1), entropy >> 64)
+            row['seed_key'][:len(spawn_key)] = spawn_key
+
+        drivers = [store.driver_index[entry['name']] for entry in race.classification]
+        row['order'] = -1
+        row['order'][:len(drivers)] = drivers
+        row['grid'] = -1
+        row['grid'][:len(race.grid)] = [store.driver_index[name] for name in race.grid]
+        row['race_time'] = np.nan
+        row['fastest_lap'] = np.nan
+        row['pit_stops'] = 0
+        row['dnf'] = False
+        row['incident'] = False
+        for i, entry in zip(drivers, race.classification):
+            finished = entry['time'] is not None
+            row['dnf'][i] = not finished
+            if finished:
+                row['race_time'][i] = entry['time']
+                row['fastest_lap'][i] = entry['fastest_lap']
+            row['pit_stops'][i] = entry['pit_stops']
+        for incident in race.incidents:
+            row['incident'][store.driver_index[incident['driver']]] = True
+        self.size += 1
+
+    def append_season(self, season_result, season=0):
+        for race_round, race in enumerate(season_result.races):
+            self.append(race, season, race_round)
+
+    def flush(self):
+        if not self.size:
+            return
+        name = f'{self.prefix}-{self.next_chunk:06d}.npy'
+        # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de bloc partiel
+        path = os.path.join(self.store.path, name)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            np.save(file, self.buffer[:self.size])
+        os.replace(temporary, path)
+        self.next_chunk += 1
+        self.size = 0
+
+    def close(self):
+        self.flush()
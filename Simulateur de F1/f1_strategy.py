@@ -0,0 +1,196 @@
+# f1_strategy.py
+
+import numpy as np
+
+from f1_model import PERSONALITIES, TIRE_TYPES, WEATHERS
+from f1_race import COMPOUNDS, PIT_STOP_TIME, pit_intervals
+
+
+# Stratégie d'arrêts optimale par programmation dynamique sur (tour, gomme, âge du pneu) :
+# O(tours x gommes x durée de vie) opérations, quel que soit le nombre de relais envisagés.
+# Modèle de temps au tour : allure de base / performance de la gomme, ralentie linéairement par l'usure
+# jusqu'à TIRE_DEGRADATION en fin de vie (le pneu ne peut pas dépasser sa durabilité), et multipliée
+# par WEATHER_GRIP quand la gomme ne correspond pas à la météo du tour.
+TIRE_DEGRADATION = 0.05  # Ralentissement relatif d'un pneu arrivé au bout de sa durabilité
+
+# Gomme -> météo -> multiplicateur du temps au tour (1 : gomme adaptée)
+WEATHER_GRIP = {
+    'Soft': {'dry': 1.0, 'humid': 1.08, 'rainy': 1.2},
+    'Medium': {'dry': 1.0, 'humid': 1.08, 'rainy': 1.2},
+    'Hard': {'dry': 1.0, 'humid': 1.08, 'rainy': 1.2},
+    'Intermediate': {'dry': 1.04, 'humid': 1.0, 'rainy': 1.08},
+    'Wet': {'dry': 1.08, 'humid': 1.03, 'rainy': 1.0},
+}
+
+
+def parse_weather(text, laps):
+    # 'dry' (toute la course) ou 'dry:30,rainy' : 30 tours secs, puis pluie jusqu'à l'arrivée
+    weathers = []
+    for segment in text.split(','):
+        name, _, count = segment.strip().partition(':')
+        if name not in WEATHERS:
+            raise ValueError(f'Météo inconnue : {name}')
+        if not count:
+            count = max(laps - len(weathers), 0)
+        elif not count.strip().isdigit():
+            raise ValueError(f'Nombre de tours invalide : {segment.strip()}')
+        count = int(count)
+        weathers += [name] * count
+    if not weathers:
+        raise ValueError(f'Aucun tour de météo dans : {text}')
+    if len(weathers) < laps:
+        weathers += [weathers[-1]] * (laps - len(weathers))
+    return weathers[:laps]
+
+
+def weather_probabilities(weather, laps):
+    # Probabilités (tours, météo) : nom de météo, liste d'une météo par tour, ou tableau de probabilités
+    if isinstance(weather, str):
+        weather = [weather] * laps
+    if len(weather) and isinstance(weather[0], str):
+        unknown = [name for name in weather if name not in WEATHERS]
+        if unknown:
+            raise ValueError(f"Météo inconnue : {', '.join(sorted(set(unknown)))}")
+        probabilities = np.zeros((len(weather), len(WEATHERS)))
+        probabilities[np.arange(len(weather)), [WEATHERS.index(name) for name in weather]] = 1
+    else:
+        probabilities = np.asarray(weather, dtype=float)
+    if probabilities.shape != (laps, len(WEATHERS)):
+        raise ValueError(f'Prévision météo attendue pour {laps} tours')
+    return probabilities
+
+
+class PitStrategy:
+    def __init__(self, track, stints, total_time):
+        self.track = track
+        self.stints = stints  # [(gomme, tours)...] dans l'ordre de course
+        self.total_time = total_time
+
+    @property
+    def stops(self):
+        return len(self.stints) - 1
+
+    @property
+    def stop_laps(self):
+        # Tours bouclés avant chaque arrêt
+        return np.cumsum([laps for compound, laps in self.stints])[:-1].tolist()
+
+    def to_dict(self):
+        return {
+            'track': self.track,
+            'total_time': float(self.total_time),
+            'stops': self.stops,
+            'stop_laps': self.stop_laps,
+            'stints': [{'compound': compound, 'laps': int(laps)} for compound, laps in self.stints],
+        }
+
+
+class StrategyModel:
+    # Coût de chaque tour pour chaque gomme et chaque âge de pneu : (tours, gommes, âge)
+    def __init__(self, track, weather=None, base_lap_time=None, tire_types=TIRE_TYPES, pit_time=PIT_STOP_TIME,
+                 degradation=TIRE_DEGRADATION):
+        # `weather` : voir weather_probabilities (météo actuelle du circuit par défaut) ;
+        # `base_lap_time` : scalaire ou une valeur par météo (record du circuit par défaut)
+        self.track = track
+        self.laps = track.laps
+        self.pit_time = pit_time
+        self.compounds = list(tire_types)
+        self.durability = np.array([tire_types[compound]['durability'] for compound in self.compounds])
+        performance = np.array([tire_types[compound]['performance'] for compound in self.compounds])
+        probabilities = weather_probabilities(track.weather if weather is None else weather, self.laps)
+        base = np.broadcast_to(np.asarray(track.record if base_lap_time is None else base_lap_time, dtype=float),
+                               (len(WEATHERS),))
+        grip = np.array([[WEATHER_GRIP.get(compound, {}).get(name, 1.0) for name in WEATHERS]
+                         for compound in self.compounds])
+
+        # Temps au tour d'un pneu neuf, en espérance sur la météo du tour : (tours, gommes)
+        fresh = probabilities @ (base[:, None] * grip.T) / performance
+        age = np.arange(self.durability.max())
+        wear = 1 + degradation * age / self.durability[:, None]
+        self.cost = fresh[:, :, None] * wear
+        self.cost[:, age[None, :] >= self.durability[:, None]] = np.inf
+
+    def time(self, stints):
+        # Temps total d'une suite de relais [(gomme, tours)...], inf si un pneu dépasse sa durabilité
+        if sum(laps for compound, laps in stints) != self.laps:
+            raise ValueError(f'Les relais doivent couvrir les {self.laps} tours')
+        total = self.pit_time * (len(stints) - 1)
+        lap = 0
+        for compound, laps in stints:
+            c = self.compounds.index(compound)
+            if laps > self.durability[c]:
+                return float('inf')
+            total += self.cost[np.arange(lap, lap + laps), c, np.arange(laps)].sum()
+            lap += laps
+        return float(total)
+
+    def optimize(self):
+        # Récurrence arrière : value[c, a] est le temps minimal pour finir la course depuis le début
+        # du tour courant avec la gomme c usée de a tours ; un arrêt monte la meilleure gomme neuve
+        n_compounds, max_age = self.cost.shape[1:]
+        value = np.zeros((n_compounds, max_age + 1))
+        decisions = np.full((self.laps, n_compounds, max_age + 1), -1, dtype=np.int8)  # -1 : pas d'arrêt
+        for lap in range(self.laps - 1, 0, -1):
+            stay = np.full((n_compounds, max_age + 1), np.inf)
+            stay[:, :max_age] = self.cost[lap] + value[:, 1:]
+            fresh = self.cost[lap, :, 0] + value[:, 1]
+            best = int(np.argmin(fresh))
+            pit = self.pit_time + fresh[best]
+            decisions[lap] = np.where(pit < stay, best, -1)
+            value = np.minimum(stay, pit)
+
+        first = self.cost[0, :, 0] + value[:, 1]
+        compound = int(np.argmin(first))
+        total_time = float(first[compound])
+        stints = [[self.compounds[compound], 1]]
+        age = 1
+        for lap in range(1, self.laps):
+            decision = decisions[lap, compound, age]
+            if decision >= 0:
+                compound, age = int(decision), 0
+                stints.append([self.compounds[compound], 0])
+            stints[-1][1] += 1
+            age += 1
+        return PitStrategy(self.track.name, [tuple(stint) for stint in stints], total_time)
+
+
+def optimal_strategy(track, weather=None, base_lap_time=None, tire_types=TIRE_TYPES, pit_time=PIT_STOP_TIME,
+                     degradation=TIRE_DEGRADATION):
+    return StrategyModel(track, weather, base_lap_time, tire_types, pit_time, degradation).optimize()
+
+
+def personality_strategy(model, weather, personality):
+    # Stratégie du simulateur (Driver.decide_pit_stop) par météo constante : la gomme de la
+    # personnalité, changée tous les `pit_intervals` tours, évaluée avec le même modèle
+    w, p = WEATHERS.index(weather), PERSONALITIES.index(personality)
+    tire_types = {compound: {'durability': int(durability)}
+                  for compound, durability in zip(model.compounds, model.durability)}
+    interval = int(pit_intervals(tire_types)[w, p])
+    compound = COMPOUNDS[w][p]
+    stints = [(compound, min(interval, model.laps - lap)) for lap in range(0, model.laps, interval)]
+    return PitStrategy(model.track.name, stints, model.time(stints))
+
+
+def weather_variants(track, base_lap_time=None, tire_types=TIRE_TYPES, pit_time=PIT_STOP_TIME,
+                     degradation=TIRE_DEGRADATION):
+    # Pour chaque météo constante : stratégie optimale et stratégies des personnalités du simulateur
+    variants = {}
+    for weather in WEATHERS:
+        model = StrategyModel(track, weather, base_lap_time, tire_types, pit_time, degradation)
+        variants[weather] = {
+            'optimal': model.optimize(),
+            'personalities': {personality: personality_strategy(model, weather, personality)
+                              for personality in PERSONALITIES},
+        }
+    return variants
+
+
+def driver_lap_times(driver, track):
+    # Allure de base du pilote par météo (état de piste qui en découle), lue dans la table des allures
+    times = []
+    for weather in WEATHERS:
+        condition = 'wet' if weather == 'rainy' else 'standard'
+        if track.forced_condition is not None:
+            condition = track.forced_condition
+        times.append(driver.state.pace_table().lap_time(driver.index, track, weather, condition))
+    return np.array(times)
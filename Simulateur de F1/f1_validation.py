@@ -0,0 +1,165 @@
+# f1_validation.py
+
+import argparse
+import copy
+import json
+import sys
+
+import numpy as np
+
+from f1_model import WEATHERS, drivers, tracks
+from f1_race import FIDELITIES, RaceField, simulate_race
+
+
+# Vérifie que la fidélité 'fast' de simulate_race suit la même loi que la fidélité 'detailed' :
+# test de Kolmogorov-Smirnov à deux échantillons pour chaque pilote, circuit et grandeur simulée
+SAMPLES = 20000
+ALPHA = 0.001  # Risque global, réparti sur tous les tests (correction de Bonferroni)
+METRICS = ['race_times', 'fastest_laps', 'pit_stops']
+FORCED_SAMPLES = 500  # Courses par circuit, météo imposée et fidélité pour le contrôle de la météo imposée
+
+
+def ks_statistic(a, b):
+    a = np.sort(a)
+    b = np.sort(b)
+    values = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, values, side='right') / len(a)
+    cdf_b = np.searchsorted(b, values, side='right') / len(b)
+    return float(np.max(np.abs(cdf_a - cdf_b)))
+
+
+def ks_p_value(statistic, n_a, n_b):
+    # Loi asymptotique de Kolmogorov (prudente pour les grandeurs discrètes comme les arrêts)
+    n = n_a * n_b / (n_a + n_b)
+    scaled = (np.sqrt(n) + 0.12 + 0.11 / np.sqrt(n)) * statistic
+    if scaled < 1e-3:
+        return 1.0
+    k = np.arange(1, 101)
+    p_value = 2 * np.sum((-1) ** (k - 1) * np.exp(-2 * k ** 2 * scaled ** 2))
+    return float(min(max(p_value, 0.0), 1.0))
+
+
+def compare(a, b):
+    statistic = ks_statistic(a, b)
+    return {
+        'detailed_mean': float(np.mean(a)),
+        'fast_mean': float(np.mean(b)),
+        'detailed_std': float(np.std(a)),
+        'fast_std': float(np.std(b)),
+        'ks': statistic,
+        'p_value': ks_p_value(statistic, len(a), len(b)),
+    }
+
+
+def compare_track(selected_drivers, track, samples=SAMPLES, seed=None):
+    # Une ligne par (pilote, grandeur), plus la météo laissée sur la piste en fin de course
+    field = RaceField.from_drivers(selected_drivers, track)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    sequences = seed.spawn(2)
+    detailed = simulate_race(field, track, np.random.default_rng(sequences[0]), samples, fidelity='detailed')
+    fast = simulate_race(field, track, np.random.default_rng(sequences[1]), samples, fidelity='fast')
+
+    rows = []
+    for metric in METRICS:
+        for i, driver in enumerate(selected_drivers):
+            row = {'track': track.name, 'driver': driver.name, 'metric': metric}
+            row.update(compare(getattr(detailed, metric)[:, i], getattr(fast, metric)[:, i]))
+            rows.append(row)
+    row = {'track': track.name, 'driver': None, 'metric': 'final_weather'}
+    row.update(compare(detailed.final_weather, fast.final_weather))
+    rows.append(row)
+    return rows
+
+
+def check_forced_weather(selected_drivers, track, samples=FORCED_SAMPLES, seed=None):
+    # Contrôle exact (pas statistique) : avec une météo imposée, aucune course de quelque fidélité
+    # que ce soit ne doit laisser une autre météo sur la piste
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    rows = []
+    for weather, weather_seed in zip(WEATHERS, seed.spawn(len(WEATHERS))):
+        forced = copy.copy(track)
+        forced.weather = forced.forced_weather = weather
+        forced.condition = 'wet' if weather == 'rainy' else 'standard'
+        field = RaceField.from_drivers(selected_drivers, forced)
+        for fidelity, fidelity_seed in zip(FIDELITIES, weather_seed.spawn(len(FIDELITIES))):
+            outcome = simulate_race(field, forced, np.random.default_rng(fidelity_seed), samples, fidelity=fidelity)
+            left = (outcome.final_weather >= 0) & (outcome.final_weather != WEATHERS.index(weather))
+            rows.append({'track': track.name, 'weather': weather, 'fidelity': fidelity, 'races': samples,
+                         'violations': int(np.count_nonzero(left))})
+    return rows
+
+
+def validate(selected_drivers, selected_tracks, samples=SAMPLES, seed=None, alpha=ALPHA,
+             forced_samples=FORCED_SAMPLES):
+    if not selected_tracks:
+        raise ValueError('Aucun circuit à valider')
+    sequence = np.random.SeedSequence(seed)
+    seeds = sequence.spawn(len(selected_tracks))
+    forced_seeds = sequence.spawn(len(selected_tracks))
+    rows = []
+    forced = []
+    for track, track_seed, forced_seed in zip(selected_tracks, seeds, forced_seeds):
+        rows.extend(compare_track(selected_drivers, track, samples, track_seed))
+        if forced_samples:
+            forced.extend(check_forced_weather(selected_drivers, track, forced_samples, forced_seed))
+    threshold = alpha / len(rows)
+    for row in rows:
+        row['rejected'] = row['p_value'] < threshold
+    return {
+        'samples': samples,
+        'alpha': alpha,
+        'tests': len(rows),
+        'rejected': sum(row['rejected'] for row in rows),
+        'rows': rows,
+        'forced_weather_violations': sum(row['violations'] for row in forced),
+        'forced_weather': forced,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validation statistique de la fidélité fast contre detailed')
+    parser.add_argument('--tracks', default=None, help='Noms des circuits séparés par des virgules (tous par défaut)')
+    parser.add_argument('--samples', type=int, default=SAMPLES, help='Courses simulées par fidélité et circuit')
+    parser.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+    parser.add_argument('--alpha', type=float, default=ALPHA, help='Risque global du test')
+    parser.add_argument('--forced-samples', type=int, default=FORCED_SAMPLES,
+                        help='Courses par météo imposée et fidélité pour le contrôle de la météo imposée (0 : aucun)')
+    parser.add_argument('--json', action='store_true', help='Écrire tous les tests en JSON')
+    args = parser.parse_args(argv)
+
+    selected_tracks = tracks
+    if args.tracks:
+        wanted = [name.strip() for name in args.tracks.split(',') if name.strip()]
+        if not wanted:
+            parser.error('aucun circuit sélectionné')
+        by_name = {track.name: track for track in tracks}
+        unknown = [name for name in wanted if name not in by_name]
+        if unknown:
+            parser.error(f"circuit(s) inconnu(s) : {', '.join(unknown)}")
+        selected_tracks = [by_name[name] for name in wanted]
+
+    report = validate(drivers, selected_tracks, args.samples, args.seed, args.alpha, args.forced_samples)
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(f"VALIDATION FAST / DETAILED - {report['tests']} tests, {report['samples']} courses par fidélité:")
+        for metric in METRICS + ['final_weather']:
+            rows = [row for row in report['rows'] if row['metric'] == metric]
+            worst = min(rows, key=lambda row: row['p_value'])
+            mean_gap = max(abs(row['fast_mean'] - row['detailed_mean']) / max(row['detailed_std'], 1e-12)
+                           for row in rows)
+            print(f"{metric:<14} KS max: {max(row['ks'] for row in rows):.4f}  p min: {worst['p_value']:.4f}  "
+                  f"Écart des moyennes max: {mean_gap:.3f} écart-type")
+        print(f"Tests rejetés : {report['rejected']} (seuil {report['alpha'] / report['tests']:.2e})")
+        if report['forced_weather']:
+            print(f"Météo imposée quittée : {report['forced_weather_violations']} course(s) sur "
+                  f"{sum(row['races'] for row in report['forced_weather'])}")
+    return 1 if report['rejected'] or report['forced_weather_violations'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
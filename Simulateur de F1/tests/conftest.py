@@ -0,0 +1,28 @@
+# conftest.py
+
+import copy
+import os
+import sys
+
+import pytest
+
+# Les modules du simulateur sont à plat dans le répertoire parent
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from f1_model import drivers, tracks  # noqa: E402
+
+
+@pytest.fixture
+def season_tracks():
+    # Calendrier court, sur des copies : les courses modifient la météo des circuits
+    return [copy.copy(track) for track in tracks[:4]]
+
+
+@pytest.fixture
+def track():
+    return copy.copy(tracks[0])
+
+
+@pytest.fixture
+def field_drivers():
+    return list(drivers)
@@ -0,0 +1,29 @@
+# test_checkpoint.py
+
+import copy
+
+import pytest
+
+from f1_checkpoint import SeasonCheckpoint
+from f1_engine import SeasonSimulator
+from f1_race import FIDELITIES
+
+
+@pytest.mark.parametrize('fidelity', FIDELITIES)
+def test_resume_matches_full_season(tmp_path, field_drivers, season_tracks, fidelity):
+    full = SeasonSimulator(field_drivers, copy.deepcopy(season_tracks), seed=21, fidelity=fidelity).run()
+
+    paused = SeasonSimulator(field_drivers, copy.deepcopy(season_tracks), seed=21, fidelity=fidelity)
+    assert len(paused.run(stop_after=2).races) == 2
+    path = str(tmp_path / 'saison.npz')
+    paused.checkpoint().save(path)
+
+    checkpoint = SeasonCheckpoint.load(path)
+    resumed = SeasonSimulator(field_drivers, copy.deepcopy(season_tracks), seed=checkpoint.seed, fidelity=fidelity)
+    resumed.restore(checkpoint)
+    result = resumed.run()
+    assert not result.cancelled
+    assert [race.to_dict() for race in result.races] == [race.to_dict() for race in full.races[2:]]
+    assert result.standings == full.standings
+    assert result.fastest_laps == full.fastest_laps
+    assert result.incidents == full.incidents
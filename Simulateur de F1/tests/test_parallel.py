@@ -0,0 +1,47 @@
+# test_parallel.py
+
+import numpy as np
+
+import f1_parallel
+
+from f1_parallel import predict_race_parallel, run_seasons
+
+
+def integer_counts(batch):
+    # Comptes exacts d'un agrégat ; les moyennes en flottants dépendent de l'ordre des fusions
+    return (batch.seasons, batch.races, batch.titles.tolist(), batch.championship_positions.tolist(),
+            batch.race_positions.tolist(), batch.track_wins.tolist(), batch.constructor_titles.tolist(),
+            batch.best_laps.tolist())
+
+
+def test_same_seed_gives_same_seasons(field_drivers, season_tracks):
+    first = run_seasons(field_drivers, season_tracks, 6, seed=11, workers=2, fidelity='fast')
+    second = run_seasons(field_drivers, season_tracks, 6, seed=11, workers=2, fidelity='fast')
+    assert first.to_dict() == second.to_dict()
+    other = run_seasons(field_drivers, season_tracks, 6, seed=12, workers=2, fidelity='fast')
+    assert integer_counts(other) != integer_counts(first)
+
+
+def test_seasons_do_not_depend_on_worker_count(field_drivers, season_tracks):
+    # Une SeedSequence par saison : le découpage entre processus ne change aucun tirage
+    inline = run_seasons(field_drivers, season_tracks, 6, seed=11, workers=1, fidelity='fast')
+    pooled = run_seasons(field_drivers, season_tracks, 6, seed=11, workers=3, fidelity='fast')
+    assert integer_counts(inline) == integer_counts(pooled)
+    assert np.allclose(inline.points.mean, pooled.points.mean)
+
+
+def test_parallel_prediction_is_deterministic_per_seed_and_workers(field_drivers, track):
+    for workers in (1, 2):
+        first = predict_race_parallel(field_drivers, track, samples=3000, seed=4, workers=workers, fidelity='fast')
+        second = predict_race_parallel(field_drivers, track, samples=3000, seed=4, workers=workers, fidelity='fast')
+        assert first.samples == 3000
+        assert first.to_dict() == second.to_dict()
+
+
+def test_single_worker_runs_inline(monkeypatch, field_drivers, season_tracks, track):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('processus de travail démarrés pour un seul bloc')
+
+    monkeypatch.setattr(f1_parallel, 'ProcessPoolExecutor', no_pool)
+    assert run_seasons(field_drivers, season_tracks, 2, seed=1, workers=1, fidelity='fast').seasons == 2
+    assert predict_race_parallel(field_drivers, track, samples=500, seed=1, workers=1, fidelity='fast').samples == 500
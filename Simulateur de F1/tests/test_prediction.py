@@ -0,0 +1,50 @@
+# test_prediction.py
+
+import threading
+
+import numpy as np
+
+from f1_model import POINTS_DISTRIBUTION
+from f1_prediction import points_finishes, predict_race, simulate_weekends
+from f1_race import RaceField
+
+
+def test_fastest_lap_outside_top_ten_is_not_a_points_finish():
+    # P1 à P12 classés, le P12 ayant marqué le seul point de meilleur tour
+    positions = np.arange(12)[None, :]
+    finished = np.ones((1, 12), dtype=bool)
+    points = np.zeros((1, 12))
+    points[0, :10] = POINTS_DISTRIBUTION
+    points[0, 11] = 1
+    assert points_finishes(positions, finished).tolist() == [[True] * 10 + [False] * 2]
+    assert np.count_nonzero(points > 0) == 11
+
+
+def test_points_rate_counts_classified_top_ten(field_drivers, track):
+    samples = 2000
+    result = predict_race(field_drivers, track, samples=samples, seed=5, batch_size=samples, fidelity='fast')
+    # Même tirage que l'unique lot de predict_race
+    field = RaceField.from_drivers(field_drivers, track)
+    positions, finished, points = simulate_weekends(field, track, np.random.default_rng(5), samples, fidelity='fast')
+    expected = np.count_nonzero(finished & (positions < len(POINTS_DISTRIBUTION)), axis=0)
+    assert result.points_finishes.tolist() == expected.tolist()
+    # Les pilotes hors des points qui ne marquent que le meilleur tour n'entrent pas dans le taux
+    bonus_only = np.count_nonzero((points > 0) & ~points_finishes(positions, finished), axis=0)
+    assert bonus_only.sum() > 0
+    assert (np.count_nonzero(points > 0, axis=0) - bonus_only).tolist() == expected.tolist()
+
+
+def test_cancel_stops_between_batches(field_drivers, track):
+    cancel = threading.Event()
+    reports = []
+
+    def progress(done, samples):
+        reports.append((done, samples))
+        if len(reports) == 2:
+            cancel.set()
+
+    result = predict_race(field_drivers, track, samples=1000, seed=1, batch_size=100, fidelity='fast',
+                          progress=progress, cancel=cancel)
+    assert reports == [(100, 1000), (200, 1000)]
+    assert result.samples == 200
+    assert result.wins.sum() <= 200
@@ -0,0 +1,17 @@
+# test_race.py
+
+import numpy as np
+
+from f1_race import EventRace, RaceField
+
+
+def test_events_weather_change_fits_tyres_without_pit_stop(field_drivers, track):
+    race = EventRace(RaceField.from_drivers(field_drivers, track), track, np.random.default_rng(3), samples=50)
+    race.advance(np.full(50, 10))
+    race_times = race.race_times.copy()
+    race.on_weather(np.ones(50, dtype=bool))
+    # Comme les fidélités 'detailed' et 'fast' : pneus neufs sans temps d'arrêt ni arrêt compté
+    assert (race.race_times == race_times).all()
+    assert (race.pit_stops == 0).all()
+    assert (race.fitted == 10).all()
+    assert (race.next_pit == 10 + race.intervals[race.weather[:, None], race.personality]).all()
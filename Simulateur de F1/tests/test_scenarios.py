@@ -0,0 +1,22 @@
+# test_scenarios.py
+
+from f1_scenarios import Scenario, sweep_race, sweep_seasons
+
+
+def test_race_sweep_uses_common_random_numbers(field_drivers, track):
+    team = field_drivers[0].team
+    result = sweep_race(field_drivers, track, [Scenario('copie'), Scenario('voiture', {team: {'car_performance': 5}})],
+                        samples=2000, seed=3, fidelity='fast', batch_size=500)
+    baseline, same, faster = result.scenarios()
+    # Même graine par lot : un scénario identique à la référence a des écarts exactement nuls
+    assert all(row['delta_points'] == 0 and row['delta_win'] == 0 for row in same['drivers'])
+    assert same['variance_reduction'] is None
+    assert faster['variance_reduction'] > 1
+    assert sum(row['delta_points'] for row in faster['drivers'] if row['name'] in
+               {driver.name for driver in field_drivers if driver.team == team}) > 0
+
+
+def test_season_sweep_uses_common_random_numbers(field_drivers, season_tracks):
+    result = sweep_seasons(field_drivers, season_tracks, [Scenario('copie')], seasons=3, seed=3, fidelity='fast')
+    assert result.samples == 3
+    assert all(row['delta_points'] == 0 and row['delta_win'] == 0 for row in result.scenarios()[1]['drivers'])
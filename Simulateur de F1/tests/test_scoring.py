@@ -0,0 +1,32 @@
+# test_scoring.py
+
+import copy
+
+import numpy as np
+import pytest
+
+from f1_engine import SeasonSimulator
+from f1_race import FIDELITIES
+from f1_scoring import POINTS_TABLES, FinishingOrders, rescore
+from f1_store import ResultStore
+
+
+@pytest.mark.parametrize('fidelity', FIDELITIES)
+def test_current_table_matches_engine_points(tmp_path, field_drivers, season_tracks, fidelity):
+    names = [driver.name for driver in field_drivers]
+    orders = FinishingOrders(names, [driver.team for driver in field_drivers])
+    store = ResultStore.create(str(tmp_path), names, [track.name for track in season_tracks])
+    writer = store.writer()
+    engine_points = []
+    for season, seed in enumerate(np.random.SeedSequence(8).spawn(3)):
+        simulator = SeasonSimulator(field_drivers, copy.deepcopy(season_tracks), seed=seed,
+                                    fidelity=fidelity, recorders=[orders, writer], season_index=season)
+        points = {row['name']: row['points'] for row in simulator.run().standings}
+        engine_points.append([points[name] for name in names])
+    writer.close()
+
+    result = rescore(orders, [POINTS_TABLES['actuel']])
+    assert result.points[0].tolist() == engine_points
+    # Mêmes points à partir des ordres d'arrivée relus dans le stockage
+    stored = rescore(FinishingOrders.from_store(store), [POINTS_TABLES['actuel']])
+    assert stored.points.tolist() == result.points.tolist()
@@ -0,0 +1,58 @@
+# test_store.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from f1_engine import SeasonSimulator
+from f1_model import WEATHERS
+from f1_parallel import run_seasons
+from f1_store import ResultStore
+
+
+def create_store(path, drivers, tracks):
+    return ResultStore.create(str(path), [driver.name for driver in drivers], [track.name for track in tracks])
+
+
+def test_round_trip(tmp_path, field_drivers, season_tracks):
+    store = create_store(tmp_path, field_drivers, season_tracks)
+    writer = store.writer(chunk_size=3)
+    result = SeasonSimulator(field_drivers, season_tracks, seed=2, recorders=[writer], season_index=7).run()
+    writer.close()
+
+    store = ResultStore(str(tmp_path))
+    assert len(store.chunk_paths()) == 2
+    rows = store.query()
+    assert len(rows) == len(result.races) == store.count(season=7)
+    for row, race in zip(rows, result.races):
+        assert store.tracks[row['track']] == race.track
+        assert WEATHERS[row['weather']] == race.weather
+        names = [entry['name'] for entry in race.classification]
+        assert [store.drivers[i] for i in row['order'][:len(names)]] == names
+        for entry in race.classification:
+            i = store.driver_index[entry['name']]
+            assert row['dnf'][i] == (entry['time'] is None)
+            if entry['time'] is not None:
+                assert row['race_time'][i] == entry['time']
+            assert row['pit_stops'][i] == entry['pit_stops']
+    first = store.query(fields=['round', 'order'], track=season_tracks[0].name)
+    assert first['round'].tolist() == [0]
+    winner = store.drivers[first['order'][0, 0]]
+    assert store.wins(track=season_tracks[0].name)[winner] == 1
+
+
+def test_reserved_seasons_do_not_overlap(tmp_path, field_drivers, season_tracks):
+    store = create_store(tmp_path, field_drivers, season_tracks)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        firsts = list(executor.map(lambda count: store.reserve_seasons(count), [3] * 16))
+    assert sorted(firsts) == list(range(0, 48, 3))
+    assert store.next_season() == 48
+
+
+def test_appended_batches_get_new_seasons(tmp_path, field_drivers, season_tracks):
+    for seed in (1, 2):
+        run_seasons(field_drivers, season_tracks, 3, seed=seed, workers=1, fidelity='fast', store_path=str(tmp_path))
+    rows = ResultStore(str(tmp_path)).query(fields=['season', 'round'])
+    seasons, counts = np.unique(rows['season'], return_counts=True)
+    assert seasons.tolist() == list(range(6))
+    assert (counts == len(season_tracks)).all()
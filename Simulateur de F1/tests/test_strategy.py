@@ -0,0 +1,36 @@
+# test_strategy.py
+
+import copy
+
+import pytest
+
+from f1_strategy import StrategyModel
+
+# Trois gommes de courte durée de vie : toutes les stratégies d'une course de 7 tours s'énumèrent
+SHORT_TIRES = {
+    'Soft': {'durability': 3, 'performance': 1.02},
+    'Hard': {'durability': 5, 'performance': 0.98},
+    'Wet': {'durability': 4, 'performance': 0.94},
+}
+
+
+def all_strategies(laps):
+    # Relais ne dépassant pas la durabilité de leur gomme
+    if laps == 0:
+        yield []
+        return
+    for compound, tire in SHORT_TIRES.items():
+        for stint in range(1, min(tire['durability'], laps) + 1):
+            for rest in all_strategies(laps - stint):
+                yield [(compound, stint)] + rest
+
+
+@pytest.mark.parametrize('weather', ['dry', ['dry'] * 3 + ['rainy'] * 2 + ['humid'] * 2])
+def test_optimize_matches_brute_force(track, weather):
+    track = copy.copy(track)
+    track.laps = 7
+    model = StrategyModel(track, weather, base_lap_time=80.0, tire_types=SHORT_TIRES, pit_time=6.0)
+    best = min(model.time(stints) for stints in all_strategies(track.laps))
+    strategy = model.optimize()
+    assert strategy.total_time == pytest.approx(best)
+    assert model.time(strategy.stints) == pytest.approx(strategy.total_time)
@@ -0,0 +1,11 @@
+# test_validation.py
+
+from f1_validation import validate
+
+
+def test_fast_fidelity_matches_detailed(field_drivers, season_tracks):
+    # Graine fixe : les tests de Kolmogorov-Smirnov (corrigés de Bonferroni) ne rejettent rien
+    report = validate(field_drivers, season_tracks[:2], samples=2000, seed=13, forced_samples=100)
+    assert report['tests'] > 0
+    assert report['rejected'] == 0
+    assert report['forced_weather_violations'] == 0